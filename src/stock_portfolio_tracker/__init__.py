@@ -1,5 +1,30 @@
 """__init__.py for stock_portfolio_tracker package."""
 
-from .entry_points._pipeline import pipeline
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["pipeline"]
+if TYPE_CHECKING:
+    from .entry_points._pipeline import batch_pipeline, pipeline, projection_pipeline
+
+__all__ = ["batch_pipeline", "pipeline", "projection_pipeline"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the pipelines only when used, so that importing the package (e.g. to start the
+    CLI) does not import pandas and the rest of heavy dependencies.
+
+    Args:
+        name: Name of the attribute.
+
+    Raises:
+        AttributeError: Unknown attribute.
+
+    Returns:
+        Attribute of the package.
+    """
+    if name in __all__:
+        from .entry_points import _pipeline  # noqa: PLC0415
+
+        return getattr(_pipeline, name)
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
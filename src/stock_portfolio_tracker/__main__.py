@@ -12,7 +12,14 @@ def _main() -> None:
     def entry_point() -> None:
         """Entry point."""
 
-    for command in (entry_points.execute_cli_pipeline,):
+    for command in (
+        entry_points.execute_cli_pipeline,
+        entry_points.execute_cli_batch_pipeline,
+        entry_points.execute_cli_service,
+        entry_points.execute_cli_watch,
+        entry_points.execute_cli_intraday,
+        entry_points.execute_cli_projection,
+    ):
         entry_point.add_command(command)
 
     entry_point()
@@ -1,5 +1,68 @@
 """Entry points."""
 
-from ._pipeline import execute_cli_pipeline
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["execute_cli_pipeline"]
+from ._cli import (
+    execute_cli_batch_pipeline,
+    execute_cli_intraday,
+    execute_cli_pipeline,
+    execute_cli_projection,
+    execute_cli_service,
+    execute_cli_watch,
+)
+
+if TYPE_CHECKING:
+    from ._intraday import IntradayTracker
+    from ._scenarios import ScenarioEngine
+    from ._service import PortfolioService
+    from ._watch import PortfolioWatcher
+
+__all__ = [
+    "IntradayTracker",
+    "PortfolioService",
+    "PortfolioWatcher",
+    "ScenarioEngine",
+    "execute_cli_batch_pipeline",
+    "execute_cli_intraday",
+    "execute_cli_pipeline",
+    "execute_cli_projection",
+    "execute_cli_service",
+    "execute_cli_watch",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the service, watcher, intraday tracker and scenario engine only when used, so that
+    the CLI starts fast.
+
+    Args:
+        name: Name of the attribute.
+
+    Raises:
+        AttributeError: Unknown attribute.
+
+    Returns:
+        Attribute of the package.
+    """
+    if name == "IntradayTracker":
+        from ._intraday import IntradayTracker  # noqa: PLC0415
+
+        return IntradayTracker
+
+    if name == "PortfolioService":
+        from ._service import PortfolioService  # noqa: PLC0415
+
+        return PortfolioService
+
+    if name == "PortfolioWatcher":
+        from ._watch import PortfolioWatcher  # noqa: PLC0415
+
+        return PortfolioWatcher
+
+    if name == "ScenarioEngine":
+        from ._scenarios import ScenarioEngine  # noqa: PLC0415
+
+        return ScenarioEngine
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,386 @@
+"""Command line entry points.
+
+This module is imported every time the CLI starts, so it must stay light: the heavy dependencies
+(pandas, yfinance, the modelling package, etc.) are imported inside each command, only when the
+command runs.
+"""
+
+from importlib.util import find_spec
+from pathlib import Path
+
+import click
+
+from stock_portfolio_tracker.utils import (
+    DtypeBackend,
+    OutputFormat,
+    PipelineOutput,
+    SimulationMethod,
+)
+
+
+@click.command()
+@click.option("--config-file-name")
+@click.option("--transactions-file-name")
+@click.option("--cache-dir", type=click.Path(path_type=Path), default=None)
+@click.option("--output-dir", type=click.Path(path_type=Path), default=Path("data/out/"))
+@click.option(
+    "--output-format", type=click.Choice([fmt.value for fmt in OutputFormat]), default=None
+)
+@click.option("--partition-by-date", is_flag=True)
+@click.option("--metrics-file", type=click.Path(path_type=Path), default=None)
+@click.option("--memory-budget-mb", type=int, default=None)
+@click.option("--ledger-dir", type=click.Path(path_type=Path), default=None)
+@click.option(
+    "--output", type=click.Choice([output.value for output in PipelineOutput]), multiple=True
+)
+@click.option("--out-of-core-block-days", type=int, default=None)
+@click.option("--results-db", type=click.Path(path_type=Path), default=None)
+@click.option(
+    "--dtype-backend",
+    type=click.Choice([backend.value for backend in DtypeBackend]),
+    default=DtypeBackend.NUMPY.value,
+)
+def execute_cli_pipeline(
+    config_file_name: str,
+    transactions_file_name: str,
+    *,
+    cache_dir: Path | None,
+    output_dir: Path,
+    output_format: str | None,
+    partition_by_date: bool,
+    metrics_file: Path | None,
+    memory_budget_mb: int | None,
+    ledger_dir: Path | None,
+    output: tuple[str, ...],
+    out_of_core_block_days: int | None,
+    results_db: Path | None,
+    dtype_backend: str,
+) -> None:
+    """Entry point for pipeline.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        cache_dir: Directory to cache the pipeline stages in. Caching is disabled if not given.
+        output_dir: Directory to write the outputs to.
+        output_format: File format of the outputs. Defaults to parquet if pyarrow is installed,
+            or csv otherwise.
+        partition_by_date: Whether to write append-only partitions by month.
+        metrics_file: File to write the performance metrics of each stage to, in Prometheus
+            format if its extension is .prom and as JSON otherwise. Metrics are not recorded if
+            not given.
+        memory_budget_mb: Peak memory to aim for, in MB, modelling the assets in chunks that fit
+            in it. Everything is kept in memory if not given.
+        ledger_dir: Directory to keep the parsed transactions in, so later runs only parse the
+            appended transactions. The whole file is parsed every run if not given.
+        output: Outputs to compute and write, one per flag. All outputs if not given.
+        out_of_core_block_days: Number of days to model at a time, keeping the daily data of the
+            assets in memory-mapped files on disk. Everything is kept in memory if not given.
+        results_db: SQLite database to insert or update the results in, for fast historical
+            queries. Results are not stored in a database if not given.
+        dtype_backend: Dtype backend of the dataframes, numpy or pyarrow (Arrow-backed dtypes
+            and copy-on-write). Defaults to numpy.
+    """
+    import pandas as pd  # noqa: PLC0415
+
+    from stock_portfolio_tracker import postprocessing  # noqa: PLC0415
+    from stock_portfolio_tracker.utils import metrics_recorder  # noqa: PLC0415
+
+    from ._pipeline import pipeline  # noqa: PLC0415
+
+    if metrics_file:
+        metrics_recorder.enable()
+
+    end_date = pd.Timestamp.today().normalize()
+
+    postprocessing.write_outputs(
+        pipeline(
+            config_file_name=config_file_name,
+            transactions_file_name=transactions_file_name,
+            end_date=end_date,
+            cache_dir=cache_dir,
+            memory_budget_mb=memory_budget_mb,
+            ledger_dir=ledger_dir,
+            outputs=[PipelineOutput(output_type) for output_type in output] or None,
+            out_of_core_block_days=out_of_core_block_days,
+            results_db=results_db,
+            dtype_backend=DtypeBackend(dtype_backend),
+        ),
+        output_dir=output_dir,
+        end_date=end_date,
+        output_format=_get_output_format(output_format),
+        partition_by_date=partition_by_date,
+    )
+
+    if metrics_file:
+        metrics_recorder.write(metrics_file)
+
+
+@click.command()
+@click.option("--config-file-name", multiple=True)
+@click.option("--transactions-file-name", multiple=True)
+@click.option("--output-dir", type=click.Path(path_type=Path), default=Path("data/out/"))
+@click.option(
+    "--output-format", type=click.Choice([fmt.value for fmt in OutputFormat]), default=None
+)
+@click.option("--partition-by-date", is_flag=True)
+@click.option("--metrics-file", type=click.Path(path_type=Path), default=None)
+def execute_cli_batch_pipeline(
+    config_file_name: tuple[str, ...],
+    transactions_file_name: tuple[str, ...],
+    *,
+    output_dir: Path,
+    output_format: str | None,
+    partition_by_date: bool,
+    metrics_file: Path | None,
+) -> None:
+    """Entry point for batch pipeline.
+
+    Args:
+        config_file_name: File names for config, one per portfolio.
+        transactions_file_name: File names for transactions, one per portfolio.
+        output_dir: Directory to write the outputs to, in a subdirectory per portfolio named
+            after its transactions file.
+        output_format: File format of the outputs. Defaults to parquet if pyarrow is installed,
+            or csv otherwise.
+        partition_by_date: Whether to write append-only partitions by month.
+        metrics_file: File to write the performance metrics of each stage to, in Prometheus
+            format if its extension is .prom and as JSON otherwise. Metrics are not recorded if
+            not given.
+    """
+    import pandas as pd  # noqa: PLC0415
+
+    from stock_portfolio_tracker import postprocessing  # noqa: PLC0415
+    from stock_portfolio_tracker.utils import metrics_recorder  # noqa: PLC0415
+
+    from ._pipeline import batch_pipeline  # noqa: PLC0415
+
+    if metrics_file:
+        metrics_recorder.enable()
+
+    end_date = pd.Timestamp.today().normalize()
+    portfolio_files = list(zip(config_file_name, transactions_file_name, strict=True))
+
+    for (_, portfolio_transactions_file_name), outputs in zip(
+        portfolio_files,
+        batch_pipeline(portfolio_files=portfolio_files, end_date=end_date),
+        strict=True,
+    ):
+        postprocessing.write_outputs(
+            outputs,
+            output_dir=output_dir / Path(portfolio_transactions_file_name).stem,
+            end_date=end_date,
+            output_format=_get_output_format(output_format),
+            partition_by_date=partition_by_date,
+        )
+
+    if metrics_file:
+        metrics_recorder.write(metrics_file)
+
+
+@click.command()
+@click.option("--config-file-name")
+@click.option("--transactions-file-name")
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", type=int, default=8000)
+@click.option("--refresh-interval", type=float, default=300)
+def execute_cli_service(
+    config_file_name: str,
+    transactions_file_name: str,
+    host: str,
+    port: int,
+    refresh_interval: float,
+) -> None:
+    """Entry point for service mode.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        host: Host to listen on.
+        port: Port to listen on.
+        refresh_interval: Seconds between market data refreshes.
+    """
+    from ._service import PortfolioService  # noqa: PLC0415
+
+    PortfolioService(
+        config_file_name=config_file_name,
+        transactions_file_name=transactions_file_name,
+        refresh_interval=refresh_interval,
+    ).serve(host=host, port=port)
+
+
+@click.command()
+@click.option("--config-file-name")
+@click.option("--transactions-file-name")
+@click.option("--poll-interval", type=float, default=1)
+@click.option("--output-dir", type=click.Path(path_type=Path), default=Path("data/out/"))
+@click.option(
+    "--output-format", type=click.Choice([fmt.value for fmt in OutputFormat]), default=None
+)
+@click.option("--partition-by-date", is_flag=True)
+def execute_cli_watch(
+    config_file_name: str,
+    transactions_file_name: str,
+    *,
+    poll_interval: float,
+    output_dir: Path,
+    output_format: str | None,
+    partition_by_date: bool,
+) -> None:
+    """Entry point for watch mode.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        poll_interval: Seconds between checks for changes in the input files.
+        output_dir: Directory to write the outputs to after every recomputation.
+        output_format: File format of the outputs. Defaults to parquet if pyarrow is installed,
+            or csv otherwise.
+        partition_by_date: Whether to write append-only partitions by month.
+    """
+    from ._watch import PortfolioWatcher  # noqa: PLC0415
+
+    PortfolioWatcher(
+        config_file_name=config_file_name,
+        transactions_file_name=transactions_file_name,
+        output_dir=output_dir,
+        output_format=_get_output_format(output_format),
+        partition_by_date=partition_by_date,
+    ).watch(poll_interval=poll_interval)
+
+
+@click.command()
+@click.option("--config-file-name")
+@click.option("--transactions-file-name")
+@click.option("--price-file", type=click.Path(path_type=Path), default=None)
+@click.option("--price-socket", default=None)
+def execute_cli_intraday(
+    config_file_name: str,
+    transactions_file_name: str,
+    price_file: Path | None,
+    price_socket: str | None,
+) -> None:
+    """Entry point for intraday mode.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        price_file: JSON lines file of ticks to follow as price feed.
+        price_socket: Address of a TCP server pushing JSON lines of ticks, as host:port, to use as
+            price feed instead of a file.
+
+    Raises:
+        click.UsageError: Not exactly one price feed given.
+    """
+    from stock_portfolio_tracker.preprocessing import (  # noqa: PLC0415
+        FilePriceFeed,
+        SocketPriceFeed,
+    )
+
+    from ._intraday import IntradayTracker  # noqa: PLC0415
+
+    if (price_file is None) == (price_socket is None):
+        msg = "Give either --price-file or --price-socket."
+        raise click.UsageError(msg)
+
+    if price_file is not None:
+        price_feed: FilePriceFeed | SocketPriceFeed = FilePriceFeed(price_file)
+    else:
+        host, _, port = str(price_socket).rpartition(":")
+        price_feed = SocketPriceFeed(host, int(port))
+
+    IntradayTracker(
+        config_file_name=config_file_name,
+        transactions_file_name=transactions_file_name,
+        price_feed=price_feed,
+    ).run()
+
+
+@click.command()
+@click.option("--config-file-name")
+@click.option("--transactions-file-name")
+@click.option("--horizon-days", type=int, default=252)
+@click.option("--paths", type=int, default=10_000)
+@click.option(
+    "--method",
+    type=click.Choice([method.value for method in SimulationMethod]),
+    default=SimulationMethod.BOOTSTRAP.value,
+)
+@click.option("--processes", type=int, default=None)
+@click.option("--seed", type=int, default=None)
+@click.option("--output-dir", type=click.Path(path_type=Path), default=Path("data/out/"))
+@click.option(
+    "--output-format", type=click.Choice([fmt.value for fmt in OutputFormat]), default=None
+)
+def execute_cli_projection(
+    config_file_name: str,
+    transactions_file_name: str,
+    *,
+    horizon_days: int,
+    paths: int,
+    method: str,
+    processes: int | None,
+    seed: int | None,
+    output_dir: Path,
+    output_format: str | None,
+) -> None:
+    """Entry point for Monte Carlo projection of the portfolio value.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        horizon_days: Number of business days to project. Defaults to 252.
+        paths: Number of paths to simulate. Defaults to 10000.
+        method: How to simulate the daily returns, bootstrap or normal. Defaults to bootstrap.
+        processes: Number of processes to simulate in. Only the current process if not given.
+        seed: Seed of the random numbers. A different projection every run if not given.
+        output_dir: Directory to write the projection to.
+        output_format: File format of the projection. Defaults to parquet if pyarrow is
+            installed, or csv otherwise.
+    """
+    import pandas as pd  # noqa: PLC0415
+
+    from stock_portfolio_tracker import postprocessing  # noqa: PLC0415
+
+    from ._pipeline import projection_pipeline  # noqa: PLC0415
+
+    end_date = pd.Timestamp.today().normalize()
+
+    postprocessing.write_outputs(
+        {
+            "portfolio_projection": projection_pipeline(
+                config_file_name=config_file_name,
+                transactions_file_name=transactions_file_name,
+                horizon_days=horizon_days,
+                end_date=end_date,
+                n_paths=paths,
+                method=SimulationMethod(method),
+                processes=processes,
+                seed=seed,
+            )
+        },
+        output_dir=output_dir,
+        end_date=end_date,
+        output_format=_get_output_format(output_format),
+    )
+
+
+def _get_output_format(output_format: str | None) -> OutputFormat:
+    """Get the output format chosen in the CLI, defaulting to parquet if pyarrow is installed.
+
+    Args:
+        output_format: Output format chosen in the CLI, if any.
+
+    Returns:
+        Output format.
+    """
+    from loguru import logger  # noqa: PLC0415
+
+    if output_format is not None:
+        return OutputFormat(output_format)
+
+    if find_spec("pyarrow") is None:
+        logger.warning("pyarrow is not installed, writing outputs as csv.")
+        return OutputFormat.CSV
+
+    return OutputFormat.PARQUET
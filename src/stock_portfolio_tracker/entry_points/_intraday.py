@@ -0,0 +1,94 @@
+"""Intraday mode that values the portfolio with every tick of a price feed."""
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker import modelling
+from stock_portfolio_tracker.preprocessing import Preprocessor, PriceFeed
+from stock_portfolio_tracker.utils import DataApiType
+
+
+class IntradayTracker:
+    def __init__(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+        price_feed: PriceFeed,
+        *,
+        end_date: pd.Timestamp | None = None,
+        data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+        input_data_dir: Path = Path("data/in/"),
+    ) -> None:
+        """Initialize the tracker, loading the state of the portfolio at the end of the previous
+        day.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            price_feed: Feed pushing the intraday prices of the assets.
+            end_date: Last day with closing prices, whose state the ticks are applied to.
+                Defaults to None, which uses the day before the current date.
+            data_api_type: Type of data API to use.
+            input_data_dir: Directory where input data files are located.
+        """
+        self.price_feed = price_feed
+
+        logger.info("Start of preprocess.")
+
+        _, portfolio_data, asset_prices, exchange_rates = Preprocessor(
+            data_api_type=data_api_type.value,
+            input_data_dir=input_data_dir,
+            end_date=end_date or pd.Timestamp.today().normalize() - pd.Timedelta(days=1),
+        ).preprocess_intraday(config_file_name, transactions_file_name)
+
+        self.valuator = modelling.IntradayValuator(portfolio_data, asset_prices, exchange_rates)
+        self.outputs = self._get_outputs()
+
+    def run(self, on_update: Callable[[dict[str, pd.DataFrame]], Any] | None = None) -> None:
+        """Value the portfolio with every tick of the price feed, until the feed ends or is
+        closed.
+
+        Args:
+            on_update: Function called with the outputs after every tick of an asset held, with
+                the current value and gains of the portfolio (portfolio_value) and the value and
+                allocation of each asset (asset_distribution). Defaults to None.
+        """
+        logger.info("Waiting for ticks.")
+
+        for tick in self.price_feed.ticks():
+            if not self.valuator.update(tick):
+                continue
+
+            self.outputs = self._get_outputs()
+            portfolio_value = self.outputs["portfolio_value"].iloc[0]
+
+            logger.info(
+                f"{tick.timestamp} {tick.ticker} {tick.price}: portfolio value "
+                f"{portfolio_value['curr_val_portfolio']}, gain "
+                f"{portfolio_value['curr_abs_gain_portfolio']} "
+                f"({portfolio_value['curr_perc_gain_portfolio']}%)."
+            )
+
+            if on_update is not None:
+                on_update(self.outputs)
+
+        logger.info("Price feed ended.")
+
+    def stop(self) -> None:
+        """Stop the price feed, from any thread."""
+        self.price_feed.close()
+
+    def _get_outputs(self) -> dict[str, pd.DataFrame]:
+        """Get the current outputs of the valuator.
+
+        Returns:
+            Current value and gains of the portfolio, and value and allocation of each asset.
+        """
+        return {
+            "portfolio_value": self.valuator.get_portfolio_value(),
+            "asset_distribution": self.valuator.get_asset_distribution(),
+        }
@@ -1,30 +1,39 @@
 """Main module to execute the project."""
 
+from collections.abc import Callable, Iterable
+from importlib.util import find_spec
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
 
-import click
 import pandas as pd
 from loguru import logger
 
 from stock_portfolio_tracker import modelling
-from stock_portfolio_tracker.preprocessing import Preprocessor
-from stock_portfolio_tracker.utils import DataApiType, timer
+from stock_portfolio_tracker.exceptions import MissingDependencyError
+from stock_portfolio_tracker.postprocessing import ResultsStore
+from stock_portfolio_tracker.preprocessing import Preprocessor, TransactionLedger
+from stock_portfolio_tracker.utils import (
+    ColumnStore,
+    DataApiType,
+    DtypeBackend,
+    PipelineOutput,
+    PortfolioData,
+    SimulationMethod,
+    StageCache,
+    convert_dtype_backend,
+    get_peak_rss,
+    timer,
+)
 
-
-@click.command()
-@click.option("--config-file-name")
-@click.option("--transactions-file-name")
-def execute_cli_pipeline(config_file_name: str, transactions_file_name: str) -> None:
-    """Entry point for pipeline.
-
-    Args:
-        config_file_name: File name for config.
-        transactions_file_name: File name for transactions.
-    """
-    pipeline(
-        config_file_name=config_file_name,
-        transactions_file_name=transactions_file_name,
-    )
+# outputs that compare the portfolio to the benchmarks, the only ones that need them loaded
+BENCHMARK_OUTPUTS = frozenset(
+    {
+        PipelineOutput.PORTFOLIO_EVOLUTION,
+        PipelineOutput.ASSETS_VS_BENCHMARK,
+        PipelineOutput.SUMMARY_RETURNS,
+    }
+)
 
 
 @timer
@@ -34,16 +43,68 @@ def pipeline(
     end_date: pd.Timestamp | None = None,
     data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
     input_data_dir: Path = Path("data/in/"),
+    *,
+    cache_dir: Path | None = None,
+    memory_budget_mb: int | None = None,
+    ledger_dir: Path | None = None,
+    outputs: Iterable[PipelineOutput] | None = None,
+    out_of_core_block_days: int | None = None,
+    results_db: Path | None = None,
+    dtype_backend: DtypeBackend = DtypeBackend.NUMPY,
 ) -> dict[str, pd.DataFrame]:
     """Execute the project end to end.
 
+    Only the stages the requested outputs depend on are run: if none of them compares the
+    portfolio to a benchmark, the benchmarks are neither downloaded nor modelled, and the asset
+    distribution alone is calculated from the transactions and the prices at end date, without
+    modelling the daily history.
+
     Args:
         config_file_name: File name for config.
         transactions_file_name: File name for transactions.
         end_date: End date to use for the portfolio analysis.
         data_api_type: Type of data API to use.
         input_data_dir: Directory where input data files are located.
+        cache_dir: Directory to cache the result of each stage in, keyed by a hash of the stage
+            inputs, so only stages whose inputs changed are run again. With a memory budget or out
+            of core, the assets are not cached. Defaults to None (no cache).
+        memory_budget_mb: Peak resident memory to aim for, in MB. When given, the assets are
+            loaded and modelled in chunks that fit in the budget, spilling the intermediate
+            results to disk, with the same outputs. Defaults to None (everything in memory).
+        ledger_dir: Directory to keep the parsed transactions in, so the next runs only parse the
+            transactions appended to the file. Defaults to None (parse the whole file).
+        outputs: Outputs to compute. Defaults to None (all of them).
+        out_of_core_block_days: When given, the daily data of the assets is kept in
+            memory-mapped files on disk and modelled in blocks of this many days, with the same
+            outputs, so that the memory needed does not grow with the length of the history.
+            Cannot be combined with memory_budget_mb. Defaults to None (everything in memory).
+        results_db: SQLite database to insert or update the results of the run in, for fast
+            point and range queries with postprocessing.ResultsStore. The results are stored
+            under the name of the transactions file without its extension as portfolio id, so
+            several portfolios can share the database. The daily value of each asset is only
+            stored when the assets are modelled in memory. Defaults to None (no database).
+        dtype_backend: Dtype backend of the dataframes. With DtypeBackend.PYARROW, the tickers
+            are Arrow strings from preprocessing on, the pipeline runs with copy-on-write, so
+            dataframes derived from others share their unchanged columns instead of copying them,
+            and every column of the outputs is Arrow-backed, to share them with Arrow consumers
+            without copying. Defaults to DtypeBackend.NUMPY.
+
+    Raises:
+        MissingDependencyError: Pyarrow dtype backend without pyarrow installed.
+        ValueError: Memory budget and out-of-core mode at the same time.
+
+    Returns:
+        Requested pipeline outputs, by output type.
     """
+    if dtype_backend == DtypeBackend.PYARROW and find_spec("pyarrow") is None:
+        msg = (
+            "pyarrow is needed for the pyarrow dtype backend. Install it with "
+            "`pip install stock-portfolio-tracker[arrow]` or use the numpy backend instead."
+        )
+        raise MissingDependencyError(msg)
+
+    _check_modes(cache_dir, memory_budget_mb, out_of_core_block_days, dtype_backend)
+
     logger.info("Start of execution.")
 
     logger.info("Start of preprocess.")
@@ -51,16 +112,462 @@ def pipeline(
     if not end_date:
         end_date = pd.Timestamp.today().normalize()
 
+    preprocessor = Preprocessor(
+        data_api_type=data_api_type.value,
+        input_data_dir=input_data_dir,
+        end_date=end_date,
+        cache=StageCache(cache_dir) if cache_dir else None,
+        ledger=TransactionLedger(ledger_dir) if ledger_dir else None,
+        dtype_backend=dtype_backend,
+    )
+    results_store = (
+        ResultsStore(results_db, portfolio_id=Path(transactions_file_name).stem)
+        if results_db
+        else None
+    )
+
+    with pd.option_context("mode.copy_on_write", dtype_backend == DtypeBackend.PYARROW):
+        if out_of_core_block_days is not None:
+            pipeline_outputs = _select_outputs(
+                _run_out_of_core(
+                    preprocessor,
+                    config_file_name,
+                    transactions_file_name,
+                    out_of_core_block_days,
+                    results_store,
+                ),
+                outputs,
+            )
+        elif memory_budget_mb is not None:
+            pipeline_outputs = _select_outputs(
+                _run_in_memory_budget(
+                    preprocessor,
+                    config_file_name,
+                    transactions_file_name,
+                    memory_budget_mb,
+                    results_store,
+                ),
+                outputs,
+            )
+        else:
+            pipeline_outputs = run_preprocessing_and_modelling(
+                preprocessor, config_file_name, transactions_file_name, outputs, results_store
+            )
+
+    pipeline_outputs = {
+        output_type: convert_dtype_backend(output, dtype_backend)
+        for output_type, output in pipeline_outputs.items()
+    }
+
+    logger.info("End of execution.")
+
+    return pipeline_outputs
+
+
+def _check_modes(
+    cache_dir: Path | None,
+    memory_budget_mb: int | None,
+    out_of_core_block_days: int | None,
+    dtype_backend: DtypeBackend,
+) -> None:
+    """Check that the options of the pipeline can be combined, and warn about the ones that only
+    apply in part to the chosen mode.
+
+    Args:
+        cache_dir: Directory to cache the result of each stage in.
+        memory_budget_mb: Peak resident memory to aim for, in MB.
+        out_of_core_block_days: Number of days to model at a time out of core.
+        dtype_backend: Dtype backend of the dataframes.
+
+    Raises:
+        ValueError: Memory budget and out-of-core mode at the same time.
+    """
+    if memory_budget_mb is not None and out_of_core_block_days is not None:
+        msg = "Give either memory_budget_mb or out_of_core_block_days, not both."
+        raise ValueError(msg)
+
+    if cache_dir is not None and memory_budget_mb is not None:
+        logger.warning(
+            "With a memory budget, the assets are loaded and modelled in chunks that are not "
+            "cached: only the config, transactions, currency exchanges and benchmarks are."
+        )
+
+    if out_of_core_block_days is not None:
+        if cache_dir is not None:
+            logger.warning(
+                "Out of core, the assets are stored and modelled on disk without caching: only "
+                "the config, transactions, currency exchanges and benchmarks are cached."
+            )
+
+        if dtype_backend == DtypeBackend.PYARROW:
+            logger.warning(
+                "Out of core, the daily data of the assets is kept in NumPy memory-mapped files: "
+                "only the transactions, benchmarks and outputs are backed by Arrow."
+            )
+
+
+def run_preprocessing_and_modelling(
+    preprocessor: Preprocessor,
+    config_file_name: str,
+    transactions_file_name: str,
+    outputs: Iterable[PipelineOutput] | None = None,
+    results_store: ResultsStore | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Preprocess and model one portfolio with an existing preprocessor, which allows reusing
+    the preprocessor (and the market data it holds) across runs.
+
+    Args:
+        preprocessor: Preprocessor to load the input data with.
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        outputs: Outputs to compute, running only the stages they depend on. Defaults to None
+            (all of them).
+        results_store: Results store to write the results of the run to. Defaults to None.
+
+    Returns:
+        Requested pipeline outputs.
+    """
+    requested_outputs = set(PipelineOutput if outputs is None else outputs)
+    with_benchmarks = bool(requested_outputs & BENCHMARK_OUTPUTS)
+    # the asset distribution alone is a snapshot of the holdings, with no need of a daily model
+    holdings_only = requested_outputs == {PipelineOutput.ASSET_DISTRIBUTION}
+
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+    portfolio_models: list[pd.DataFrame] = []
+
+    def _model_asset_on_load(
+        portfolio_data: PortfolioData, asset_prices: pd.DataFrame, asset_dividends: pd.DataFrame
+    ) -> None:
+        """Model each asset as soon as it is loaded, while the rest of downloads are in flight.
+
+        Args:
+            portfolio_data: Transactions history and other portfolio data.
+            asset_prices: Daily prices of the asset.
+            asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        """
+        asset_models[asset_prices["ticker_asset"].iloc[0]] = modelling.model_asset(
+            portfolio_data, asset_prices, asset_dividends
+        )
+
     config, portfolio_data, asset_prices, asset_dividends, benchmark_prices, benchmark_dividends = (
-        Preprocessor(
-            data_api_type=data_api_type.value, input_data_dir=input_data_dir, end_date=end_date
-        ).preprocess(
+        preprocessor.preprocess(
             config_file_name,
             transactions_file_name,
+            # with a cache the whole portfolio model may be cached, and the holdings snapshot
+            # does not model the assets, so modelling assets early could be wasted work
+            on_asset_loaded=None if preprocessor.cache or holdings_only else _model_asset_on_load,
+            load_benchmarks=with_benchmarks,
         )
     )
 
     logger.info("Start of modelling.")
+
+    # the model of every asset is only kept if it is going to be stored
+    on_portfolio_model = portfolio_models.append if results_store else None
+
+    if holdings_only:
+        pipeline_outputs = {
+            PipelineOutput.ASSET_DISTRIBUTION.value: modelling.model_asset_distribution(
+                portfolio_data, asset_prices, cache=preprocessor.cache
+            )
+        }
+    elif not with_benchmarks:
+        asset_distribution, dividends_company, dividends_year = (
+            modelling.model_data_without_benchmarks(
+                portfolio_data,
+                asset_prices,
+                asset_dividends,
+                cache=preprocessor.cache,
+                asset_models=asset_models,
+                on_portfolio_model=on_portfolio_model,
+            )
+        )
+
+        pipeline_outputs = _select_outputs(
+            {
+                PipelineOutput.ASSET_DISTRIBUTION.value: asset_distribution,
+                PipelineOutput.DIVIDENDS_COMPANY.value: dividends_company,
+                PipelineOutput.DIVIDENDS_YEAR.value: dividends_year,
+            },
+            requested_outputs,
+        )
+    else:
+        pipeline_outputs = _select_outputs(
+            model_portfolio_outputs(
+                portfolio_data,
+                asset_prices,
+                asset_dividends,
+                benchmark_prices,
+                cache=preprocessor.cache,
+                asset_models=asset_models,
+                on_portfolio_model=on_portfolio_model,
+            ),
+            requested_outputs,
+        )
+
+    if results_store:
+        results_store.write(
+            pipeline_outputs,
+            config.benchmark_tickers,
+            portfolio_models[0] if portfolio_models else None,
+        )
+
+    return pipeline_outputs
+
+
+def _run_in_memory_budget(
+    preprocessor: Preprocessor,
+    config_file_name: str,
+    transactions_file_name: str,
+    memory_budget_mb: int,
+    results_store: ResultsStore | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Preprocess and model one portfolio in chunks of assets that fit in a memory budget, and
+    report the peak resident memory against the budget.
+
+    Args:
+        preprocessor: Preprocessor to load the input data with.
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        memory_budget_mb: Peak resident memory to aim for, in MB.
+        results_store: Results store to write the results of the run to. Defaults to None.
+
+    Returns:
+        Pipeline outputs.
+    """
+    config, portfolio_data, asset_chunks, benchmark_prices, _ = preprocessor.preprocess_in_chunks(
+        config_file_name, transactions_file_name, memory_budget_mb * 1024**2
+    )
+
+    logger.info("Start of modelling.")
+
+    with TemporaryDirectory() as spill_dir:
+        outputs = _gather_outputs(
+            modelling.model_data_in_chunks(
+                portfolio_data, asset_chunks, benchmark_prices, Path(spill_dir)
+            )
+        )
+
+    if (peak_rss := get_peak_rss()) is not None:
+        peak_rss_mb = peak_rss / 1024**2
+        (logger.warning if peak_rss_mb > memory_budget_mb else logger.info)(
+            f"Peak memory: {peak_rss_mb:.0f} MB of a {memory_budget_mb} MB budget."
+        )
+
+    if results_store:
+        results_store.write(outputs, config.benchmark_tickers)
+
+    return outputs
+
+
+def _run_out_of_core(
+    preprocessor: Preprocessor,
+    config_file_name: str,
+    transactions_file_name: str,
+    block_days: int,
+    results_store: ResultsStore | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Preprocess and model one portfolio out of core, with the daily data and the model of the
+    assets kept in memory-mapped files in a temporary directory.
+
+    Args:
+        preprocessor: Preprocessor to load the input data with.
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        block_days: Number of days to model at a time.
+        results_store: Results store to write the results of the run to. Defaults to None.
+
+    Returns:
+        Pipeline outputs.
+    """
+    with TemporaryDirectory() as store_dir:
+        price_store = ColumnStore(Path(store_dir) / "prices")
+        config, portfolio_data, benchmark_prices, _ = preprocessor.preprocess_out_of_core(
+            config_file_name, transactions_file_name, price_store
+        )
+
+        logger.info("Start of modelling.")
+
+        outputs = _gather_outputs(
+            modelling.model_data_out_of_core(
+                portfolio_data,
+                price_store,
+                ColumnStore(Path(store_dir) / "model"),
+                benchmark_prices,
+                block_days=block_days,
+            )
+        )
+
+    if results_store:
+        results_store.write(outputs, config.benchmark_tickers)
+
+    return outputs
+
+
+@timer
+def batch_pipeline(
+    portfolio_files: list[tuple[str, str]],
+    end_date: pd.Timestamp | None = None,
+    data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+    input_data_dir: Path = Path("data/in/"),
+) -> list[dict[str, pd.DataFrame]]:
+    """Execute the project end to end for many portfolios, loading the market data only once.
+
+    Args:
+        portfolio_files: Pairs of (config file name, transactions file name).
+        end_date: End date to use for the portfolio analysis.
+        data_api_type: Type of data API to use.
+        input_data_dir: Directory where input data files are located.
+
+    Returns:
+        Pipeline outputs of each portfolio, in the same order as portfolio_files.
+    """
+    logger.info("Start of batch execution.")
+
+    logger.info("Start of preprocess.")
+
+    if not end_date:
+        end_date = pd.Timestamp.today().normalize()
+
+    outputs = []
+
+    for (
+        _,
+        portfolio_data,
+        asset_prices,
+        asset_dividends,
+        benchmark_prices,
+        _,
+    ) in Preprocessor(
+        data_api_type=data_api_type.value, input_data_dir=input_data_dir, end_date=end_date
+    ).preprocess_batch(portfolio_files):
+        logger.info("Start of modelling.")
+        outputs.append(
+            model_portfolio_outputs(portfolio_data, asset_prices, asset_dividends, benchmark_prices)
+        )
+
+    logger.info("End of batch execution.")
+
+    return outputs
+
+
+@timer
+def projection_pipeline(
+    config_file_name: str,
+    transactions_file_name: str,
+    horizon_days: int,
+    *,
+    end_date: pd.Timestamp | None = None,
+    data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+    input_data_dir: Path = Path("data/in/"),
+    n_paths: int = 10_000,
+    method: SimulationMethod = SimulationMethod.BOOTSTRAP,
+    chunk_paths: int = 1_000,
+    processes: int | None = None,
+    seed: int | None = None,
+) -> pd.DataFrame:
+    """Project the value of the current holdings over the next days with a Monte Carlo
+    simulation of the daily returns of the assets. Benchmarks are not loaded.
+
+    Args:
+        config_file_name: File name for config.
+        transactions_file_name: File name for transactions.
+        horizon_days: Number of business days to project, after end date.
+        end_date: Date of the holdings to project, and last date of the historical returns.
+        data_api_type: Type of data API to use.
+        input_data_dir: Directory where input data files are located.
+        n_paths: Number of paths to simulate. Defaults to 10000.
+        method: How to simulate the daily returns, resampling the historical ones (bootstrap) or
+            drawing them from a multivariate normal distribution. Defaults to bootstrap.
+        chunk_paths: Number of paths to simulate at a time, which bounds the memory needed.
+            Defaults to 1000.
+        processes: Number of processes to simulate the chunks in. Defaults to None (the current
+            process only).
+        seed: Seed of the random numbers. Defaults to None (a different projection every run).
+
+    Returns:
+        Percentile bands of the value of the portfolio on each projected day, by descending
+        date.
+    """
+    logger.info("Start of preprocess.")
+
+    _, portfolio_data, asset_prices, _ = Preprocessor(
+        data_api_type=data_api_type.value,
+        input_data_dir=input_data_dir,
+        end_date=end_date or pd.Timestamp.today().normalize(),
+    ).preprocess_intraday(config_file_name, transactions_file_name)
+
+    logger.info("Start of modelling.")
+
+    projection: pd.DataFrame = modelling.model_projection(
+        portfolio_data,
+        asset_prices,
+        horizon_days,
+        sorting_columns=[{"columns": ["date"], "ascending": [False]}],
+        n_paths=n_paths,
+        method=method,
+        chunk_paths=chunk_paths,
+        processes=processes,
+        seed=seed,
+    )
+
+    return projection
+
+
+def model_portfolio_outputs(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+    benchmark_prices: pd.DataFrame,
+    *,
+    cache: StageCache | None = None,
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] | None = None,
+    on_portfolio_model: Callable[[pd.DataFrame], Any] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Model one portfolio and gather the outputs of the pipeline, by output type.
+
+    Shared by the entry points that model a portfolio from data they already loaded.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Asset prices historical data.
+        asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        benchmark_prices: Benchmark historical data.
+        cache: Stage cache to reuse the results of previous runs. Defaults to None.
+        asset_models: Output of modelling.model_asset() for the assets that are already
+            modelled, by ticker. Defaults to None.
+        on_portfolio_model: Function called with the daily model of every asset once modelled.
+            Defaults to None.
+
+    Returns:
+        Pipeline outputs.
+    """
+    return _gather_outputs(
+        modelling.model_data(
+            portfolio_data,
+            asset_prices,
+            asset_dividends,
+            benchmark_prices,
+            cache=cache,
+            asset_models=asset_models,
+            on_portfolio_model=on_portfolio_model,
+        )
+    )
+
+
+def _gather_outputs(
+    modelled_data: tuple[
+        pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame
+    ],
+) -> dict[str, pd.DataFrame]:
+    """Name the outputs of the modelling.
+
+    Args:
+        modelled_data: Output of modelling.model_data().
+
+    Returns:
+        Pipeline outputs.
+    """
     (
         portfolio_evolution,
         asset_distribution,
@@ -68,14 +575,7 @@ def pipeline(
         dividends_company,
         dividends_year,
         summary_returns,
-    ) = modelling.model_data(
-        portfolio_data,
-        asset_prices,
-        asset_dividends,
-        benchmark_prices,
-    )
-
-    logger.info("End of execution.")
+    ) = modelled_data
 
     return {
         "portfolio_evolution": portfolio_evolution,
@@ -85,3 +585,27 @@ def pipeline(
         "dividends_year": dividends_year,
         "summary_returns": summary_returns,
     }
+
+
+def _select_outputs(
+    pipeline_outputs: dict[str, pd.DataFrame], outputs: Iterable[PipelineOutput] | None
+) -> dict[str, pd.DataFrame]:
+    """Keep only the requested outputs.
+
+    Args:
+        pipeline_outputs: Pipeline outputs, by output type.
+        outputs: Outputs to keep. None keeps all of them.
+
+    Returns:
+        Requested pipeline outputs, by output type.
+    """
+    if outputs is None:
+        return pipeline_outputs
+
+    output_types = {output.value for output in outputs}
+
+    return {
+        output_type: output
+        for output_type, output in pipeline_outputs.items()
+        if output_type in output_types
+    }
@@ -0,0 +1,249 @@
+"""What-if scenarios that model modified transactions against market data loaded once."""
+
+from collections.abc import Mapping
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker import modelling
+from stock_portfolio_tracker.exceptions import InvalidTransactionsError
+from stock_portfolio_tracker.preprocessing import Preprocessor
+from stock_portfolio_tracker.utils import DataApiType, PortfolioData
+
+from ._pipeline import model_portfolio_outputs
+
+TRANSACTIONS_COLUMNS = ["date", "ticker_asset", "trans_qty_asset", "trans_val_asset"]
+
+
+class ScenarioEngine:
+    def __init__(
+        self,
+        portfolio_data: PortfolioData,
+        asset_prices: pd.DataFrame,
+        asset_dividends: pd.DataFrame,
+        benchmark_prices: pd.DataFrame,
+    ) -> None:
+        """Initialize the engine with the preprocessed data of the portfolio, modelling every
+        asset once with the actual transactions.
+
+        Args:
+            portfolio_data: Transactions history and other portfolio data.
+            asset_prices: Daily prices of each asset, from Preprocessor.preprocess().
+            asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+            benchmark_prices: Benchmark historical data, for one or more benchmarks.
+        """
+        self.portfolio_data = portfolio_data
+        self.asset_prices = asset_prices
+        self.asset_dividends = asset_dividends
+        self.benchmark_prices = benchmark_prices
+
+        self.asset_inputs = {
+            str(ticker): (single_asset_prices, single_asset_dividends)
+            for (ticker, single_asset_prices), (_, single_asset_dividends) in zip(
+                asset_prices.groupby("ticker_asset"),
+                asset_dividends.groupby("ticker_asset"),
+                strict=True,
+            )
+        }
+        self.asset_transactions = _split_transactions(portfolio_data.transactions)
+
+        logger.info(f"Modelling {len(self.asset_inputs)} assets with the actual transactions.")
+
+        self.asset_models = {
+            ticker: modelling.model_asset(
+                portfolio_data, single_asset_prices, single_asset_dividends
+            )
+            for ticker, (single_asset_prices, single_asset_dividends) in self.asset_inputs.items()
+        }
+        self.recomputed_tickers: list[str] = []
+
+    @classmethod
+    def from_files(
+        cls,
+        config_file_name: str,
+        transactions_file_name: str,
+        end_date: pd.Timestamp | None = None,
+        data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+        input_data_dir: Path = Path("data/in/"),
+    ) -> "ScenarioEngine":
+        """Initialize the engine loading the market data of the portfolio in the input files.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            end_date: End date to use for the portfolio analysis. Defaults to None, which uses
+                the current date.
+            data_api_type: Type of data API to use.
+            input_data_dir: Directory where input data files are located.
+
+        Returns:
+            Scenario engine.
+        """
+        logger.info("Start of preprocess.")
+
+        _, portfolio_data, asset_prices, asset_dividends, benchmark_prices, _ = Preprocessor(
+            data_api_type=data_api_type.value,
+            input_data_dir=input_data_dir,
+            end_date=end_date or pd.Timestamp.today().normalize(),
+        ).preprocess(config_file_name, transactions_file_name)
+
+        return cls(portfolio_data, asset_prices, asset_dividends, benchmark_prices)
+
+    def evaluate(self, transactions: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        """Model the portfolio with another set of transactions of the loaded assets.
+
+        Only the assets whose transactions differ from the actual ones are modelled again, unless
+        the scenario starts on another date, and the rest reuse the models of the actual
+        transactions. The portfolio aggregates and the benchmarks, which depend on every
+        transaction, are always calculated again.
+
+        Args:
+            transactions: Transactions of the scenario, in the format of
+                PortfolioData.transactions: date, ticker_asset, and signed trans_qty_asset and
+                trans_val_asset (purchases with positive quantity and negative value, and sales
+                the other way around). Transactions after the end date are left out.
+
+        Raises:
+            InvalidTransactionsError: Missing columns, no transactions, or transactions of
+                assets or dates without loaded market data.
+
+        Returns:
+            Pipeline outputs of the scenario, by output type.
+        """
+        portfolio_data = self._get_portfolio_data(transactions)
+        tickers = sorted(portfolio_data.assets_info)
+
+        same_start = portfolio_data.start_date == self.portfolio_data.start_date
+
+        if same_start:
+            asset_inputs = self.asset_inputs
+            benchmark_prices = self.benchmark_prices
+        else:
+            # the market data of the scenario starts on its first transaction, as if it had been
+            # loaded for it, and every asset is modelled again from that date
+            asset_inputs = {
+                ticker: (
+                    single_asset_prices[single_asset_prices["date"] >= portfolio_data.start_date],
+                    single_asset_dividends[
+                        single_asset_dividends["date"] >= portfolio_data.start_date
+                    ],
+                )
+                for ticker, (single_asset_prices, single_asset_dividends) in (
+                    self.asset_inputs.items()
+                )
+            }
+            benchmark_prices = self.benchmark_prices[
+                self.benchmark_prices["date"] >= portfolio_data.start_date
+            ]
+
+        scenario_transactions = _split_transactions(portfolio_data.transactions)
+        asset_models = {}
+        self.recomputed_tickers = []
+
+        for ticker in tickers:
+            # every loaded asset has actual transactions
+            if same_start and scenario_transactions[ticker].equals(self.asset_transactions[ticker]):
+                asset_models[ticker] = self.asset_models[ticker]
+                continue
+
+            asset_models[ticker] = modelling.model_asset(portfolio_data, *asset_inputs[ticker])
+            self.recomputed_tickers.append(ticker)
+
+        if same_start and tickers == list(self.asset_inputs):
+            asset_prices, asset_dividends = self.asset_prices, self.asset_dividends
+        else:
+            asset_prices = pd.concat([asset_inputs[ticker][0] for ticker in tickers])
+            asset_dividends = pd.concat([asset_inputs[ticker][1] for ticker in tickers])
+
+        outputs = model_portfolio_outputs(
+            portfolio_data,
+            asset_prices,
+            asset_dividends,
+            benchmark_prices,
+            asset_models=asset_models,
+        )
+
+        logger.info(f"Scenario modelled. Assets modelled again: {self.recomputed_tickers}.")
+
+        return outputs
+
+    def evaluate_many(
+        self, scenarios: Mapping[str, pd.DataFrame]
+    ) -> dict[str, dict[str, pd.DataFrame]]:
+        """Model the portfolio with several sets of transactions, one after the other.
+
+        Args:
+            scenarios: Transactions of each scenario, by scenario name, as in evaluate().
+
+        Returns:
+            Pipeline outputs of each scenario, by scenario name.
+        """
+        return {name: self.evaluate(transactions) for name, transactions in scenarios.items()}
+
+    def _get_portfolio_data(self, transactions: pd.DataFrame) -> PortfolioData:
+        """Validate the transactions of a scenario and build its portfolio data.
+
+        Args:
+            transactions: Transactions of the scenario.
+
+        Raises:
+            InvalidTransactionsError: Missing columns, no transactions, or transactions of
+                assets or dates without loaded market data.
+
+        Returns:
+            Portfolio data of the scenario.
+        """
+        if missing_columns := set(TRANSACTIONS_COLUMNS) - set(transactions.columns):
+            msg = f"Scenario transactions are missing the columns {sorted(missing_columns)}."
+            raise InvalidTransactionsError(msg)
+
+        transactions = (
+            transactions.loc[
+                transactions["date"] <= self.portfolio_data.end_date, TRANSACTIONS_COLUMNS
+            ]
+            .sort_values(by=["date", "ticker_asset"], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+
+        if transactions.empty:
+            msg = "Scenario has no transactions up to the end date."
+            raise InvalidTransactionsError(msg)
+
+        if unknown_tickers := set(transactions["ticker_asset"]) - self.asset_inputs.keys():
+            msg = (
+                f"No market data loaded for the tickers {sorted(unknown_tickers)} of the scenario."
+            )
+            raise InvalidTransactionsError(msg)
+
+        if (start_date := transactions["date"].min()) < self.portfolio_data.start_date:
+            msg = (
+                f"Scenario starts on {start_date.date()}, before the market data loaded from "
+                f"{self.portfolio_data.start_date.date()}."
+            )
+            raise InvalidTransactionsError(msg)
+
+        return PortfolioData(
+            transactions=transactions,
+            assets_info={
+                ticker: self.portfolio_data.assets_info[ticker]
+                for ticker in sorted(transactions["ticker_asset"].unique())
+            },
+            start_date=start_date,
+            end_date=self.portfolio_data.end_date,
+        )
+
+
+def _split_transactions(transactions: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Split the transactions by asset.
+
+    Args:
+        transactions: Transactions in the format of PortfolioData.transactions.
+
+    Returns:
+        Transactions of each asset, in the same order, by ticker.
+    """
+    return {
+        str(ticker): ticker_transactions.reset_index(drop=True)
+        for ticker, ticker_transactions in transactions.groupby("ticker_asset", sort=False)
+    }
@@ -0,0 +1,181 @@
+"""Long-running service that keeps the portfolio warm in memory and serves it over HTTP."""
+
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker.preprocessing import Preprocessor
+from stock_portfolio_tracker.utils import DataApiType
+
+from ._pipeline import run_preprocessing_and_modelling
+
+
+class PortfolioService:
+    def __init__(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+        refresh_interval: float,
+        *,
+        end_date: pd.Timestamp | None = None,
+        data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+        input_data_dir: Path = Path("data/in/"),
+    ) -> None:
+        """Initialize the service and compute the pipeline outputs for the first time.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            refresh_interval: Seconds between market data refreshes.
+            end_date: Fixed end date for the portfolio analysis. Defaults to None, which uses the
+                current date on every refresh.
+            data_api_type: Type of data API to use.
+            input_data_dir: Directory where input data files are located.
+        """
+        self.config_file_name = config_file_name
+        self.transactions_file_name = transactions_file_name
+        self.refresh_interval = refresh_interval
+        self.end_date = end_date
+        self.preprocessor = Preprocessor(
+            data_api_type=data_api_type.value,
+            input_data_dir=input_data_dir,
+            end_date=self._get_end_date(),
+            in_memory_market_data=True,
+        )
+        self.outputs: dict[str, pd.DataFrame] = {}
+        self.serialized_outputs: dict[str, bytes] = {}
+        self.last_refresh: pd.Timestamp | None = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Recompute the pipeline outputs, downloading only the market data not in memory yet."""
+        logger.info("Refreshing portfolio.")
+
+        self.preprocessor.end_date = self._get_end_date()
+
+        outputs = run_preprocessing_and_modelling(
+            self.preprocessor, self.config_file_name, self.transactions_file_name
+        )
+
+        # serialize once per refresh, so that requests are answered straight from memory
+        serialized_outputs = {
+            output_type: output.to_json(orient="records", date_format="iso").encode()
+            for output_type, output in outputs.items()
+        }
+
+        with self.lock:
+            self.outputs, self.serialized_outputs = outputs, serialized_outputs
+            self.last_refresh = pd.Timestamp.now()
+
+        logger.info("Portfolio refreshed.")
+
+    def serve(self, host: str, port: int) -> None:
+        """Serve the pipeline outputs over HTTP until interrupted, refreshing them periodically.
+
+        Endpoints:
+            - GET /outputs: Names of the available outputs and time of the last refresh.
+            - GET /outputs/<output_type>: Output as a list of JSON records.
+
+        Args:
+            host: Host to listen on.
+            port: Port to listen on.
+        """
+        server = self.create_server(host, port)
+        refresher = threading.Thread(target=self._refresh_periodically, daemon=True)
+        refresher.start()
+
+        logger.info(f"Serving portfolio on http://{host}:{server.server_address[1]}.")
+
+        try:
+            server.serve_forever()
+        finally:
+            self.stop_event.set()
+            server.server_close()
+
+    def create_server(self, host: str, port: int) -> ThreadingHTTPServer:
+        """Create the HTTP server answering requests from the outputs in memory.
+
+        Args:
+            host: Host to listen on.
+            port: Port to listen on. Use 0 to pick any free port.
+
+        Returns:
+            HTTP server, not started yet.
+        """
+        service = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                """Answer a GET request."""
+                path = self.path.rstrip("/")
+
+                with service.lock:
+                    serialized_outputs, last_refresh = (
+                        service.serialized_outputs,
+                        service.last_refresh,
+                    )
+
+                if path == "/outputs":
+                    self._respond(
+                        HTTPStatus.OK,
+                        json.dumps(
+                            {
+                                "outputs": list(serialized_outputs),
+                                "last_refresh": last_refresh.isoformat() if last_refresh else None,
+                            }
+                        ).encode(),
+                    )
+                elif path.removeprefix("/outputs/") in serialized_outputs:
+                    self._respond(HTTPStatus.OK, serialized_outputs[path.removeprefix("/outputs/")])
+                else:
+                    self._respond(HTTPStatus.NOT_FOUND, b'{"error": "Not found."}')
+
+            def _respond(self, status: HTTPStatus, body: bytes) -> None:
+                """Send a JSON response.
+
+                Args:
+                    status: HTTP status.
+                    body: JSON body.
+                """
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                """Log requests through loguru instead of stderr.
+
+                Args:
+                    format: Message format.
+                    args: Message arguments.
+                """
+                logger.debug(format % args)
+
+        return ThreadingHTTPServer((host, port), _RequestHandler)
+
+    def _refresh_periodically(self) -> None:
+        """Refresh the outputs every refresh_interval seconds until the service stops."""
+        while not self.stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:  # noqa: BLE001
+                # keep serving the latest outputs if a refresh fails, e.g. due to network issues
+                logger.exception("Portfolio refresh failed.")
+
+    def _get_end_date(self) -> pd.Timestamp:
+        """Get the end date for the next refresh.
+
+        Returns:
+            Fixed end date if there is one, or the current date otherwise.
+        """
+        return self.end_date or pd.Timestamp.today().normalize()
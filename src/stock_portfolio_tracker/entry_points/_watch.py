@@ -0,0 +1,185 @@
+"""Watch mode that recomputes the portfolio every time the input files change."""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker import modelling, postprocessing
+from stock_portfolio_tracker.preprocessing import Preprocessor
+from stock_portfolio_tracker.utils import DataApiType, OutputFormat, PortfolioData
+
+from ._pipeline import model_portfolio_outputs
+
+
+class PortfolioWatcher:
+    def __init__(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+        end_date: pd.Timestamp | None = None,
+        data_api_type: DataApiType = DataApiType.YAHOO_FINANCE,
+        input_data_dir: Path = Path("data/in/"),
+        *,
+        output_dir: Path | None = None,
+        output_format: OutputFormat = OutputFormat.PARQUET,
+        partition_by_date: bool = False,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            end_date: Fixed end date for the portfolio analysis. Defaults to None, which uses the
+                current date on every recomputation.
+            data_api_type: Type of data API to use.
+            input_data_dir: Directory where input data files are located.
+            output_dir: Directory to write the outputs to after every recomputation. Outputs are
+                only kept in memory if not given.
+            output_format: File format of the outputs. Defaults to parquet.
+            partition_by_date: Whether to write append-only partitions by month. Defaults to
+                False.
+        """
+        self.config_file_name = config_file_name
+        self.transactions_file_name = transactions_file_name
+        self.end_date = end_date
+        self.input_data_dir = input_data_dir
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.partition_by_date = partition_by_date
+        self.preprocessor = Preprocessor(
+            data_api_type=data_api_type.value,
+            input_data_dir=input_data_dir,
+            end_date=self._get_end_date(),
+            in_memory_market_data=True,
+        )
+        self.input_files: tuple[bytes, bytes] | None = None
+        self.asset_inputs: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]] = {}
+        self.asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self.recomputed_tickers: list[str] = []
+        self.outputs: dict[str, pd.DataFrame] = {}
+
+    def watch(self, poll_interval: float) -> None:
+        """Recompute the portfolio every time the input files change, until interrupted.
+
+        Args:
+            poll_interval: Seconds between checks for changes in the input files.
+        """
+        logger.info(
+            f"Watching {self.config_file_name} and {self.transactions_file_name} for changes."
+        )
+
+        while True:
+            try:
+                self.update()
+            except Exception:  # noqa: BLE001
+                # the files may be halfway through an edit, so wait for the next change
+                logger.exception("Portfolio could not be recomputed.")
+
+            time.sleep(poll_interval)
+
+    def update(self) -> bool:
+        """Recompute the portfolio if the input files changed since the last update.
+
+        Only the assets whose transactions or market data changed are modelled again, while the
+        rest reuse the model of the previous update. Market data is kept in memory, so only new
+        tickers are downloaded. The outputs are written to the output directory, if there is one.
+
+        Returns:
+            Whether the portfolio was recomputed.
+        """
+        input_files = (
+            (self.input_data_dir / self.config_file_name).read_bytes(),
+            (self.input_data_dir / self.transactions_file_name).read_bytes(),
+        )
+
+        if input_files == self.input_files:
+            return False
+
+        self.input_files = input_files
+
+        logger.info("Input files changed, recomputing portfolio.")
+
+        self.preprocessor.end_date = self._get_end_date()
+        self.recomputed_tickers = []
+
+        _, portfolio_data, asset_prices, asset_dividends, benchmark_prices, _ = (
+            self.preprocessor.preprocess(
+                self.config_file_name,
+                self.transactions_file_name,
+                on_asset_loaded=self._model_asset_on_load,
+            )
+        )
+
+        # forget the assets that are not in the portfolio anymore
+        for ticker in self.asset_models.keys() - portfolio_data.assets_info.keys():
+            del self.asset_models[ticker], self.asset_inputs[ticker]
+
+        self.outputs = model_portfolio_outputs(
+            portfolio_data,
+            asset_prices,
+            asset_dividends,
+            benchmark_prices,
+            asset_models=self.asset_models,
+        )
+
+        logger.info(
+            f"Portfolio recomputed. Assets modelled again: {sorted(self.recomputed_tickers)}."
+        )
+
+        if self.output_dir is not None:
+            postprocessing.write_outputs(
+                self.outputs,
+                output_dir=self.output_dir,
+                end_date=self.preprocessor.end_date,
+                output_format=self.output_format,
+                partition_by_date=self.partition_by_date,
+            )
+
+        return True
+
+    def _model_asset_on_load(
+        self,
+        portfolio_data: PortfolioData,
+        asset_prices: pd.DataFrame,
+        asset_dividends: pd.DataFrame,
+    ) -> None:
+        """Model an asset as soon as it is loaded, unless its inputs are the same as in the
+        previous update.
+
+        Args:
+            portfolio_data: Transactions history and other portfolio data.
+            asset_prices: Daily prices of the asset.
+            asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        """
+        ticker = asset_prices["ticker_asset"].iloc[0]
+        asset_inputs = (
+            portfolio_data.transactions[
+                portfolio_data.transactions["ticker_asset"] == ticker
+            ].reset_index(drop=True),
+            asset_prices,
+            asset_dividends,
+        )
+
+        if ticker in self.asset_inputs and all(
+            previous_input.equals(asset_input)
+            for previous_input, asset_input in zip(
+                self.asset_inputs[ticker], asset_inputs, strict=True
+            )
+        ):
+            return
+
+        self.asset_models[ticker] = modelling.model_asset(
+            portfolio_data, asset_prices, asset_dividends
+        )
+        self.asset_inputs[ticker] = asset_inputs
+        self.recomputed_tickers.append(ticker)
+
+    def _get_end_date(self) -> pd.Timestamp:
+        """Get the end date for the next recomputation.
+
+        Returns:
+            Fixed end date if there is one, or the current date otherwise.
+        """
+        return self.end_date or pd.Timestamp.today().normalize()
@@ -1,5 +1,15 @@
 """Exceptions."""
 
-from ._exceptions import UnsortedError, YahooFinanceError
+from ._exceptions import (
+    InvalidTransactionsError,
+    MissingDependencyError,
+    UnsortedError,
+    YahooFinanceError,
+)
 
-__all__ = ["UnsortedError", "YahooFinanceError"]
+__all__ = [
+    "InvalidTransactionsError",
+    "MissingDependencyError",
+    "UnsortedError",
+    "YahooFinanceError",
+]
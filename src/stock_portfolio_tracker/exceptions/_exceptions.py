@@ -25,3 +25,29 @@ class UnsortedError(Exception):
             msg: Custom error message. Defaults to None.
         """
         super().__init__(msg or "The data is not sorted as expected.")
+
+
+class MissingDependencyError(Exception):
+    """Error with an optional dependency that is not installed."""
+
+    def __init__(self, msg: None | str = None) -> None:
+        """Provide the error message or return default.
+
+        Args:
+            self: Own class.
+            msg: Custom error message. Defaults to None.
+        """
+        super().__init__(msg or "An optional dependency is not installed.")
+
+
+class InvalidTransactionsError(Exception):
+    """Error with the content of the transactions file."""
+
+    def __init__(self, msg: None | str = None) -> None:
+        """Provide the error message or return default.
+
+        Args:
+            self: Own class.
+            msg: Custom error message. Defaults to None.
+        """
+        super().__init__(msg or "The transactions file is not valid.")
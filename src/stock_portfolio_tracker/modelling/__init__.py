@@ -1,5 +1,26 @@
 """Modelling."""
 
-from ._modelling import model_data
+from ._intraday import IntradayValuator
+from ._kernels import KernelService, kernel_service
+from ._modelling import (
+    model_asset_distribution,
+    model_data,
+    model_data_in_chunks,
+    model_data_out_of_core,
+    model_data_without_benchmarks,
+)
+from ._modelling_portfolio import model_asset
+from ._projection import model_projection
 
-__all__ = ["model_data"]
+__all__ = [
+    "IntradayValuator",
+    "KernelService",
+    "kernel_service",
+    "model_asset",
+    "model_asset_distribution",
+    "model_data",
+    "model_data_in_chunks",
+    "model_data_out_of_core",
+    "model_data_without_benchmarks",
+    "model_projection",
+]
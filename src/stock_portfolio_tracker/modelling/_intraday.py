@@ -0,0 +1,133 @@
+"""Valuation of the portfolio during the trading day, tick by tick."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker.utils import PortfolioData, Tick
+
+from . import _modelling_portfolio as modelling_portfolio
+
+
+class IntradayValuator:
+    """Current value, gains and allocation of the portfolio during the trading day.
+
+    The holdings at the end of end date, and the money put in and taken out of the portfolio up
+    to then, are modelled once. Each tick then only updates the price of its asset, and the value
+    of the portfolio is the sum over the holdings, so no history is modelled again until the next
+    day.
+    """
+
+    def __init__(
+        self,
+        portfolio_data: PortfolioData,
+        asset_prices: pd.DataFrame,
+        exchange_rates: dict[str, float],
+    ) -> None:
+        """Initialize the valuator with the state of the portfolio at the end of end date.
+
+        Args:
+            portfolio_data: Transactions history and other portfolio data.
+            asset_prices: Daily prices of each asset up to end date, in portfolio currency.
+            exchange_rates: Exchange rate of each asset ticker, as units of the currency of the
+                asset per unit of the portfolio currency, to convert the prices of the ticks.
+        """
+        logger.info("Modelling end of day holdings.")
+
+        eod_holdings = modelling_portfolio.model_eod_holdings(
+            portfolio_data,
+            asset_prices,
+            sorting_columns=[{"columns": ["ticker_asset"], "ascending": [True]}],
+        )
+
+        self.tickers: list[str] = eod_holdings["ticker_asset"].tolist()
+        self.positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+        self.qty = eod_holdings["curr_qty_asset"].to_numpy(dtype=np.float64)
+        self.prices = eod_holdings["close_unadj_local_currency_asset"].to_numpy(
+            dtype=np.float64, copy=True
+        )
+        self.exchange_rates = np.array(
+            [exchange_rates[ticker] for ticker in self.tickers], dtype=np.float64
+        )
+
+        # money put in the portfolio (purchases, as negative values) and taken out of it (sales)
+        # so far, as in utils.calc_simple_return_daily()
+        trans_val = portfolio_data.transactions["trans_val_asset"].to_numpy(dtype=np.float64)
+        self.money_out = float(np.minimum(trans_val, 0).sum())
+        self.sales = float(np.maximum(trans_val, 0).sum())
+
+        self.timestamp = portfolio_data.end_date
+        self.lock = threading.Lock()
+
+    def update(self, tick: Tick) -> bool:
+        """Update the price of an asset with a tick, in constant time.
+
+        Args:
+            tick: Latest price of the asset, in the currency of the asset.
+
+        Returns:
+            Whether the asset of the tick is held, so the portfolio changed.
+        """
+        if (position := self.positions.get(tick.ticker)) is None:
+            return False
+
+        with self.lock:
+            self.prices[position] = tick.price / self.exchange_rates[position]
+            self.timestamp = tick.timestamp
+
+        return True
+
+    def get_portfolio_value(self) -> pd.DataFrame:
+        """Get the current value and gains of the portfolio, in time proportional to the number
+        of holdings.
+
+        Returns:
+            Dataframe with a row with the time of the latest tick, the current value and the
+            absolute and percentage gains of the portfolio, as in the portfolio evolution.
+        """
+        with self.lock:
+            curr_val = float(self.qty @ self.prices)
+            timestamp = self.timestamp
+
+        money_in = curr_val + self.sales
+
+        return pd.DataFrame(
+            {
+                "timestamp": [timestamp],
+                "curr_val_portfolio": [round(curr_val, 2)],
+                "curr_abs_gain_portfolio": [round(self.money_out + money_in, 2)],
+                "curr_perc_gain_portfolio": [
+                    round((abs(money_in / self.money_out) - 1) * 100, 2)
+                    if self.money_out != 0
+                    else 0.0
+                ],
+            }
+        )
+
+    def get_asset_distribution(self) -> pd.DataFrame:
+        """Get the current value and allocation of each asset, in time proportional to the number
+        of holdings.
+
+        Returns:
+            Dataframe with the quantity, value and percentage of the portfolio of each asset, as
+            in the asset distribution, sorted by descending value.
+        """
+        with self.lock:
+            curr_val = self.qty * self.prices
+            timestamp = self.timestamp
+
+        return (
+            pd.DataFrame(
+                {
+                    "timestamp": timestamp,
+                    "ticker_asset": self.tickers,
+                    "curr_qty_asset": self.qty,
+                    "curr_val_asset": np.round(curr_val, 2),
+                    "percent": np.round(curr_val / curr_val.sum() * 100, 2),
+                }
+            )
+            .sort_values(["curr_val_asset"], ascending=False)
+            .reset_index(drop=True)
+        )
@@ -0,0 +1,231 @@
+"""Kernels of the sequential recurrences of the modelling, which cannot be vectorized.
+
+Every kernel is a plain loop over NumPy arrays. If numba is installed, the kernels are compiled
+with it on first use, and otherwise they run as they are in Python.
+"""
+
+import functools
+import threading
+from collections.abc import Callable
+from importlib.util import find_spec
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from stock_portfolio_tracker.exceptions import MissingDependencyError
+from stock_portfolio_tracker.utils import KernelBackend
+
+
+class KernelService:
+    """Backend the kernels run with, and the kernels compiled so far, so each kernel is compiled
+    only once per process.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the service, with numba as backend if it is installed."""
+        self.backend = KernelBackend.NUMBA if find_spec("numba") else KernelBackend.PYTHON
+        self.compiled_kernels: dict[Callable[..., Any], Callable[..., Any]] = {}
+        self.lock = threading.Lock()
+
+    def set_backend(self, backend: KernelBackend) -> None:
+        """Set the backend the kernels run with.
+
+        Args:
+            backend: Kernel backend.
+
+        Raises:
+            MissingDependencyError: Numba backend without numba installed.
+        """
+        if backend == KernelBackend.NUMBA and find_spec("numba") is None:
+            msg = (
+                "numba is needed to compile the kernels. Install it with "
+                "`pip install stock-portfolio-tracker[numba]` or use the python backend instead."
+            )
+            raise MissingDependencyError(msg)
+
+        self.backend = backend
+
+    def get_kernel[**P, T](self, func: Callable[P, T]) -> Callable[P, T]:
+        """Get a kernel for the current backend, compiling it the first time.
+
+        Args:
+            func: Python implementation of the kernel.
+
+        Returns:
+            Kernel.
+        """
+        if self.backend == KernelBackend.PYTHON:
+            return func
+
+        with self.lock:
+            if func not in self.compiled_kernels:
+                import numba  # type: ignore  # noqa: PLC0415
+
+                # numpy error model, so that divisions by zero give inf or nan as in python
+                self.compiled_kernels[func] = numba.njit(cache=True, error_model="numpy")(func)
+
+            compiled_kernel: Callable[P, T] = self.compiled_kernels[func]
+
+        return compiled_kernel
+
+
+kernel_service = KernelService()
+
+
+def kernel[**P, T](func: Callable[P, T]) -> Callable[P, T]:
+    """Run a function with the backend of the global kernel service.
+
+    Args:
+        func: Python implementation of the kernel.
+
+    Returns:
+        Kernel.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return kernel_service.get_kernel(func)(*args, **kwargs)
+
+    return wrapper
+
+
+@kernel
+def curr_qty_kernel(
+    trans_qty: npt.NDArray[np.float64],
+    split: npt.NDArray[np.float64],
+    initial_qty: float = 0.0,
+) -> npt.NDArray[np.float64]:
+    """Calculate the quantity of shares held on each row, from the oldest row (the last one) to
+    the newest, compounding the stock splits.
+
+    Args:
+        trans_qty: Quantity bought or sold on each row, by descending date.
+        split: Stock split of each row.
+        initial_qty: Quantity of shares held before the oldest row, to carry the quantity over
+            from the rows before when they are processed in blocks. Defaults to 0.
+
+    Returns:
+        Quantity of shares held on each row.
+    """
+    curr_qty = np.zeros(len(trans_qty), dtype=np.float64)
+    latest_qty = initial_qty
+
+    for i in range(len(trans_qty) - 1, -1, -1):
+        latest_qty = trans_qty[i] + latest_qty * split[i]
+        curr_qty[i] = latest_qty
+
+    return curr_qty
+
+
+@kernel
+def event_qty_kernel(
+    new_ticker: npt.NDArray[np.bool_],
+    trans_qty: npt.NDArray[np.float64],
+    split: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Calculate the quantity of shares held after each transaction or stock split, with the same
+    recurrence as curr_qty_kernel() but from the first row to the last.
+
+    Args:
+        new_ticker: Whether each row is the first one of its ticker.
+        trans_qty: Quantity bought or sold on each row, in processing order.
+        split: Stock split of each row.
+
+    Returns:
+        Quantity of shares held after each row.
+    """
+    curr_qty = np.zeros(len(trans_qty), dtype=np.float64)
+
+    for i in range(len(trans_qty)):
+        curr_qty[i] = trans_qty[i] + (0.0 if new_ticker[i] else curr_qty[i - 1] * split[i])
+
+    return curr_qty
+
+
+@kernel
+def benchmark_proportional_kernel(
+    split_benchmark: npt.NDArray[np.float64],
+    trans_qty_asset: npt.NDArray[np.float64],
+    trans_val_asset: npt.NDArray[np.float64],
+    prev_qty_asset: npt.NDArray[np.float64],
+    close_unadj_local_currency_benchmark: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Calculate the quantity of benchmark bought or sold on each row to mirror the transactions
+    of the asset in proportion, from the oldest row (the last one) to the newest. The first
+    purchase, and the first one after selling everything, buys the same value of benchmark.
+
+    Args:
+        split_benchmark: Stock split of the benchmark on each row, by descending date.
+        trans_qty_asset: Quantity of the asset bought or sold on each row.
+        trans_val_asset: Value of the asset bought or sold on each row.
+        prev_qty_asset: Quantity of the asset held on the row before (the next one), adjusted
+            by the stock split of each row.
+        close_unadj_local_currency_benchmark: Price of the benchmark on each row.
+
+    Returns:
+        Quantity of benchmark bought or sold on each row.
+    """
+    df_len = len(split_benchmark)
+    trans_qty_benchmark = np.zeros(df_len, dtype=np.float64)
+    latest_curr_qty_benchmark = 0.0
+    ever_purchased = False
+
+    for i in range(df_len - 1, -1, -1):
+        latest_curr_qty_benchmark *= split_benchmark[i]
+
+        if not ever_purchased and trans_qty_asset[i] != 0:
+            trans_qty_benchmark[i] = -trans_val_asset[i] / close_unadj_local_currency_benchmark[i]
+            latest_curr_qty_benchmark += trans_qty_benchmark[i]
+            ever_purchased = True
+
+        elif trans_qty_asset[i] != 0:
+            trans_qty_benchmark[i] = (
+                (trans_qty_asset[i] + prev_qty_asset[i]) / prev_qty_asset[i] - 1
+            ) * latest_curr_qty_benchmark
+            latest_curr_qty_benchmark += trans_qty_benchmark[i]
+
+            if latest_curr_qty_benchmark == 0:
+                ever_purchased = False
+
+    return trans_qty_benchmark
+
+
+@kernel
+def group_sum_kernel(
+    labels: npt.NDArray[np.int64],
+    values: npt.NDArray[np.float64],
+    sums: npt.NDArray[np.float64],
+    compensations: npt.NDArray[np.float64],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Add values to the sum of their group in row order, with the same compensated (Kahan)
+    summation as the groupby sums of pandas, so that sums accumulated over several calls are
+    identical to the pandas sum of all the values at once. Missing values are skipped.
+
+    Args:
+        labels: Group of each value.
+        values: Values to add.
+        sums: Sum of each group so far.
+        compensations: Compensation of the rounding error of each group sum so far.
+
+    Returns:
+        Sum and compensation of each group.
+    """
+    sums, compensations = sums.copy(), compensations.copy()
+
+    for i in range(len(values)):
+        if np.isnan(values[i]):
+            continue
+
+        label = labels[i]
+        compensated_value = values[i] - compensations[label]
+        new_sum = sums[label] + compensated_value
+        compensations[label] = new_sum - sums[label] - compensated_value
+
+        # as in pandas, the compensation is reset when it is lost to infinite sums
+        if np.isnan(compensations[label]):
+            compensations[label] = 0.0
+
+        sums[label] = new_sum
+
+    return sums, compensations
@@ -1,19 +1,39 @@
 """Calculate all necessary metrics."""
 
+import pickle
+from collections.abc import Callable, Iterable
+from functools import reduce
+from pathlib import Path
+from typing import Any
+
 import pandas as pd
 from loguru import logger
 
-from stock_portfolio_tracker.utils import PortfolioData
+from stock_portfolio_tracker.utils import (
+    ColumnStore,
+    PortfolioData,
+    StageCache,
+    record_metrics,
+    run_stage,
+)
 
 from . import _modelling_benchmark as modelling_benchmark
 from . import _modelling_portfolio as modelling_portfolio
 
+# default number of days modelled at a time out of core, which bounds the memory needed per asset
+BLOCK_DAYS = 365
+
 
+@record_metrics()
 def model_data(
     portfolio_data: PortfolioData,
     asset_prices: pd.DataFrame,
     asset_dividends: pd.DataFrame,
     benchmark_prices: pd.DataFrame,
+    *,
+    cache: StageCache | None = None,
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] | None = None,
+    on_portfolio_model: Callable[[pd.DataFrame], Any] | None = None,
 ) -> tuple[
     pd.DataFrame,
     pd.DataFrame,
@@ -24,16 +44,24 @@ def model_data(
 ]:
     """Calculate all necessary metrics.
 
+    The portfolio is modelled once and then compared against every benchmark in benchmark_prices.
+    With more than one benchmark, the benchmark columns of the outputs are suffixed with the
+    benchmark ticker, and assets_vs_benchmark is sorted against the first benchmark.
+
     Args:
         portfolio_data: Transactions history and other portfolio data.
-        asset_prices: Benchmark historical data.
-        asset_dividends: Asset prices historical data.
-        benchmark_prices: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        asset_prices: Asset prices historical data.
+        asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        benchmark_prices: Benchmark historical data, for one or more benchmarks.
+        cache: Stage cache to reuse the results of previous runs. Defaults to None.
+        asset_models: Output of model_asset() for the assets that are already modelled, by
+            ticker. Defaults to None.
+        on_portfolio_model: Function called with the daily model of every asset, sorted by
+            ticker and descending date, once modelled. Defaults to None.
 
     Returns:
         Relevant modelled data.
     """
-    logger.info("Modelling portfolio.")
     (
         portfolio_evolution,
         asset_distribution,
@@ -41,52 +69,517 @@ def model_data(
         dividends_company,
         dividends_year,
         portfolio_returns,
-    ) = modelling_portfolio.model_portfolio(
+    ) = _model_portfolio(
+        portfolio_data,
+        asset_prices,
+        asset_dividends,
+        cache=cache,
+        asset_models=asset_models,
+        on_portfolio_model=on_portfolio_model,
+    )
+
+    single_benchmark_prices = _split_benchmark_prices(benchmark_prices)
+    assets_vs_benchmarks = {}
+
+    for benchmark_ticker, benchmark_ticker_prices in single_benchmark_prices.items():
+        logger.info(f"Modelling assets vs benchmark {benchmark_ticker}.")
+        assets_vs_benchmarks[benchmark_ticker] = run_stage(
+            cache,
+            "assets_vs_benchmark",
+            (portfolio_model, benchmark_ticker_prices),
+            modelling_benchmark.model_assets_vs_benchmark,
+            portfolio_model,
+            benchmark_ticker_prices,
+            sorting_columns=[{"columns": ["diff"], "ascending": [False]}],
+        ).drop(columns=["diff"])
+
+    return _compare_to_benchmarks(
+        portfolio_data,
+        single_benchmark_prices,
+        (
+            portfolio_evolution,
+            asset_distribution,
+            dividends_company,
+            dividends_year,
+            portfolio_returns,
+        ),
+        assets_vs_benchmarks,
+        cache,
+    )
+
+
+@record_metrics()
+def model_data_without_benchmarks(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+    *,
+    cache: StageCache | None = None,
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] | None = None,
+    on_portfolio_model: Callable[[pd.DataFrame], Any] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Calculate the metrics of model_data() that do not compare the portfolio to a benchmark.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Asset prices historical data.
+        asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        cache: Stage cache to reuse the results of previous runs. Defaults to None.
+        asset_models: Output of model_asset() for the assets that are already modelled, by
+            ticker. Defaults to None.
+        on_portfolio_model: Function called with the daily model of every asset, sorted by
+            ticker and descending date, once modelled. Defaults to None.
+
+    Returns:
+        Asset distribution, dividends per company and dividends per year.
+    """
+    _, asset_distribution, _, dividends_company, dividends_year, _ = _model_portfolio(
         portfolio_data,
         asset_prices,
         asset_dividends,
+        cache=cache,
+        asset_models=asset_models,
+        on_portfolio_model=on_portfolio_model,
+    )
+
+    logger.info("End of modelling.")
+
+    return asset_distribution, dividends_company, dividends_year
+
+
+@record_metrics()
+def model_asset_distribution(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    cache: StageCache | None = None,
+) -> pd.DataFrame:
+    """Calculate the asset distribution of model_data() from the transactions, stock splits and
+    prices at end date only, without modelling the daily history of the portfolio.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Asset prices historical data.
+        cache: Stage cache to reuse the results of previous runs. Defaults to None.
+
+    Returns:
+        Asset distribution.
+    """
+    logger.info("Modelling holdings.")
+
+    asset_distribution: pd.DataFrame = run_stage(
+        cache,
+        "holdings",
+        (portfolio_data, asset_prices),
+        modelling_portfolio.model_holdings,
+        portfolio_data,
+        asset_prices,
+        sorting_columns=[{"columns": ["curr_val_asset"], "ascending": [False]}],
+    )
+
+    logger.info("End of modelling.")
+
+    return asset_distribution
+
+
+@record_metrics()
+def model_data_in_chunks(
+    portfolio_data: PortfolioData,
+    asset_chunks: Iterable[tuple[pd.DataFrame, pd.DataFrame]],
+    benchmark_prices: pd.DataFrame,
+    spill_dir: Path,
+) -> tuple[
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+]:
+    """Calculate the same metrics as model_data(), holding the prices of only one chunk of assets
+    in memory at a time.
+
+    Each asset is modelled and compared against the benchmarks as soon as its chunk is loaded.
+    Only the columns needed to aggregate the portfolio are kept, and they are spilled to disk
+    until every chunk is done, when the portfolio is aggregated as in model_data().
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_chunks: Prices and dividends of the assets, one chunk of tickers at a time, in
+            ascending ticker order.
+        benchmark_prices: Benchmark historical data, for one or more benchmarks.
+        spill_dir: Directory to spill the results of each chunk to.
+
+    Returns:
+        Relevant modelled data.
+    """
+    single_benchmark_prices = _split_benchmark_prices(benchmark_prices)
+    spill_files = []
+
+    for chunk_number, (asset_prices, asset_dividends) in enumerate(asset_chunks):
+        logger.info(f"Modelling chunk {chunk_number} of assets.")
+
+        asset_models, dividends, asset_comparisons = [], [], []
+
+        for (_, single_asset_prices), (_, single_asset_dividends) in zip(
+            asset_prices.groupby("ticker_asset"),
+            asset_dividends.groupby("ticker_asset"),
+            strict=True,
+        ):
+            asset_model, asset_model_dividends = modelling_portfolio.model_asset(
+                portfolio_data, single_asset_prices, single_asset_dividends
+            )
+            asset_comparisons.append(
+                {
+                    benchmark_ticker: modelling_benchmark.compare_asset_to_benchmark(
+                        asset_model, benchmark_ticker_prices
+                    )
+                    for benchmark_ticker, benchmark_ticker_prices in single_benchmark_prices.items()
+                }
+            )
+
+            # keep only what the aggregation needs, so the full models are freed
+            compact_model, compact_dividends = modelling_portfolio.compact_asset_model(
+                asset_model, asset_model_dividends
+            )
+            asset_models.append(compact_model)
+            dividends.append(compact_dividends)
+
+        spill_files.append(spill_dir / f"chunk_{chunk_number}.pkl")
+
+        with spill_files[-1].open("wb") as file:
+            pickle.dump((pd.concat(asset_models), pd.concat(dividends), asset_comparisons), file)
+
+    logger.info("Aggregating portfolio.")
+
+    asset_models, dividends, asset_comparisons = [], [], []
+
+    for spill_file in spill_files:
+        with spill_file.open("rb") as file:
+            chunk_asset_models, chunk_dividends, chunk_asset_comparisons = pickle.load(file)  # noqa: S301
+
+        asset_models.append(chunk_asset_models)
+        dividends.append(chunk_dividends)
+        asset_comparisons.extend(chunk_asset_comparisons)
+
+    portfolio_outputs = modelling_portfolio.aggregate_portfolio(
+        portfolio_data,
+        pd.concat(asset_models).reset_index(drop=True),
+        pd.concat(dividends),
         sorting_columns=[
             {"columns": ["date"], "ascending": [False]},
             {"columns": ["curr_val_asset"], "ascending": [False]},
-            {"columns": ["ticker_asset", "date"], "ascending": [True, False]},
             {"columns": ["total_dividend_asset"], "ascending": [True]},
             {"columns": ["date"], "ascending": [True]},
             {"columns": ["metric_type", "unit_type", "year"], "ascending": [True, True, False]},
         ],
     )
 
-    logger.info("Modelling benchmark.")
-    benchmark_evolution, benchmark_returns = modelling_benchmark.model_benchmark(
+    return _compare_to_benchmarks(
         portfolio_data,
-        benchmark_prices,
+        single_benchmark_prices,
+        portfolio_outputs,
+        {
+            benchmark_ticker: modelling_benchmark.build_assets_vs_benchmark(
+                [asset_comparison[benchmark_ticker] for asset_comparison in asset_comparisons],
+                sorting_columns=[{"columns": ["diff"], "ascending": [False]}],
+            ).drop(columns=["diff"])
+            for benchmark_ticker in single_benchmark_prices
+        },
+    )
+
+
+@record_metrics()
+def model_data_out_of_core(
+    portfolio_data: PortfolioData,
+    price_store: ColumnStore,
+    model_store: ColumnStore,
+    benchmark_prices: pd.DataFrame,
+    block_days: int = BLOCK_DAYS,
+) -> tuple[
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+]:
+    """Calculate the same metrics as model_data(), with the daily data of the assets read from
+    memory-mapped column files, one block of days of one asset at a time.
+
+    The model of each asset is written to the model store, and read back one asset at a time to
+    compare it against the benchmarks, so at most the history of a single asset is in memory.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        price_store: Daily data of each asset, as stored by
+            Preprocessor.preprocess_out_of_core().
+        model_store: Empty column store to write the daily model of each asset to.
+        benchmark_prices: Benchmark historical data, for one or more benchmarks.
+        block_days: Number of days to model at a time. Defaults to BLOCK_DAYS.
+
+    Returns:
+        Relevant modelled data.
+    """
+    logger.info(f"Modelling portfolio in blocks of {block_days} days.")
+
+    portfolio_outputs = modelling_portfolio.model_portfolio_out_of_core(
+        portfolio_data,
+        price_store,
+        model_store,
+        block_days,
         sorting_columns=[
             {"columns": ["date"], "ascending": [False]},
+            {"columns": ["curr_val_asset"], "ascending": [False]},
+            {"columns": ["total_dividend_asset"], "ascending": [True]},
+            {"columns": ["date"], "ascending": [True]},
             {"columns": ["metric_type", "unit_type", "year"], "ascending": [True, True, False]},
         ],
     )
 
-    logger.info("Modelling assets vs benchmark.")
-    assets_vs_benchmark = modelling_benchmark.model_assets_vs_benchmark(
-        portfolio_model,
-        benchmark_prices,
-        sorting_columns=[{"columns": ["diff"], "ascending": [False]}],
-    ).drop(columns=["diff"])
+    single_benchmark_prices = _split_benchmark_prices(benchmark_prices)
+    asset_comparisons = []
+
+    for ticker in sorted(portfolio_data.assets_info):
+        asset_model = modelling_portfolio.read_asset_model(ticker, model_store)
+        asset_comparisons.append(
+            {
+                benchmark_ticker: modelling_benchmark.compare_asset_to_benchmark(
+                    asset_model, benchmark_ticker_prices
+                )
+                for benchmark_ticker, benchmark_ticker_prices in single_benchmark_prices.items()
+            }
+        )
+
+    return _compare_to_benchmarks(
+        portfolio_data,
+        single_benchmark_prices,
+        portfolio_outputs,
+        {
+            benchmark_ticker: modelling_benchmark.build_assets_vs_benchmark(
+                [asset_comparison[benchmark_ticker] for asset_comparison in asset_comparisons],
+                sorting_columns=[{"columns": ["diff"], "ascending": [False]}],
+            ).drop(columns=["diff"])
+            for benchmark_ticker in single_benchmark_prices
+        },
+    )
+
+
+def _model_portfolio(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+    *,
+    cache: StageCache | None,
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] | None,
+    on_portfolio_model: Callable[[pd.DataFrame], Any] | None = None,
+) -> tuple[
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+]:
+    """Model the portfolio, from the cache if possible.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Asset prices historical data.
+        asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+        cache: Stage cache to reuse the results of previous runs.
+        asset_models: Output of model_asset() for the assets that are already modelled, by
+            ticker.
+        on_portfolio_model: Function called with the daily model of every asset once modelled.
+            Defaults to None.
+
+    Returns:
+        Output of modelling_portfolio.model_portfolio().
+    """
+    logger.info("Modelling portfolio.")
+
+    portfolio_outputs: tuple[
+        pd.DataFrame,
+        pd.DataFrame,
+        pd.DataFrame,
+        pd.DataFrame,
+        pd.DataFrame,
+        pd.DataFrame,
+    ] = run_stage(
+        cache,
+        "portfolio_model",
+        (portfolio_data, asset_prices, asset_dividends),
+        modelling_portfolio.model_portfolio,
+        portfolio_data,
+        asset_prices,
+        asset_dividends,
+        sorting_columns=[
+            {"columns": ["date"], "ascending": [False]},
+            {"columns": ["curr_val_asset"], "ascending": [False]},
+            {"columns": ["ticker_asset", "date"], "ascending": [True, False]},
+            {"columns": ["total_dividend_asset"], "ascending": [True]},
+            {"columns": ["date"], "ascending": [True]},
+            {"columns": ["metric_type", "unit_type", "year"], "ascending": [True, True, False]},
+        ],
+        asset_models=asset_models,
+    )
+
+    if on_portfolio_model is not None:
+        on_portfolio_model(portfolio_outputs[2])
+
+    return portfolio_outputs
+
+
+def _split_benchmark_prices(benchmark_prices: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Split the prices of several benchmarks by benchmark.
+
+    Args:
+        benchmark_prices: Benchmark historical data, for one or more benchmarks.
+
+    Returns:
+        Historical data of each benchmark, in order of appearance.
+    """
+    return {
+        benchmark_ticker: benchmark_prices[
+            benchmark_prices["ticker_benchmark"] == benchmark_ticker
+        ].reset_index(drop=True)
+        for benchmark_ticker in benchmark_prices["ticker_benchmark"].unique().tolist()
+    }
+
+
+def _compare_to_benchmarks(
+    portfolio_data: PortfolioData,
+    single_benchmark_prices: dict[str, pd.DataFrame],
+    portfolio_outputs: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame],
+    assets_vs_benchmarks: dict[str, pd.DataFrame],
+    cache: StageCache | None = None,
+) -> tuple[
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+    pd.DataFrame,
+]:
+    """Model every benchmark and gather the comparison of the portfolio against all of them.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        single_benchmark_prices: Historical data of each benchmark.
+        portfolio_outputs: Portfolio evolution, asset distribution, dividends per company and
+            year and returns of the portfolio.
+        assets_vs_benchmarks: Comparison of the assets against each benchmark.
+        cache: Stage cache to reuse the results of previous runs. Defaults to None.
+
+    Returns:
+        Relevant modelled data.
+    """
+    (
+        portfolio_evolution,
+        asset_distribution,
+        dividends_company,
+        dividends_year,
+        portfolio_returns,
+    ) = portfolio_outputs
+
+    portfolio_evolution_vs_benchmarks, summary_returns = portfolio_evolution, portfolio_returns
+    suffixed_assets_vs_benchmarks = []
+
+    for benchmark_ticker, benchmark_ticker_prices in single_benchmark_prices.items():
+        suffix = f"_{benchmark_ticker}" if len(single_benchmark_prices) > 1 else ""
+
+        logger.info(f"Modelling benchmark {benchmark_ticker}.")
+        benchmark_evolution, benchmark_returns = run_stage(
+            cache,
+            "benchmark_model",
+            (portfolio_data, benchmark_ticker_prices),
+            modelling_benchmark.model_benchmark,
+            portfolio_data,
+            benchmark_ticker_prices,
+            sorting_columns=[
+                {"columns": ["date"], "ascending": [False]},
+                {"columns": ["metric_type", "unit_type", "year"], "ascending": [True, True, False]},
+            ],
+        )
+
+        portfolio_evolution_vs_benchmarks = portfolio_evolution_vs_benchmarks.merge(
+            _compare_evolution_to_benchmark(portfolio_evolution, benchmark_evolution).pipe(
+                _add_suffix, suffix, keys=["date"]
+            ),
+            on="date",
+            how="left",
+        )
+        summary_returns = summary_returns.merge(
+            benchmark_returns.pipe(_add_suffix, suffix, keys=["metric_type", "unit_type", "year"]),
+            how="left",
+            on=["metric_type", "unit_type", "year"],
+        )
+        suffixed_assets_vs_benchmarks.append(
+            assets_vs_benchmarks[benchmark_ticker].pipe(
+                _add_suffix,
+                suffix,
+                keys=["ticker_asset", "curr_perc_gain_asset", "position_status"],
+            )
+        )
 
     logger.info("End of modelling.")
 
     return (
-        portfolio_evolution.merge(benchmark_evolution, on="date", how="left").assign(
-            curr_val_diff=lambda df: df["curr_val_portfolio"] - df["curr_val_benchmark"],
-            curr_abs_gain_diff=lambda df: df["curr_abs_gain_portfolio"]
-            - df["curr_abs_gain_benchmark"],
-            curr_perc_gain_diff=lambda df: df["curr_perc_gain_portfolio"]
-            - df["curr_perc_gain_benchmark"],
-        ),
+        portfolio_evolution_vs_benchmarks,
         asset_distribution,
-        assets_vs_benchmark,
+        reduce(
+            lambda left, right: left.merge(
+                right.drop(columns=["curr_perc_gain_asset", "position_status"]),
+                how="left",
+                on=["ticker_asset"],
+            ),
+            suffixed_assets_vs_benchmarks,
+        ),
         dividends_company,
         dividends_year,
-        portfolio_returns.merge(
-            benchmark_returns, how="left", on=["metric_type", "unit_type", "year"]
+        summary_returns,
+    )
+
+
+def _compare_evolution_to_benchmark(
+    portfolio_evolution: pd.DataFrame, benchmark_evolution: pd.DataFrame
+) -> pd.DataFrame:
+    """Calculate the daily difference in value and gains between the portfolio and a benchmark.
+
+    Args:
+        portfolio_evolution: Daily value and gains of the portfolio.
+        benchmark_evolution: Daily value and gains of the benchmark.
+
+    Returns:
+        Daily value and gains of the benchmark, and their difference to the portfolio.
+    """
+    return portfolio_evolution.merge(benchmark_evolution, on="date", how="left").assign(
+        curr_val_diff=lambda df: df["curr_val_portfolio"] - df["curr_val_benchmark"],
+        curr_abs_gain_diff=lambda df: df["curr_abs_gain_portfolio"] - df["curr_abs_gain_benchmark"],
+        curr_perc_gain_diff=lambda df: (
+            df["curr_perc_gain_portfolio"] - df["curr_perc_gain_benchmark"]
         ),
+    )[
+        [
+            "date",
+            *benchmark_evolution.columns.drop("date"),
+            "curr_val_diff",
+            "curr_abs_gain_diff",
+            "curr_perc_gain_diff",
+        ]
+    ]
+
+
+def _add_suffix(df: pd.DataFrame, suffix: str, keys: list[str]) -> pd.DataFrame:
+    """Add a suffix to all columns except the keys, to tell apart the outputs of each benchmark.
+
+    Args:
+        df: Dataframe to rename.
+        suffix: Suffix to add.
+        keys: Columns to keep as they are.
+
+    Returns:
+        Dataframe with the renamed columns.
+    """
+    return df.rename(
+        columns={column: f"{column}{suffix}" for column in df.columns if column not in keys}
     )
@@ -2,11 +2,19 @@ import numpy as np
 import pandas as pd
 
 from stock_portfolio_tracker.exceptions import UnsortedError
-from stock_portfolio_tracker.utils import PortfolioData, PositionStatus, PositionType, sort_at_end
-
+from stock_portfolio_tracker.utils import (
+    PortfolioData,
+    PositionStatus,
+    PositionType,
+    record_metrics,
+    sort_at_end,
+)
+
+from . import _kernels as kernels
 from . import _utils as utils
 
 
+@record_metrics()
 @sort_at_end()
 def model_benchmark(
     portfolio_data: PortfolioData,
@@ -76,6 +84,7 @@ def model_benchmark(
     )
 
 
+@record_metrics()
 @sort_at_end()
 def model_assets_vs_benchmark(
     portfolio_model: pd.DataFrame,
@@ -90,6 +99,44 @@ def model_assets_vs_benchmark(
         benchmark_prices: Benchmark historical prices.
         sorting_columns: Columns to sort for each returned dataframe.
 
+    Returns:
+        DataFrame comparing asset and benchmark percentage gains.
+    """
+    return _build_assets_vs_benchmark(
+        [
+            compare_asset_to_benchmark(asset_model, benchmark_prices)
+            for _, asset_model in portfolio_model.groupby("ticker_asset")
+        ]
+    )
+
+
+@record_metrics()
+@sort_at_end()
+def build_assets_vs_benchmark(
+    asset_comparisons: list[tuple[str, float, float, str]],
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+) -> pd.DataFrame:
+    """Gather the comparisons of compare_asset_to_benchmark() into the assets vs benchmark table,
+    as model_assets_vs_benchmark() does, when the assets are compared one at a time.
+
+    Args:
+        asset_comparisons: Comparison of each asset against the benchmark, sorted by ticker.
+        sorting_columns: Columns to sort for each returned dataframe.
+
+    Returns:
+        DataFrame comparing asset and benchmark percentage gains.
+    """
+    return _build_assets_vs_benchmark(asset_comparisons)
+
+
+def _build_assets_vs_benchmark(
+    asset_comparisons: list[tuple[str, float, float, str]],
+) -> pd.DataFrame:
+    """Gather the comparisons of compare_asset_to_benchmark() into the assets vs benchmark table.
+
+    Args:
+        asset_comparisons: Comparison of each asset against the benchmark, sorted by ticker.
+
     Returns:
         DataFrame comparing asset and benchmark percentage gains.
     """
@@ -102,68 +149,84 @@ def model_assets_vs_benchmark(
         },
     )
 
-    for _, group in portfolio_model.groupby("ticker_asset"):
-        group = benchmark_prices[  # noqa: PLW2901
+    for asset_comparison in asset_comparisons:
+        assets_vs_benchmark.loc[len(assets_vs_benchmark)] = list(asset_comparison)  # type: ignore[assignment]
+
+    return assets_vs_benchmark.assign(
+        diff=assets_vs_benchmark["curr_perc_gain_asset"]
+        - assets_vs_benchmark["curr_perc_gain_benchmark"]
+    )
+
+
+def compare_asset_to_benchmark(
+    asset_model: pd.DataFrame, benchmark_prices: pd.DataFrame
+) -> tuple[str, float, float, str]:
+    """Compare the performance of a single asset against the benchmark proportionally, as
+    explained in _simulate_benchmark_proportional().
+
+    Args:
+        asset_model: Daily quantity and value of the asset, as of model_asset().
+        benchmark_prices: Benchmark historical prices.
+
+    Returns:
+        Ticker, percentage gain of the asset and the benchmark, and position status.
+    """
+    group = benchmark_prices[
+        [
+            "date",
+            "ticker_benchmark",
+            "split_benchmark",
+            "close_unadj_local_currency_benchmark",
+        ]
+    ].merge(
+        asset_model[
             [
                 "date",
-                "ticker_benchmark",
-                "split_benchmark",
-                "close_unadj_local_currency_benchmark",
+                "ticker_asset",
+                "split_asset",
+                "close_unadj_local_currency_asset",
+                "trans_qty_asset",
+                "trans_val_asset",
+                "curr_qty_asset",
+                "curr_val_asset",
             ]
-        ].merge(
-            group[
-                [
-                    "date",
-                    "ticker_asset",
-                    "split_asset",
-                    "close_unadj_local_currency_asset",
-                    "trans_qty_asset",
-                    "trans_val_asset",
-                    "curr_qty_asset",
-                    "curr_val_asset",
-                ]
-            ],
-            how="left",
-            on=["date"],
-        )
+        ],
+        how="left",
+        on=["date"],
+    )
 
-        group = _simulate_benchmark_proportional(group)  # noqa: PLW2901
+    group = _simulate_benchmark_proportional(group)
 
-        group = utils.calc_curr_qty(  # noqa: PLW2901
-            group,
-            PositionType.BENCHMARK,
-        )
+    group = utils.calc_curr_qty(
+        group,
+        PositionType.BENCHMARK,
+    )
 
-        group = utils.calc_curr_val(  # noqa: PLW2901
-            group,
-            PositionType.BENCHMARK,
-            sorting_columns=[{"columns": ["ticker_benchmark", "date"], "ascending": [True, False]}],
-        )
+    group = utils.calc_curr_val(
+        group,
+        PositionType.BENCHMARK,
+        sorting_columns=[{"columns": ["ticker_benchmark", "date"], "ascending": [True, False]}],
+    )
 
-        percent_gain_benchmark = utils.calc_simple_return_daily(
-            group,
-            PositionType.BENCHMARK,
-            sorting_columns=[{"columns": ["date"], "ascending": [False]}],
-        ).drop(columns=["curr_val_benchmark", "trans_val_benchmark", "money_out", "money_in"])
-
-        percent_gain_asset = utils.calc_simple_return_daily(
-            group,
-            PositionType.ASSET,
-            sorting_columns=[{"columns": ["date"], "ascending": [False]}],
-        ).drop(columns=["curr_val_asset", "trans_val_asset", "money_out", "money_in"])
-
-        assets_vs_benchmark.loc[len(assets_vs_benchmark)] = [
-            group.iloc[0]["ticker_asset"],
-            percent_gain_asset.iloc[0]["curr_perc_gain_asset"],
-            percent_gain_benchmark.iloc[0]["curr_perc_gain_benchmark"],
-            PositionStatus.OPEN.value
-            if group["curr_qty_asset"].iloc[0]
-            else PositionStatus.CLOSED.value,
-        ]
+    percent_gain_benchmark = utils.calc_simple_return_daily(
+        group,
+        PositionType.BENCHMARK,
+        sorting_columns=[{"columns": ["date"], "ascending": [False]}],
+    ).drop(columns=["curr_val_benchmark", "trans_val_benchmark", "money_out", "money_in"])
 
-    return assets_vs_benchmark.assign(
-        diff=assets_vs_benchmark["curr_perc_gain_asset"]
-        - assets_vs_benchmark["curr_perc_gain_benchmark"]
+    percent_gain_asset = utils.calc_simple_return_daily(
+        group,
+        PositionType.ASSET,
+        sorting_columns=[{"columns": ["date"], "ascending": [False]}],
+    ).drop(columns=["curr_val_asset", "trans_val_asset", "money_out", "money_in"])
+
+    return (
+        group.iloc[0]["ticker_asset"],
+        percent_gain_asset.iloc[0]["curr_perc_gain_asset"],
+        percent_gain_benchmark.iloc[0]["curr_perc_gain_benchmark"],
+        PositionStatus.OPEN.value
+        if group["curr_qty_asset"].iloc[0]
+        else PositionStatus.CLOSED.value,
     )
 
 
@@ -188,8 +251,9 @@ def _simulate_benchmark_absolute(
     ).assign(
         trans_val_asset=lambda df: df["trans_val_asset"].fillna(0),
         trans_qty_asset=lambda df: df["trans_qty_asset"].fillna(0),
-        trans_qty_benchmark=lambda df: -df["trans_val_asset"]
-        / df["close_unadj_local_currency_benchmark"],
+        trans_qty_benchmark=lambda df: (
+            -df["trans_val_asset"] / df["close_unadj_local_currency_benchmark"]
+        ),
     )
 
 
@@ -211,47 +275,23 @@ def _simulate_benchmark_proportional(
     if not df["date"].is_monotonic_decreasing:
         raise UnsortedError
 
-    (
-        split_benchmark,
-        trans_qty_asset,
-        trans_val_asset,
-        curr_qty_asset,
-        close_unadj_local_currency_benchmark,
-        split_asset,
-    ) = (
-        df["split_benchmark"].to_numpy(),
-        df["trans_qty_asset"].to_numpy(),
-        df["trans_val_asset"].to_numpy(),
-        df["curr_qty_asset"].to_numpy(),
-        df["close_unadj_local_currency_benchmark"].to_numpy(),
-        df["split_asset"].to_numpy(),
+    # quantity of the asset held the day before, adjusted by the stock split of the day; the
+    # oldest row has no day before, and it is never needed, since it can only be a first purchase
+    prev_qty_asset = np.append(df["curr_qty_asset"].to_numpy(dtype=np.float64)[1:], 0.0)
+    prev_qty_asset *= df["split_asset"].to_numpy(dtype=np.float64)
+
+    trans_qty_benchmark = kernels.benchmark_proportional_kernel(
+        split_benchmark=df["split_benchmark"].to_numpy(dtype=np.float64),
+        trans_qty_asset=df["trans_qty_asset"].to_numpy(dtype=np.float64),
+        trans_val_asset=df["trans_val_asset"].to_numpy(dtype=np.float64),
+        prev_qty_asset=prev_qty_asset,
+        close_unadj_local_currency_benchmark=df["close_unadj_local_currency_benchmark"].to_numpy(
+            dtype=np.float64
+        ),
     )
 
-    trans_qty_benchmark = np.zeros(df_dim := len(split_benchmark), dtype=np.float64)
-    latest_curr_qty_benchmark = 0
-    ever_purchased = False
-
-    for i in range(df_dim):
-        latest_curr_qty_benchmark *= split_benchmark[~i]
-
-        if not ever_purchased and trans_qty_asset[~i] != 0:
-            trans_qty_benchmark[~i] = (
-                -trans_val_asset[~i] / close_unadj_local_currency_benchmark[~i]
-            )
-            latest_curr_qty_benchmark += trans_qty_benchmark[~i]
-            ever_purchased = True
-
-        elif trans_qty_asset[~i] != 0:
-            yesterdas_curr_qty = curr_qty_asset[~i + 1] * split_asset[~i]
-            trans_qty_benchmark[~i] = (
-                (trans_qty_asset[~i] + yesterdas_curr_qty) / yesterdas_curr_qty - 1
-            ) * latest_curr_qty_benchmark
-            latest_curr_qty_benchmark += trans_qty_benchmark[~i]
-
-            if not latest_curr_qty_benchmark:
-                ever_purchased = False
-
     return df.assign(
         trans_qty_benchmark=trans_qty_benchmark,
-        trans_val_benchmark=-close_unadj_local_currency_benchmark * trans_qty_benchmark,
+        trans_val_benchmark=-df["close_unadj_local_currency_benchmark"].to_numpy()
+        * trans_qty_benchmark,
     )
@@ -1,18 +1,42 @@
+from collections.abc import Iterator
+
+import numpy as np
 import pandas as pd
 
 from stock_portfolio_tracker.exceptions import UnsortedError
-from stock_portfolio_tracker.utils import PortfolioData, PositionType, sort_at_end
+from stock_portfolio_tracker.utils import (
+    ColumnStore,
+    PortfolioData,
+    PositionType,
+    record_metrics,
+    sort_at_end,
+)
 
+from . import _kernels as kernels
 from . import _utils as utils
 
+# columns of the daily model of each asset kept in the model store by the out-of-core modelling
+ASSET_MODEL_COLUMNS = (
+    "date",
+    "split_asset",
+    "close_unadj_local_currency_asset",
+    "trans_qty_asset",
+    "trans_val_asset",
+    "curr_qty_asset",
+    "curr_val_asset",
+    "total_dividend_asset",
+)
+
 
+@record_metrics()
 @sort_at_end()
 def model_portfolio(
     portfolio_data: PortfolioData,
     asset_prices: pd.DataFrame,
     asset_dividends: pd.DataFrame,
     sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
-) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """Caclulates the following metrics for the assets:
     - For the overall portfolio, on a daily basis:
         - Value of the portfolio.
@@ -28,46 +52,334 @@ def model_portfolio(
         asset_prices: Daily prices of each asset as of Yahoo Finance.
         asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
         sorting_columns: Columns to sort for each returned dataframe.
+        asset_models: Output of model_asset() for the assets that are already modelled, by
+            ticker. The rest of assets are modelled here. Defaults to None.
 
     Returns:
         Portfolio metrics, individual asset metrics and asset ditribution.
     """
-    portfolio_model = pd.concat(
-        [
-            utils.calc_curr_qty(group, PositionType.ASSET)
-            for _, group in (
-                asset_prices.merge(
-                    portfolio_data.transactions,
-                    how="left",
-                    on=["date", "ticker_asset"],
-                )
-                .assign(
-                    trans_qty_asset=lambda df: df["trans_qty_asset"].fillna(0),
-                    trans_val_asset=lambda df: df["trans_val_asset"].fillna(0),
-                )
-                .groupby("ticker_asset")
+    asset_models = dict(asset_models or {})
+
+    for (ticker, single_asset_prices), (_, single_asset_dividends) in zip(
+        asset_prices.groupby("ticker_asset"), asset_dividends.groupby("ticker_asset"), strict=True
+    ):
+        if ticker not in asset_models:
+            asset_models[str(ticker)] = model_asset(
+                portfolio_data, single_asset_prices, single_asset_dividends
             )
-        ],
+
+    tickers = sorted(asset_prices["ticker_asset"].unique())
+
+    portfolio_model = pd.concat([asset_models[ticker][0] for ticker in tickers]).reset_index(
+        drop=True
     )
 
-    dividends_company, dividends_year = _calc_dividends(
-        asset_dividends.merge(
-            portfolio_model[["date", "ticker_asset", "curr_qty_asset"]],
-            how="left",
-            on=["date", "ticker_asset"],
+    (
+        portfolio_evolution,
+        asset_distribution,
+        dividends_company,
+        dividends_year,
+        portfolio_returns,
+    ) = _aggregate_portfolio(
+        portfolio_data,
+        portfolio_model,
+        pd.concat([asset_models[ticker][1] for ticker in tickers]),
+    )
+
+    return (
+        portfolio_evolution,
+        asset_distribution,
+        portfolio_model,
+        dividends_company,
+        dividends_year,
+        portfolio_returns,
+    )
+
+
+@record_metrics()
+@sort_at_end()
+def aggregate_portfolio(
+    portfolio_data: PortfolioData,
+    portfolio_model: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Aggregate the models of every asset into the portfolio metrics, as model_portfolio() does.
+
+    Only the columns used in the aggregation are needed, so the models can be trimmed with
+    compact_asset_model() beforehand to save memory.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        portfolio_model: Models of every asset, sorted by ticker and descending date.
+        asset_dividends: Dividends received of every asset, sorted by ticker.
+        sorting_columns: Columns to sort for each returned dataframe.
+
+    Returns:
+        Portfolio metrics, asset distribution, dividends per company and year and returns.
+    """
+    return _aggregate_portfolio(portfolio_data, portfolio_model, asset_dividends)
+
+
+def compact_asset_model(
+    asset_model: pd.DataFrame, asset_dividends: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Keep only the columns of the output of model_asset() that aggregate_portfolio() uses.
+
+    Args:
+        asset_model: Daily quantity and value of the asset.
+        asset_dividends: Dividends received of the asset.
+
+    Returns:
+        Compact asset model and dividends.
+    """
+    return (
+        asset_model[["date", "ticker_asset", "curr_qty_asset", "curr_val_asset"]],
+        asset_dividends[["date", "ticker_asset", "total_dividend_asset"]],
+    )
+
+
+@record_metrics()
+@sort_at_end()
+def model_portfolio_out_of_core(
+    portfolio_data: PortfolioData,
+    price_store: ColumnStore,
+    model_store: ColumnStore,
+    block_days: int,
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Calculate the portfolio metrics of model_portfolio(), reading the daily data of each asset
+    from a column store one block of days at a time, so that the memory needed does not grow with
+    the length of the history nor with the number of assets.
+
+    Each asset is modelled with model_asset_blocks() and its model is appended to the model
+    store, to be read back with read_asset_model(). The daily value of the portfolio and the
+    dividends are summed with group_sum_kernel(), adding the values in the same order as
+    model_portfolio() does, so that the results are identical.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        price_store: Daily data of each asset, as stored by the preprocessing.
+        model_store: Column store to write the daily model of each asset to.
+        block_days: Number of days to model at a time.
+        sorting_columns: Columns to sort for each returned dataframe.
+
+    Returns:
+        Portfolio metrics, asset distribution, dividends per company and year and returns.
+    """
+    tickers = sorted(portfolio_data.assets_info)
+    days = pd.date_range(portfolio_data.start_date, portfolio_data.end_date, freq="D")
+    first_year = portfolio_data.start_date.year
+
+    val_sums = np.zeros(len(days)), np.zeros(len(days))
+    val_days = np.zeros(len(days), dtype=np.bool_)
+    dividend_year_sums = (
+        np.zeros(portfolio_data.end_date.year - first_year + 1),
+        np.zeros(portfolio_data.end_date.year - first_year + 1),
+    )
+    dividend_years = np.zeros(len(dividend_year_sums[0]), dtype=np.bool_)
+    dividend_company_sums = []
+    end_date_models = []
+
+    for ticker in tickers:
+        for block_model in model_asset_blocks(portfolio_data, ticker, price_store, block_days):
+            model_store.append(
+                ticker,
+                {column: block_model[column].to_numpy()[::-1] for column in ASSET_MODEL_COLUMNS},
+            )
+
+            # the value of the asset on each day is the one after the last transaction of the day,
+            # as in _calc_val_evol(), and the assets are added to each day in ascending order
+            day_vals = block_model.groupby("date", sort=False)["curr_val_asset"].first()
+            day_numbers = days.get_indexer(day_vals.index).astype(np.int64)
+            val_sums = kernels.group_sum_kernel(
+                day_numbers, day_vals.to_numpy(dtype=np.float64), *val_sums
+            )
+            val_days[day_numbers] = True
+
+            if (is_end_date := block_model["date"] == portfolio_data.end_date).any():
+                end_date_models.append(block_model[is_end_date])
+
+        # the dividends of each asset are added by descending date, as _calc_dividends() does
+        company_sums = np.zeros(1), np.zeros(1)
+        dates, total_dividends = (
+            model_store.read(ticker, "date"),
+            model_store.read(ticker, "total_dividend_asset"),
+        )
+
+        for block_end in range(len(dates), 0, -block_days):
+            block = slice(max(0, block_end - block_days), block_end)
+            block_dividends = np.ascontiguousarray(total_dividends[block][::-1], dtype=np.float64)
+            year_numbers = (
+                dates[block][::-1].astype("datetime64[Y]").astype(np.int64) + 1970 - first_year
+            )
+
+            company_sums = kernels.group_sum_kernel(
+                np.zeros(len(block_dividends), dtype=np.int64), block_dividends, *company_sums
+            )
+            dividend_year_sums = kernels.group_sum_kernel(
+                year_numbers, block_dividends, *dividend_year_sums
+            )
+            dividend_years[year_numbers] = True
+
+        dividend_company_sums.append(company_sums[0][0])
+
+    portfolio_evolution, portfolio_returns = _calc_portfolio_gains(
+        portfolio_data,
+        pd.DataFrame(
+            {
+                "date": days[val_days][::-1],
+                "curr_val_portfolio": np.round(val_sums[0][val_days][::-1], 2),
+            }
+        ),
+    )
+
+    return (
+        portfolio_evolution,
+        _calc_asset_dist(
+            pd.concat(end_date_models).reset_index(drop=True), portfolio_data, PositionType.ASSET
+        ),
+        pd.DataFrame({"ticker_asset": tickers, "total_dividend_asset": dividend_company_sums}),
+        pd.DataFrame(
+            {
+                "date": (first_year + np.flatnonzero(dividend_years)).astype(np.int32),
+                "total_dividend_asset": dividend_year_sums[0][dividend_years],
+            }
+        ),
+        portfolio_returns,
+    )
+
+
+def model_asset_blocks(
+    portfolio_data: PortfolioData, ticker: str, price_store: ColumnStore, block_days: int
+) -> Iterator[pd.DataFrame]:
+    """Model a single asset as model_asset() does, one block of days at a time, carrying the
+    quantity held over from each block to the next.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        ticker: Ticker of the asset.
+        price_store: Daily data of each asset, as stored by the preprocessing.
+        block_days: Number of days to model at a time.
+
+    Yields:
+        Daily quantity and value of the asset in each block, from the oldest block to the newest,
+        sorted by descending date, with the dividends received on each day.
+    """
+    transactions = portfolio_data.transactions[
+        portfolio_data.transactions["ticker_asset"] == ticker
+    ]
+    dates = price_store.read(ticker, "date")
+    prev_qty = 0.0
+
+    for block_start in range(0, len(dates), block_days):
+        block = slice(block_start, block_start + block_days)
+
+        asset_model = utils.calc_curr_qty(
+            pd.DataFrame(
+                {
+                    "date": dates[block][::-1],
+                    "ticker_asset": ticker,
+                    **{
+                        column: price_store.read(ticker, column)[block][::-1]
+                        for column in (
+                            "split_asset",
+                            "close_unadj_local_currency_asset",
+                            "close_unadj_local_currency_dividends_asset",
+                        )
+                    },
+                }
+            )
+            .merge(transactions, how="left", on=["date", "ticker_asset"])
+            .assign(
+                trans_qty_asset=lambda df: df["trans_qty_asset"].fillna(0),
+                trans_val_asset=lambda df: df["trans_val_asset"].fillna(0),
+            ),
+            PositionType.ASSET,
+            initial_qty=prev_qty,
+        )
+
+        # the dividend of each day is received for the shares held the row before, as in
+        # _calc_asset_dividends(), which for the oldest row is the last quantity of the block before
+        yield utils.calc_curr_val(
+            asset_model.assign(
+                total_dividend_asset=asset_model["curr_qty_asset"].shift(-1).fillna(prev_qty)
+                * asset_model["close_unadj_local_currency_dividends_asset"]
+            ),
+            PositionType.ASSET,
+            sorting_columns=[{"columns": ["ticker_asset", "date"], "ascending": [True, False]}],
+        )
+
+        prev_qty = float(asset_model["curr_qty_asset"].iloc[0])
+
+
+def read_asset_model(ticker: str, model_store: ColumnStore) -> pd.DataFrame:
+    """Read the daily model of an asset stored by model_portfolio_out_of_core(), as model_asset()
+    returns it.
+
+    Args:
+        ticker: Ticker of the asset.
+        model_store: Daily model of each asset.
+
+    Returns:
+        Daily quantity and value of the asset, sorted by descending date.
+    """
+    return pd.DataFrame(
+        {column: model_store.read(ticker, column)[::-1] for column in ASSET_MODEL_COLUMNS}
+    ).assign(ticker_asset=ticker)
+
+
+def _aggregate_portfolio(
+    portfolio_data: PortfolioData,
+    portfolio_model: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Aggregate the models of every asset into the portfolio metrics.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        portfolio_model: Models of every asset, sorted by ticker and descending date.
+        asset_dividends: Dividends received of every asset, sorted by ticker.
+
+    Returns:
+        Portfolio metrics, asset distribution, dividends per company and year and returns.
+    """
+    dividends_company, dividends_year = _calc_dividends(asset_dividends)
+
+    portfolio_evolution, portfolio_returns = _calc_portfolio_gains(
+        portfolio_data,
+        _calc_val_evol(
+            portfolio_model, sorting_columns=[{"columns": ["date"], "ascending": [False]}]
         ),
     )
 
-    portfolio_model = utils.calc_curr_val(
+    asset_distribution = _calc_asset_dist(
         portfolio_model,
+        portfolio_data,
         PositionType.ASSET,
-        sorting_columns=[{"columns": ["ticker_asset", "date"], "ascending": [True, False]}],
     )
 
-    portfolio_val_evolution = _calc_val_evol(
-        portfolio_model, sorting_columns=[{"columns": ["date"], "ascending": [False]}]
+    return (
+        portfolio_evolution,
+        asset_distribution,
+        dividends_company,
+        dividends_year,
+        portfolio_returns,
     )
 
+
+def _calc_portfolio_gains(
+    portfolio_data: PortfolioData, portfolio_val_evolution: pd.DataFrame
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Calculate the daily gains and the returns of the portfolio from its daily value.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        portfolio_val_evolution: Portfolio daily value, sorted by descending date.
+
+    Returns:
+        Portfolio daily value and gains, and returns.
+    """
     portfolio_gains = utils.calc_simple_return_daily(
         portfolio_val_evolution.merge(
             portfolio_data.transactions[["date", "trans_val_asset"]],
@@ -82,28 +394,150 @@ def model_portfolio(
 
     portfolio_returns = utils.calc_overall_returns(portfolio_gains, PositionType.PORTFOLIO)
 
-    asset_distribution = _calc_asset_dist(
-        portfolio_model,
-        portfolio_data,
-        PositionType.ASSET,
-    )
-
     return (
-        portfolio_val_evolution.merge(  # type: ignore
+        portfolio_val_evolution.merge(
             portfolio_gains.drop(
                 columns=["curr_val_portfolio", "trans_val_portfolio", "money_out", "money_in"]
             ),
             how="left",
             on=["date"],
         ),
-        asset_distribution,
-        portfolio_model,
-        dividends_company,
-        dividends_year,
         portfolio_returns,
     )
 
 
+@record_metrics()
+@sort_at_end()
+def model_holdings(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+) -> pd.DataFrame:
+    """Calculate the asset distribution at end date, as in model_portfolio(), without modelling
+    the daily history of each asset.
+
+    The quantity of each asset is folded from its transactions and stock splits only, and valued
+    with its price at end date. The asset prices must have a row per day, as loaded by the
+    preprocessing.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Daily prices of each asset as of Yahoo Finance.
+        sorting_columns: Columns to sort for each returned dataframe.
+
+    Returns:
+        Dataframe with the percentage and value of each asset at end date.
+    """
+    holding_events = _calc_holding_events(portfolio_data, asset_prices)
+
+    # the quantity at end date is the one after the last event of each asset, and the daily model
+    # has one row per transaction on end date, with the quantity after each of them
+    holdings = holding_events[
+        (holding_events["date"] == portfolio_data.end_date)
+        | ~holding_events["ticker_asset"].duplicated(keep="last")
+    ].assign(
+        date=lambda df: pd.Series(
+            portfolio_data.end_date, index=df.index, dtype=asset_prices["date"].dtype
+        )
+    )
+
+    return _calc_asset_dist(
+        utils.calc_curr_val(
+            holdings.merge(
+                asset_prices[asset_prices["date"] == portfolio_data.end_date][
+                    ["date", "ticker_asset", "close_unadj_local_currency_asset"]
+                ],
+                how="inner",
+                on=["date", "ticker_asset"],
+            ),
+            PositionType.ASSET,
+            sorting_columns=[
+                {"columns": ["ticker_asset", "trans_order"], "ascending": [True, True]}
+            ],
+        ),
+        portfolio_data,
+        PositionType.ASSET,
+    )
+
+
+@record_metrics()
+@sort_at_end()
+def model_eod_holdings(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+) -> pd.DataFrame:
+    """Calculate the quantity of each asset held at the end of end date, after the last
+    transaction of the day, and its closing price, folded from the transactions and stock splits
+    as in model_holdings().
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Daily prices of each asset as of Yahoo Finance.
+        sorting_columns: Columns to sort for each returned dataframe.
+
+    Returns:
+        Dataframe with the quantity and closing price of each asset held at end date.
+    """
+    holding_events = _calc_holding_events(portfolio_data, asset_prices)
+
+    return (
+        holding_events[~holding_events["ticker_asset"].duplicated(keep="last")]
+        .query("curr_qty_asset != 0")[["ticker_asset", "curr_qty_asset"]]
+        .merge(
+            asset_prices[asset_prices["date"] == portfolio_data.end_date][
+                ["ticker_asset", "close_unadj_local_currency_asset"]
+            ],
+            how="inner",
+            on=["ticker_asset"],
+        )
+    )
+
+
+def _calc_holding_events(portfolio_data: PortfolioData, asset_prices: pd.DataFrame) -> pd.DataFrame:
+    """Calculate the quantity of each asset held after each of its transactions and stock splits.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Daily prices of each asset as of Yahoo Finance.
+
+    Returns:
+        Dataframe with the quantity held after each event, sorted by ticker and in processing
+        order, so the last event of each ticker has the latest quantity.
+    """
+    split_events = asset_prices[asset_prices["split_asset"] != 1][
+        ["date", "ticker_asset", "split_asset"]
+    ]
+    transactions = (
+        portfolio_data.transactions[["date", "ticker_asset", "trans_qty_asset"]]
+        .assign(trans_order=range(len(portfolio_data.transactions)))
+        .merge(split_events, how="left", on=["date", "ticker_asset"])
+        .assign(split_asset=lambda df: df["split_asset"].fillna(1))
+    )
+
+    # days are processed in ascending order and the transactions of a day in reverse order, as
+    # calc_curr_qty() does on the daily model
+    return utils.calc_event_qty(
+        pd.concat(
+            [
+                transactions,
+                split_events.merge(
+                    transactions[["date", "ticker_asset"]].drop_duplicates(),
+                    how="left",
+                    on=["date", "ticker_asset"],
+                    indicator=True,
+                )
+                .query("_merge == 'left_only'")
+                .drop(columns=["_merge"])
+                .assign(trans_qty_asset=0.0, trans_order=0),
+            ]
+        ).sort_values(
+            ["ticker_asset", "date", "trans_order"], ascending=[True, True, False], kind="stable"
+        ),
+        PositionType.ASSET,
+    )
+
+
 def _calc_asset_dist(
     portfolio_model: pd.DataFrame,
     portfolio_data: PortfolioData,
@@ -152,8 +586,56 @@ def _calc_asset_dist(
     )
 
 
-def _calc_dividends(asset_dividends: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Calculate the total dividend received for every asset.
+@record_metrics()
+def model_asset(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    asset_dividends: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Model a single asset, which only needs the prices of that asset, so it can be done as soon
+    as they are loaded:
+        - Daily quantity and value of the asset.
+        - Dividends received on each Ex-Dividend Date.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Daily prices of the asset as of Yahoo Finance.
+        asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
+
+    Returns:
+        Daily quantity and value of the asset, and dividends received.
+    """
+    asset_model = utils.calc_curr_qty(
+        asset_prices.merge(
+            portfolio_data.transactions,
+            how="left",
+            on=["date", "ticker_asset"],
+        ).assign(
+            trans_qty_asset=lambda df: df["trans_qty_asset"].fillna(0),
+            trans_val_asset=lambda df: df["trans_val_asset"].fillna(0),
+        ),
+        PositionType.ASSET,
+    )
+
+    asset_dividends = _calc_asset_dividends(
+        asset_dividends.merge(
+            asset_model[["date", "ticker_asset", "curr_qty_asset"]],
+            how="left",
+            on=["date", "ticker_asset"],
+        ),
+    )
+
+    asset_model = utils.calc_curr_val(
+        asset_model,
+        PositionType.ASSET,
+        sorting_columns=[{"columns": ["ticker_asset", "date"], "ascending": [True, False]}],
+    )
+
+    return asset_model, asset_dividends
+
+
+def _calc_asset_dividends(asset_dividends: pd.DataFrame) -> pd.DataFrame:
+    """Calculate the dividend received for an asset on each Ex-Dividend Date.
 
     Args:
         asset_dividends: Dataframe containing the dividend amount on the Ex-Dividend Date.
@@ -162,16 +644,13 @@ def _calc_dividends(asset_dividends: pd.DataFrame) -> tuple[pd.DataFrame, pd.Dat
         UnsortedError: Unsorted input data.
 
     Returns:
-        Total dividends per company and total yearly dividends.
+        Dataframe with the total dividend received on each date.
     """
-    if not all(
-        group[1].is_monotonic_decreasing
-        for group in asset_dividends.groupby("ticker_asset")["date"]
-    ):
+    if not asset_dividends["date"].is_monotonic_decreasing:
         raise UnsortedError
 
-    asset_dividends = asset_dividends.assign(
-        total_dividend_asset=asset_dividends.groupby("ticker_asset")["curr_qty_asset"]
+    return asset_dividends.assign(
+        total_dividend_asset=asset_dividends["curr_qty_asset"]
         .shift(
             -1,
         )  # shift one because we need to take into account yesterday's total shares hold on Ex-Dividend Date # noqa: E501
@@ -179,6 +658,16 @@ def _calc_dividends(asset_dividends: pd.DataFrame) -> tuple[pd.DataFrame, pd.Dat
         * asset_dividends["close_unadj_local_currency_dividends_asset"],
     )
 
+
+def _calc_dividends(asset_dividends: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Calculate the total dividend received for every asset.
+
+    Args:
+        asset_dividends: Dataframe containing the dividend received on each Ex-Dividend Date.
+
+    Returns:
+        Total dividends per company and total yearly dividends.
+    """
     return (
         asset_dividends.groupby("ticker_asset")["total_dividend_asset"].sum().reset_index(),
         asset_dividends.groupby(asset_dividends["date"].dt.year)["total_dividend_asset"]
@@ -0,0 +1,259 @@
+"""Monte Carlo projection of the value of the current holdings, simulating many paths of daily
+returns at once.
+"""
+
+import multiprocessing
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker.utils import (
+    PortfolioData,
+    SimulationMethod,
+    record_metrics,
+    sort_at_end,
+)
+
+from . import _modelling_portfolio as modelling_portfolio
+
+# day of the week of Saturday, as in pandas, where Monday is 0
+SATURDAY = 5
+
+
+@record_metrics()
+@sort_at_end()
+def model_projection(
+    portfolio_data: PortfolioData,
+    asset_prices: pd.DataFrame,
+    horizon_days: int,
+    *,
+    sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG001
+    n_paths: int = 10_000,
+    method: SimulationMethod = SimulationMethod.BOOTSTRAP,
+    percentiles: Iterable[float] = (5, 25, 50, 75, 95),
+    chunk_paths: int = 1_000,
+    processes: int | None = None,
+    seed: int | None = None,
+    lookback_days: int | None = None,
+) -> pd.DataFrame:
+    """Project the value of the assets held at end date over the next business days, with the
+    historical daily returns of the assets.
+
+    Every step of a path is a business day, as the historical returns are taken between
+    consecutive business days (the prices on weekends are the ones of the previous Friday). Every
+    path is a sequence of daily log returns of all the assets, either resampled from the
+    historical days (bootstrap, which keeps the correlation between assets and the fat tails of
+    each day), or drawn from a multivariate normal distribution with the mean and covariance of
+    the historical returns. The paths are simulated in chunks of chunk_paths at a time, as a
+    single array of paths, days and assets, which bounds the memory needed. Each chunk has its
+    own random stream derived from the seed, so the results do not depend on the number of
+    processes.
+
+    Args:
+        portfolio_data: Transactions history and other portfolio data.
+        asset_prices: Daily prices of each asset up to end date, in portfolio currency.
+        horizon_days: Number of business days to project, after end date.
+        sorting_columns: Columns to sort for each returned dataframe.
+        n_paths: Number of paths to simulate. Defaults to 10000.
+        method: How to simulate the daily returns. Defaults to bootstrap.
+        percentiles: Percentiles of the value of the portfolio to get on each day, between 0 and
+            100. Defaults to 5, 25, 50, 75 and 95.
+        chunk_paths: Number of paths to simulate at a time. Defaults to 1000.
+        processes: Number of processes to simulate the chunks in. Defaults to None, which
+            simulates them in the current process.
+        seed: Seed of the random numbers, to get the same projection on every run. Defaults to
+            None (a different projection every run).
+        lookback_days: Number of business days of history to take the daily returns from, up
+            to end date. Defaults to None (the whole history).
+
+    Raises:
+        ValueError: No daily returns of the assets held within the lookback.
+
+    Returns:
+        Dataframe with the value of the portfolio on end date and each projected business day,
+        for each percentile (curr_val_portfolio_p<percentile>).
+    """
+    eod_holdings = modelling_portfolio.model_eod_holdings(
+        portfolio_data,
+        asset_prices,
+        sorting_columns=[{"columns": ["ticker_asset"], "ascending": [True]}],
+    )
+    holding_values = (
+        eod_holdings["curr_qty_asset"] * eod_holdings["close_unadj_local_currency_asset"]
+    ).to_numpy(dtype=np.float64)
+
+    log_returns = _calc_log_returns(
+        asset_prices, eod_holdings["ticker_asset"].tolist(), portfolio_data.end_date
+    )
+
+    if lookback_days is not None:
+        log_returns = log_returns[max(len(log_returns) - lookback_days, 0) :]
+
+    if len(log_returns) == 0:
+        msg = (
+            "Not enough price history to project: there are no daily returns of the assets held "
+            "at end date within the lookback."
+        )
+        raise ValueError(msg)
+
+    mean = log_returns.mean(axis=0)
+    factor = _calc_covariance_factor(log_returns)
+
+    chunk_sizes = [min(chunk_paths, n_paths - start) for start in range(0, n_paths, chunk_paths)]
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_kwargs = [
+        {
+            "method": method,
+            "log_returns": log_returns,
+            "mean": mean,
+            "factor": factor,
+            "holding_values": holding_values,
+            "horizon_days": horizon_days,
+            "n_paths": chunk_size,
+            "seed": chunk_seed,
+        }
+        for chunk_size, chunk_seed in zip(chunk_sizes, chunk_seeds, strict=True)
+    ]
+
+    logger.info(
+        f"Simulating {n_paths} paths of {horizon_days} business days of "
+        f"{len(holding_values)} assets, in {len(chunk_sizes)} chunks."
+    )
+
+    if processes is None:
+        path_values = [_simulate_chunk(**kwargs) for kwargs in chunk_kwargs]
+    else:
+        # spawned rather than forked, as the thread pools of the process may be running
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [executor.submit(_simulate_chunk, **kwargs) for kwargs in chunk_kwargs]
+            path_values = [future.result() for future in futures]
+
+    percentiles = list(percentiles)
+    # the paths start from the value on end date, the same for every percentile
+    percentile_values = np.column_stack(
+        [
+            np.full(len(percentiles), holding_values.sum()),
+            np.percentile(np.concatenate(path_values), percentiles, axis=0),
+        ]
+    )
+
+    return pd.DataFrame(
+        {
+            "date": pd.DatetimeIndex([portfolio_data.end_date]).append(
+                pd.bdate_range(portfolio_data.end_date + pd.offsets.BDay(), periods=horizon_days)
+            ),
+            **{
+                f"curr_val_portfolio_p{percentile:g}": np.round(values, 2)
+                for percentile, values in zip(percentiles, percentile_values, strict=True)
+            },
+        }
+    )
+
+
+def _calc_log_returns(
+    asset_prices: pd.DataFrame, tickers: list[str], end_date: pd.Timestamp
+) -> npt.NDArray[np.float64]:
+    """Calculate the log returns of some assets between consecutive business days, adjusted for
+    stock splits.
+
+    Args:
+        asset_prices: Daily prices of each asset.
+        tickers: Tickers of the assets.
+        end_date: Last date to take the returns of.
+
+    Returns:
+        Array with the log return of each asset (columns) on each business day (rows), by
+        ascending date.
+    """
+    prices = asset_prices[
+        asset_prices["ticker_asset"].isin(tickers)
+        & (asset_prices["date"] <= end_date)
+        & (asset_prices["date"].dt.dayofweek < SATURDAY)
+    ].pivot_table(index="date", columns="ticker_asset", aggfunc="first")
+    close = prices["close_unadj_local_currency_asset"][tickers].to_numpy(dtype=np.float64)
+
+    # the splits of the weekends are applied on the next business day, with their price falls
+    split = (
+        asset_prices[asset_prices["ticker_asset"].isin(tickers)]
+        .pivot_table(index="date", columns="ticker_asset", values="split_asset", aggfunc="first")
+        .loc[:end_date, tickers]
+        .fillna(1)
+        .cumprod()
+        .reindex(prices.index)
+        .to_numpy(dtype=np.float64)
+    )
+
+    # an unadjusted price falls by the split ratio on the day of the split
+    log_returns: npt.NDArray[np.float64] = np.log(close[1:] * (split[1:] / split[:-1]) / close[:-1])
+
+    return log_returns[~np.isnan(log_returns).any(axis=1)]
+
+
+def _calc_covariance_factor(log_returns: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Calculate a matrix whose product by its transpose is the covariance of the returns, to
+    correlate independent normal draws.
+
+    An eigendecomposition is used instead of Cholesky, as the covariance of assets that move
+    together may be singular.
+
+    Args:
+        log_returns: Daily log returns of each asset (columns).
+
+    Returns:
+        Square matrix with a row and column per asset.
+    """
+    if log_returns.shape[1] == 0:
+        return np.zeros((0, 0))
+
+    covariance = np.atleast_2d(np.cov(log_returns, rowvar=False))
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+
+    factor: npt.NDArray[np.float64] = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+    return factor
+
+
+def _simulate_chunk(
+    *,
+    method: SimulationMethod,
+    log_returns: npt.NDArray[np.float64],
+    mean: npt.NDArray[np.float64],
+    factor: npt.NDArray[np.float64],
+    holding_values: npt.NDArray[np.float64],
+    horizon_days: int,
+    n_paths: int,
+    seed: np.random.SeedSequence,
+) -> npt.NDArray[np.float64]:
+    """Simulate a chunk of paths of the value of the portfolio, as a single array operation.
+
+    Args:
+        method: How to simulate the daily returns.
+        log_returns: Historical daily log returns of each asset (columns).
+        mean: Mean daily log return of each asset.
+        factor: Covariance factor of the daily log returns, from _calc_covariance_factor().
+        holding_values: Value of each asset held on end date.
+        horizon_days: Number of business days to simulate.
+        n_paths: Number of paths to simulate.
+        seed: Seed of the random numbers of the chunk.
+
+    Returns:
+        Array with the value of the portfolio on each day (columns) of each path (rows).
+    """
+    rng = np.random.default_rng(seed)
+
+    if method == SimulationMethod.BOOTSTRAP:
+        path_returns = log_returns[rng.integers(len(log_returns), size=(n_paths, horizon_days))]
+    else:
+        path_returns = (rng.standard_normal((n_paths, horizon_days, len(mean))) @ factor.T) + mean
+
+    # value of each asset relative to end date, compounded day by day, summed over the assets
+    growth = np.exp(np.cumsum(path_returns, axis=1, out=path_returns), out=path_returns)
+    path_values: npt.NDArray[np.float64] = growth @ holding_values
+
+    return path_values
@@ -4,12 +4,16 @@ import numpy as np
 import pandas as pd
 
 from stock_portfolio_tracker.exceptions import UnsortedError
-from stock_portfolio_tracker.utils import Freq, PositionType, sort_at_end
+from stock_portfolio_tracker.utils import Freq, PositionType, record_metrics, sort_at_end
 
+from . import _kernels as kernels
 
+
+@record_metrics()
 def calc_curr_qty(
     df: pd.DataFrame,
     position_type: PositionType,
+    initial_qty: float = 0.0,
 ) -> pd.DataFrame:
     """Calculate the daily quantity of share for an asset based on the buy / sale transactions and
     the stock splits.
@@ -17,6 +21,8 @@ def calc_curr_qty(
     Args:
         df: Dataframe containing dates, transaction quantity and stock splits.
         position_type: Type of position (asset, benchmark, etc).
+        initial_qty: Quantity of shares held before the oldest date, when the dates before it are
+            processed separately. Defaults to 0.
 
     Raises:
         UnsortedError: Unsorted input data.
@@ -27,19 +33,49 @@ def calc_curr_qty(
     if not df["date"].is_monotonic_decreasing:
         raise UnsortedError
 
-    trans_qty, split = (
-        df[f"trans_qty_{position_type.value}"].to_numpy(),
-        df[f"split_{position_type.value}"].to_numpy(),
+    return df.assign(
+        **{
+            f"curr_qty_{position_type.value}": kernels.curr_qty_kernel(
+                df[f"trans_qty_{position_type.value}"].to_numpy(dtype=np.float64),
+                df[f"split_{position_type.value}"].to_numpy(dtype=np.float64),
+                initial_qty,
+            )
+        }
     )
 
-    curr_qty = np.zeros(df_len := len(trans_qty), dtype=np.float64)
 
-    for i in range(df_len):
-        curr_qty[~i] = trans_qty[~i] + (0 if i == 0 else curr_qty[~i + 1] * split[~i])
+@record_metrics()
+def calc_event_qty(
+    df: pd.DataFrame,
+    position_type: PositionType,
+) -> pd.DataFrame:
+    """Calculate the quantity of shares after each transaction or stock split, with the same
+    recurrence as calc_curr_qty() but only on the days where the quantity changes, so the cost is
+    proportional to the number of transactions and splits rather than to the number of days.
 
-    return df.assign(**{f"curr_qty_{position_type.value}": curr_qty})
+    Args:
+        df: Dataframe containing the transactions and stock splits of each ticker, sorted by
+            ticker and in the order calc_curr_qty() processes them (ascending date, and reverse
+            order within a day).
+        position_type: Type of position (asset, benchmark, etc).
+
+    Returns:
+        Dataframe with the amount of shares hold after each transaction or stock split.
+    """
+    tickers = df[f"ticker_{position_type.value}"].to_numpy()
+
+    return df.assign(
+        **{
+            f"curr_qty_{position_type.value}": kernels.event_qty_kernel(
+                np.concatenate([[True], tickers[1:] != tickers[:-1]]),
+                df[f"trans_qty_{position_type.value}"].to_numpy(dtype=np.float64),
+                df[f"split_{position_type.value}"].to_numpy(dtype=np.float64),
+            )
+        }
+    )
 
 
+@record_metrics()
 @sort_at_end()
 def calc_curr_val(
     df: pd.DataFrame,
@@ -64,6 +100,7 @@ def calc_curr_val(
     )
 
 
+@record_metrics()
 @sort_at_end()
 def calc_simple_return_daily(
     df: pd.DataFrame,
@@ -133,6 +170,7 @@ def calc_simple_return_daily(
     return df
 
 
+@record_metrics()
 def calc_overall_returns(df: pd.DataFrame, position_type: PositionType) -> pd.DataFrame:
     """Calculate the yearly returns using the following approaches:
         - Simple returns.
@@ -202,6 +240,7 @@ def calc_overall_returns(df: pd.DataFrame, position_type: PositionType) -> pd.Da
     ).reset_index(drop=True)
 
 
+@record_metrics()
 def calc_simple_return(df: pd.DataFrame, position_type: PositionType, freq: Freq) -> pd.DataFrame:
     simple_returns: dict[str, list[str | int | float]] = {
         "metric_type": [],
@@ -247,6 +286,7 @@ def calc_simple_return(df: pd.DataFrame, position_type: PositionType, freq: Freq
     return pd.DataFrame(simple_returns)
 
 
+@record_metrics()
 def calc_twr(df: pd.DataFrame, position_type: PositionType, freq: Freq) -> pd.DataFrame:
     """Calculate time weighted returns.
 
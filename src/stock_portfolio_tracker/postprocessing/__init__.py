@@ -0,0 +1,6 @@
+"""Postprocessing."""
+
+from ._postprocessing import write_outputs
+from ._results_store import ResultsStore
+
+__all__ = ["ResultsStore", "write_outputs"]
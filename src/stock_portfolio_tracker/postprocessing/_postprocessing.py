@@ -0,0 +1,163 @@
+"""Write the pipeline outputs to disk."""
+
+from importlib.util import find_spec
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker import utils
+from stock_portfolio_tracker.exceptions import MissingDependencyError
+from stock_portfolio_tracker.utils import OutputFormat, Workload
+
+PARTITION_KEY = "month"
+
+
+def write_outputs(
+    outputs: dict[str, pd.DataFrame],
+    output_dir: Path,
+    end_date: pd.Timestamp,
+    output_format: OutputFormat = OutputFormat.PARQUET,
+    partition_by_date: bool = False,  # noqa: FBT001, FBT002
+) -> list[Path]:
+    """Write every pipeline output to disk, in parallel.
+
+    Without partitioning, each output is written to a single file, overwriting the previous one.
+    With partitioning, each output is written to a directory with a partition per month
+    (`<output_type>/month=YYYY-MM/part-0.<format>`), by the date column for the outputs that have
+    one and by end date for the rest. Partitioned output is append-only: the partitions before the
+    latest one already on disk are never rewritten, so incremental runs only write the latest
+    month and the new ones, and downstream tools can read only the months they need.
+
+    Args:
+        outputs: Pipeline outputs, by output type.
+        output_dir: Directory to write the outputs to.
+        end_date: End date of the portfolio analysis.
+        output_format: File format to write. Defaults to parquet.
+        partition_by_date: Whether to write append-only partitions by month. Defaults to False.
+
+    Raises:
+        MissingDependencyError: Parquet or feather output without pyarrow installed.
+
+    Returns:
+        Paths of the written files.
+    """
+    if output_format != OutputFormat.CSV and find_spec("pyarrow") is None:
+        msg = (
+            f"pyarrow is needed to write {output_format.value} files. Install it with "
+            "`pip install stock-portfolio-tracker[arrow]` or use csv output instead."
+        )
+        raise MissingDependencyError(msg)
+
+    logger.info(f"Writing outputs to {output_dir}.")
+
+    files_to_write = [
+        file_to_write
+        for output_type, output in outputs.items()
+        for file_to_write in (
+            _get_partitions(output, output_dir / output_type, end_date, output_format)
+            if partition_by_date
+            else [(output, output_dir / f"{output_type}.{output_format.value}")]
+        )
+    ]
+
+    written_files: list[Path] = utils.multithreader(
+        _write_file,
+        [(output, file_path, output_format) for output, file_path in files_to_write],
+        workload=Workload.WRITE,
+    )
+
+    return sorted(written_files)
+
+
+def _get_partitions(
+    output: pd.DataFrame,
+    output_type_dir: Path,
+    end_date: pd.Timestamp,
+    output_format: OutputFormat,
+) -> list[tuple[pd.DataFrame, Path]]:
+    """Split an output into monthly partitions, leaving out the ones that must not be rewritten.
+
+    Args:
+        output: Pipeline output.
+        output_type_dir: Directory with the partitions of the output.
+        end_date: End date of the portfolio analysis.
+        output_format: File format to write.
+
+    Returns:
+        Data and file path of every partition to write.
+    """
+    months = (
+        output["date"].dt.strftime("%Y-%m")
+        if "date" in output and pd.api.types.is_datetime64_any_dtype(output["date"])
+        else pd.Series(end_date.strftime("%Y-%m"), index=output.index)
+    )
+
+    existing_months = sorted(
+        partition_dir.name.removeprefix(f"{PARTITION_KEY}=")
+        for partition_dir in output_type_dir.glob(f"{PARTITION_KEY}=*")
+    )
+
+    # the latest partition on disk may be incomplete, so it is the only one that gets rewritten
+    return [
+        (
+            partition.reset_index(drop=True),
+            output_type_dir / f"{PARTITION_KEY}={month}" / f"part-0.{output_format.value}",
+        )
+        for month, partition in output.groupby(months, sort=True)
+        if not existing_months or month >= existing_months[-1]
+    ]
+
+
+def _write_file(output: pd.DataFrame, file_path: Path, output_format: OutputFormat) -> Path:
+    """Write a dataframe to a file.
+
+    Args:
+        output: Dataframe to write.
+        file_path: Path of the file.
+        output_format: File format to write.
+
+    Returns:
+        Path of the written file.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # write to a temporary file first so readers never see a half-written file
+    tmp_file_path = file_path.with_name(f"{file_path.name}.tmp")
+
+    match output_format:
+        case OutputFormat.PARQUET:
+            _to_single_type_columns(output).to_parquet(tmp_file_path, index=False)
+        case OutputFormat.FEATHER:
+            _to_single_type_columns(output).reset_index(drop=True).to_feather(tmp_file_path)
+        case OutputFormat.CSV:
+            output.to_csv(tmp_file_path, index=False)
+
+    tmp_file_path.replace(file_path)
+
+    logger.info(f"Written {file_path}.")
+
+    return file_path
+
+
+def _to_single_type_columns(output: pd.DataFrame) -> pd.DataFrame:
+    """Convert the columns that mix types, such as the year of summary_returns (years and
+    "all_time"), to strings, as Arrow columns hold values of a single type.
+
+    Args:
+        output: Dataframe to write.
+
+    Returns:
+        Dataframe with a single type per column.
+    """
+    mixed_columns = [
+        column
+        for column in output.columns
+        if pd.api.types.is_object_dtype(output[column])
+        and pd.api.types.infer_dtype(output[column], skipna=True).startswith("mixed")
+    ]
+
+    if not mixed_columns:
+        return output
+
+    return output.astype(dict.fromkeys(mixed_columns, str))
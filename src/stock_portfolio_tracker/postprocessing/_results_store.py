@@ -0,0 +1,407 @@
+"""Indexed SQLite store of the pipeline results, for point and range queries without running the
+pipeline.
+"""
+
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker.utils import PipelineOutput, PositionType
+
+# the primary keys index the tables by portfolio, ticker and date, and the extra indexes by
+# portfolio and date
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS asset_evolution (
+    portfolio_id TEXT NOT NULL,
+    ticker_asset TEXT NOT NULL,
+    date TEXT NOT NULL,
+    curr_qty_asset REAL,
+    curr_val_asset REAL,
+    PRIMARY KEY (portfolio_id, ticker_asset, date)
+);
+CREATE INDEX IF NOT EXISTS asset_evolution_date ON asset_evolution (portfolio_id, date);
+
+CREATE TABLE IF NOT EXISTS portfolio_evolution (
+    portfolio_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    curr_val_portfolio REAL,
+    curr_abs_gain_portfolio REAL,
+    curr_perc_gain_portfolio REAL,
+    PRIMARY KEY (portfolio_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS benchmark_evolution (
+    portfolio_id TEXT NOT NULL,
+    ticker_benchmark TEXT NOT NULL,
+    date TEXT NOT NULL,
+    curr_val_benchmark REAL,
+    curr_abs_gain_benchmark REAL,
+    curr_perc_gain_benchmark REAL,
+    PRIMARY KEY (portfolio_id, ticker_benchmark, date)
+);
+CREATE INDEX IF NOT EXISTS benchmark_evolution_date ON benchmark_evolution (portfolio_id, date);
+
+CREATE TABLE IF NOT EXISTS summary_returns (
+    portfolio_id TEXT NOT NULL,
+    position TEXT NOT NULL,
+    metric_type TEXT NOT NULL,
+    unit_type TEXT NOT NULL,
+    year TEXT NOT NULL,
+    return REAL,
+    PRIMARY KEY (portfolio_id, position, metric_type, unit_type, year)
+);
+"""
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+class ResultsStore:
+    """SQLite database with the daily value of every asset, the daily evolution of the portfolio
+    and the benchmarks, and the returns, updated in place on every run.
+
+    Several portfolios can share a database, each with its own rows. Rows are keyed by portfolio,
+    ticker and date, so each run inserts the new days and overwrites the days already stored,
+    and the rows of earlier runs outside the dates of the current run are kept. The rows of the
+    assets and benchmarks that are not in the portfolio anymore, and the returns of earlier
+    runs, are deleted.
+    """
+
+    def __init__(self, db_path: Path, portfolio_id: str = "default") -> None:
+        """Initialize the store, creating the database and its tables if they do not exist.
+
+        Args:
+            db_path: Path of the SQLite database file.
+            portfolio_id: Identifier of the portfolio whose results are written and queried.
+                Defaults to "default".
+        """
+        self.db_path = db_path
+        self.portfolio_id = portfolio_id
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def write(
+        self,
+        outputs: dict[str, pd.DataFrame],
+        benchmark_tickers: list[str],
+        portfolio_model: pd.DataFrame | None = None,
+    ) -> None:
+        """Insert or update the results of a run, in a single transaction.
+
+        Only the tables whose results were computed in the run are updated: the portfolio and
+        benchmark evolution from the portfolio_evolution output, the returns from the
+        summary_returns output and the daily value of each asset from the portfolio model.
+
+        Args:
+            outputs: Pipeline outputs, by output type.
+            benchmark_tickers: Tickers of the benchmarks the portfolio was compared to.
+            portfolio_model: Daily quantity and value of each asset, sorted by ticker and
+                descending date, as modelled in the run. Defaults to None (not modelled).
+        """
+        logger.info(f"Writing results to {self.db_path}.")
+
+        with self._connect() as connection:
+            if portfolio_model is not None:
+                self._delete_stale(
+                    connection,
+                    "asset_evolution",
+                    "ticker_asset",
+                    portfolio_model["ticker_asset"].unique().tolist(),
+                )
+                # the state of each asset at the end of the day is the one after the last
+                # transaction of the day, the first row of the day by descending date
+                self._upsert(
+                    connection,
+                    "asset_evolution",
+                    portfolio_model.drop_duplicates(["ticker_asset", "date"])[
+                        ["ticker_asset", "date", "curr_qty_asset", "curr_val_asset"]
+                    ],
+                )
+
+            if (
+                portfolio_evolution := outputs.get(PipelineOutput.PORTFOLIO_EVOLUTION.value)
+            ) is not None:
+                self._delete_stale(
+                    connection, "benchmark_evolution", "ticker_benchmark", benchmark_tickers
+                )
+                self._upsert(
+                    connection,
+                    "portfolio_evolution",
+                    portfolio_evolution[
+                        [
+                            "date",
+                            "curr_val_portfolio",
+                            "curr_abs_gain_portfolio",
+                            "curr_perc_gain_portfolio",
+                        ]
+                    ],
+                )
+
+                for benchmark_ticker, suffix in _get_suffixes(benchmark_tickers).items():
+                    self._upsert(
+                        connection,
+                        "benchmark_evolution",
+                        portfolio_evolution[
+                            [
+                                "date",
+                                f"curr_val_benchmark{suffix}",
+                                f"curr_abs_gain_benchmark{suffix}",
+                                f"curr_perc_gain_benchmark{suffix}",
+                            ]
+                        ]
+                        .rename(
+                            columns={
+                                f"{column}{suffix}": column
+                                for column in (
+                                    "curr_val_benchmark",
+                                    "curr_abs_gain_benchmark",
+                                    "curr_perc_gain_benchmark",
+                                )
+                            }
+                        )
+                        .assign(ticker_benchmark=benchmark_ticker),
+                    )
+
+            if (summary_returns := outputs.get(PipelineOutput.SUMMARY_RETURNS.value)) is not None:
+                # the returns are recalculated for every year on every run
+                self._delete_stale(connection, "summary_returns", "position", [])
+                for position, suffix in {
+                    PositionType.PORTFOLIO.value: "",
+                    **_get_suffixes(benchmark_tickers),
+                }.items():
+                    return_column = (
+                        f"return_{PositionType.PORTFOLIO.value}"
+                        if position == PositionType.PORTFOLIO.value
+                        else f"return_{PositionType.BENCHMARK.value}{suffix}"
+                    )
+                    self._upsert(
+                        connection,
+                        "summary_returns",
+                        summary_returns[["metric_type", "unit_type", "year", return_column]]
+                        .rename(columns={return_column: "return"})
+                        .assign(position=position, year=lambda df: df["year"].astype(str)),
+                    )
+
+    def get_asset_evolution(
+        self,
+        ticker: str | None = None,
+        start_date: pd.Timestamp | None = None,
+        end_date: pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Get the daily quantity and value of the assets.
+
+        Args:
+            ticker: Ticker of the asset. Defaults to None (all assets).
+            start_date: First date to get. Defaults to None (from the first date stored).
+            end_date: Last date to get. Defaults to None (up to the last date stored).
+
+        Returns:
+            Daily quantity and value of the assets, sorted by ticker and descending date.
+        """
+        return self._query(
+            "asset_evolution",
+            {"ticker_asset": ticker},
+            start_date,
+            end_date,
+            order_by="ticker_asset, date DESC",
+        )
+
+    def get_portfolio_evolution(
+        self, start_date: pd.Timestamp | None = None, end_date: pd.Timestamp | None = None
+    ) -> pd.DataFrame:
+        """Get the daily value and gains of the portfolio.
+
+        Args:
+            start_date: First date to get. Defaults to None (from the first date stored).
+            end_date: Last date to get. Defaults to None (up to the last date stored).
+
+        Returns:
+            Daily value and gains of the portfolio, sorted by descending date.
+        """
+        return self._query("portfolio_evolution", {}, start_date, end_date, order_by="date DESC")
+
+    def get_benchmark_evolution(
+        self,
+        ticker: str | None = None,
+        start_date: pd.Timestamp | None = None,
+        end_date: pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Get the daily value and gains of the benchmarks.
+
+        Args:
+            ticker: Ticker of the benchmark. Defaults to None (all benchmarks).
+            start_date: First date to get. Defaults to None (from the first date stored).
+            end_date: Last date to get. Defaults to None (up to the last date stored).
+
+        Returns:
+            Daily value and gains of the benchmarks, sorted by ticker and descending date.
+        """
+        return self._query(
+            "benchmark_evolution",
+            {"ticker_benchmark": ticker},
+            start_date,
+            end_date,
+            order_by="ticker_benchmark, date DESC",
+        )
+
+    def get_summary_returns(self, position: str | None = None) -> pd.DataFrame:
+        """Get the returns of the portfolio and the benchmarks.
+
+        Args:
+            position: "portfolio" or the ticker of a benchmark. Defaults to None (all of them).
+
+        Returns:
+            Returns, by position, metric type, unit type and year.
+        """
+        return self._query(
+            "summary_returns",
+            {"position": position},
+            order_by="position, metric_type, unit_type, year DESC",
+        )
+
+    def get_portfolio_gain(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> float | None:
+        """Get the absolute gain of the portfolio between two dates.
+
+        Args:
+            start_date: Date to measure the gain from.
+            end_date: Date to measure the gain to.
+
+        Returns:
+            Absolute gain of the portfolio between the dates, or None if any of the dates is not
+            stored.
+        """
+        with self._connect() as connection:
+            gains = dict(
+                connection.execute(
+                    "SELECT date, curr_abs_gain_portfolio FROM portfolio_evolution "
+                    "WHERE portfolio_id = ? AND date IN (?, ?)",
+                    (
+                        self.portfolio_id,
+                        start_date.strftime(DATE_FORMAT),
+                        end_date.strftime(DATE_FORMAT),
+                    ),
+                ).fetchall()
+            )
+
+        if {start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT)} - gains.keys():
+            return None
+
+        gain: float = (
+            gains[end_date.strftime(DATE_FORMAT)] - gains[start_date.strftime(DATE_FORMAT)]
+        )
+
+        return gain
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the database, committing on exit unless there is an error.
+
+        Yields:
+            Connection to the database.
+        """
+        with closing(sqlite3.connect(self.db_path)) as connection, connection:
+            yield connection
+
+    def _upsert(self, connection: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+        """Insert the rows of a dataframe into a table for the portfolio, replacing the rows with
+        the same key.
+
+        Args:
+            connection: Connection to the database.
+            table: Table name.
+            df: Rows to insert, with a column for each column of the table but the portfolio id.
+        """
+        df = df.assign(portfolio_id=self.portfolio_id)
+
+        if "date" in df.columns:
+            df = df.assign(date=df["date"].dt.strftime(DATE_FORMAT))
+
+        connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(df.columns)}) "  # noqa: S608
+            f"VALUES ({', '.join('?' * len(df.columns))})",
+            df.itertuples(index=False, name=None),
+        )
+
+    def _delete_stale(
+        self, connection: sqlite3.Connection, table: str, column: str, values: list[str]
+    ) -> None:
+        """Delete the rows of the portfolio in a table whose value in a column is not one of the
+        current ones.
+
+        Args:
+            connection: Connection to the database.
+            table: Table name.
+            column: Column to check, such as the ticker.
+            values: Current values of the column. An empty list deletes every row.
+        """
+        connection.execute(
+            f"DELETE FROM {table} WHERE portfolio_id = ? "  # noqa: S608
+            f"AND {column} NOT IN ({', '.join('?' * len(values))})",
+            (self.portfolio_id, *values),
+        )
+
+    def _query(
+        self,
+        table: str,
+        filters: dict[str, Any],
+        start_date: pd.Timestamp | None = None,
+        end_date: pd.Timestamp | None = None,
+        order_by: str = "date DESC",
+    ) -> pd.DataFrame:
+        """Query the rows of the portfolio in a table with the given column values and dates.
+
+        Args:
+            table: Table name.
+            filters: Value of each column to filter by. None values do not filter.
+            start_date: First date to get. Defaults to None (no lower bound).
+            end_date: Last date to get. Defaults to None (no upper bound).
+            order_by: Order of the rows, as an ORDER BY clause. Defaults to descending date.
+
+        Returns:
+            Rows of the table, without the portfolio id and with the date column as datetimes.
+        """
+        conditions, params = ["portfolio_id = ?"], [self.portfolio_id]
+
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        for condition, date in (("date >= ?", start_date), ("date <= ?", end_date)):
+            if date is not None:
+                conditions.append(condition)
+                params.append(date.strftime(DATE_FORMAT))
+
+        with self._connect() as connection:
+            df = pd.read_sql_query(
+                f"SELECT * FROM {table} WHERE {' AND '.join(conditions)} "  # noqa: S608
+                f"ORDER BY {order_by}",
+                connection,
+                params=params,
+            ).drop(columns="portfolio_id")
+
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"], format=DATE_FORMAT)
+
+        return df
+
+
+def _get_suffixes(benchmark_tickers: list[str]) -> dict[str, str]:
+    """Get the suffix of the columns of each benchmark in the pipeline outputs.
+
+    Args:
+        benchmark_tickers: Tickers of the benchmarks.
+
+    Returns:
+        Suffix of each benchmark, empty if there is only one benchmark.
+    """
+    return {
+        benchmark_ticker: f"_{benchmark_ticker}" if len(benchmark_tickers) > 1 else ""
+        for benchmark_ticker in benchmark_tickers
+    }
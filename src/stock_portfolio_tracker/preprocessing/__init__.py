@@ -1,5 +1,7 @@
 """Preprocessing."""
 
+from ._ledger import TransactionLedger
 from ._preprocessing import Preprocessor
+from ._price_feeds import FilePriceFeed, PriceFeed, SocketPriceFeed
 
-__all__ = ["Preprocessor"]
+__all__ = ["FilePriceFeed", "Preprocessor", "PriceFeed", "SocketPriceFeed", "TransactionLedger"]
@@ -1,11 +1,17 @@
+import functools
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from pathlib import Path
 
 import pandas as pd
-import yfinance as yf  # type: ignore
 
 from stock_portfolio_tracker import utils
 
+# mocked API responses of the repository tests, resolved from the package so it works from any
+# working directory
+TESTING_ARTIFACTS_DIR = Path(__file__).parents[3] / "tests/integration/api_mocked_artifacts"
+
 
 class DataApi(ABC):
     @abstractmethod
@@ -68,6 +74,9 @@ class DataApi(ABC):
 
 class YahooFinanceApi(DataApi):
     def __init__(self) -> None:
+        # yfinance takes long to import, so only import it when it is really used
+        import yfinance as yf  # type: ignore  # noqa: PLC0415
+
         self.api = yf.Ticker
 
     def get_ticker_name(self, ticker: str) -> str:
@@ -152,8 +161,14 @@ class YahooFinanceApi(DataApi):
 
 
 class TestingApi(DataApi):
-    def __init__(self) -> None:
-        self.api = yf.Ticker
+    def __init__(self, artifacts_dir: Path = TESTING_ARTIFACTS_DIR) -> None:
+        """Initialize the testing API.
+
+        Args:
+            artifacts_dir: Directory with the mocked API responses. Defaults to the ones of the
+                repository tests.
+        """
+        self.artifacts_dir = artifacts_dir
 
     def get_ticker_name(self, ticker: str) -> str:  # noqa: ARG002
         """Get the name of the ticker.
@@ -180,8 +195,8 @@ class TestingApi(DataApi):
     def get_asset_historical_data(
         self,
         ticker: str,
-        start_date: pd.Timestamp,  # noqa: ARG002
-        end_date: pd.Timestamp,  # noqa: ARG002
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
     ) -> pd.DataFrame:
         """Get the historical data of the asset.
 
@@ -193,16 +208,109 @@ class TestingApi(DataApi):
         Returns:
             DataFrame with the historical data of the asset.
         """
-        return utils.load_pickle(
-            file_path=Path("tests/integration/api_mocked_artifacts"), file_name=f"{ticker}_data.pkl"
+        return _slice_dates(
+            _load_testing_artifact(self.artifacts_dir, f"{ticker}_data.pkl"),
+            start_date,
+            end_date,
         )
 
     def get_currency_exchange_rate(
         self,
         origin_currency: str,  # noqa: ARG002
         local_currency: str,  # noqa: ARG002
-        start_date: pd.Timestamp,  # noqa: ARG002
-        end_date: pd.Timestamp,  # noqa: ARG002
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame:
+        """Get the exchange rate between two currencies.
+
+        Args:
+            origin_currency: Origin currency symbol.
+            local_currency: Local currency symbol.
+            start_date: Start date for the exchange rate data.
+            end_date: End date for the exchange rate data.
+
+        Returns:
+            DataFrame with the exchange rate data between the two currencies.
+        """
+        return _slice_dates(
+            _load_testing_artifact(self.artifacts_dir, "currency_exchange_rate.pkl"),
+            start_date,
+            end_date,
+        )
+
+
+class InMemoryDataApi(DataApi):
+    def __init__(self, data_api: DataApi) -> None:
+        """Keep the responses of another data API warm in memory, so that later requests only
+        download the days that are not in memory yet.
+
+        Args:
+            data_api: Data API to download the data from.
+        """
+        self.data_api = data_api
+        self.tickers_info: dict[tuple[str, str], str] = {}
+        self.histories: dict[str, tuple[pd.Timestamp, pd.Timestamp, pd.DataFrame]] = {}
+        self.lock = threading.Lock()
+
+    def get_ticker_name(self, ticker: str) -> str:
+        """Get the name of the ticker.
+
+        Args:
+            ticker: Ticker symbol.
+
+        Returns:
+            Name of the ticker.
+        """
+        if (ticker, "name") not in self.tickers_info:
+            self.tickers_info[ticker, "name"] = self.data_api.get_ticker_name(ticker)
+
+        return self.tickers_info[ticker, "name"]
+
+    def get_ticker_currency(self, ticker: str) -> str:
+        """Get the currency of the ticker.
+
+        Args:
+            ticker: Ticker symbol.
+
+        Returns:
+            Name of the ticker.
+        """
+        if (ticker, "currency") not in self.tickers_info:
+            self.tickers_info[ticker, "currency"] = self.data_api.get_ticker_currency(ticker)
+
+        return self.tickers_info[ticker, "currency"]
+
+    def get_asset_historical_data(
+        self, ticker: str, start_date: pd.Timestamp, end_date: pd.Timestamp
+    ) -> pd.DataFrame:
+        """Get the historical data of the asset.
+
+        Yahoo Finance adjusts past prices for splits and dividends, so when the newly downloaded
+        days contain a split or dividend that was not in memory, the whole history is downloaded
+        again.
+
+        Args:
+            ticker: Ticker symbol.
+            start_date: Start date for the historical data.
+            end_date: End date for the historical data.
+
+        Returns:
+            DataFrame with the historical data of the asset.
+        """
+        return self._get_history(
+            ticker,
+            start_date,
+            end_date,
+            lambda start, end: self.data_api.get_asset_historical_data(ticker, start, end),
+            _has_new_corporate_actions,
+        )
+
+    def get_currency_exchange_rate(
+        self,
+        origin_currency: str,
+        local_currency: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
     ) -> pd.DataFrame:
         """Get the exchange rate between two currencies.
 
@@ -215,7 +323,117 @@ class TestingApi(DataApi):
         Returns:
             DataFrame with the exchange rate data between the two currencies.
         """
-        return utils.load_pickle(
-            file_path=Path("tests/integration/api_mocked_artifacts"),
-            file_name="currency_exchange_rate.pkl",
+        return self._get_history(
+            f"{local_currency}{origin_currency}=X",
+            start_date,
+            end_date,
+            lambda start, end: self.data_api.get_currency_exchange_rate(
+                origin_currency, local_currency, start, end
+            ),
+            lambda new_days, history: False,  # noqa: ARG005
         )
+
+    def _get_history(
+        self,
+        key: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+        download: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame],
+        needs_full_download: Callable[[pd.DataFrame, pd.DataFrame], bool],
+    ) -> pd.DataFrame:
+        """Serve a history from memory, downloading only the days after the latest day in memory.
+
+        The latest day in memory is always downloaded again, since it may have been stored before
+        market close.
+
+        Args:
+            key: Key of the history in memory.
+            start_date: Start date for the historical data.
+            end_date: End date for the historical data.
+            download: Function that downloads the history between two dates.
+            needs_full_download: Function that tells, given the newly downloaded days and the
+                history in memory, whether the whole history must be downloaded again.
+
+        Returns:
+            DataFrame with the history between start and end date, sorted by descending date.
+        """
+        with self.lock:
+            cached = self.histories.get(key)
+
+        if cached is None or start_date < cached[0]:
+            history_start_date, history_end_date = start_date, end_date
+            history = download(start_date, end_date)
+
+        else:
+            history_start_date, history_end_date, history = cached
+
+            if end_date > history_end_date:
+                latest_day = history["date"].max() if len(history) else history_start_date
+                new_days = download(latest_day, end_date)
+
+                if needs_full_download(new_days, history):
+                    history = download(history_start_date, end_date)
+                else:
+                    history = pd.concat(
+                        [new_days, history[history["date"] < latest_day]]
+                    ).reset_index(drop=True)
+
+                history_end_date = end_date
+
+        with self.lock:
+            self.histories[key] = (history_start_date, history_end_date, history)
+
+        return history[
+            (history["date"] >= start_date.normalize()) & (history["date"] < end_date)
+        ].reset_index(drop=True)
+
+
+def _has_new_corporate_actions(new_days: pd.DataFrame, history: pd.DataFrame) -> bool:
+    """Tell whether the newly downloaded days contain splits or dividends not in the history.
+
+    Args:
+        new_days: Newly downloaded asset data.
+        history: Asset data in memory.
+
+    Returns:
+        Whether there are new splits or dividends.
+    """
+
+    def _corporate_action_dates(df: pd.DataFrame) -> set[pd.Timestamp]:
+        return set(
+            df[(df["split"] != 0) | (df["close_adj_origin_currency_dividends"] != 0)]["date"]
+        )
+
+    return bool(_corporate_action_dates(new_days) - _corporate_action_dates(history))
+
+
+@functools.cache
+def _load_testing_artifact(artifacts_dir: Path, file_name: str) -> pd.DataFrame:
+    """Load a mocked API response of the testing data API, only once per process.
+
+    Args:
+        artifacts_dir: Directory with the mocked API responses.
+        file_name: Name of the file containing the response.
+
+    Returns:
+        Mocked API response.
+    """
+    artifact: pd.DataFrame = utils.load_pickle(file_path=artifacts_dir, file_name=file_name)
+
+    return artifact
+
+
+def _slice_dates(
+    data: pd.DataFrame, start_date: pd.Timestamp, end_date: pd.Timestamp
+) -> pd.DataFrame:
+    """Get the rows of the requested dates, as a new dataframe so the cached data stays intact.
+
+    Args:
+        data: Data with a date column.
+        start_date: First date to get.
+        end_date: Last date to get.
+
+    Returns:
+        Rows between start and end date, both included.
+    """
+    return data[(data["date"] >= start_date) & (data["date"] <= end_date)].reset_index(drop=True)
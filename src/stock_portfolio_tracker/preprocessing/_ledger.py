@@ -0,0 +1,183 @@
+"""Append-only ledger of parsed transactions."""
+
+import hashlib
+import io
+import pickle
+from pathlib import Path
+from typing import IO
+
+import pandas as pd
+from loguru import logger
+
+from stock_portfolio_tracker.utils import LedgerCheckpoint, OutputFormat, load_pickle
+
+from ._transactions import (
+    FILE_FORMATS,
+    normalize_transactions,
+    read_csv_transactions,
+    read_transactions,
+)
+
+# bytes of the transactions file hashed at a time
+HASH_BLOCK_SIZE = 1024**2
+
+
+class TransactionLedger:
+    """On-disk store of the transactions parsed from CSV transactions files, with a checkpoint of
+    the part of each file already parsed, so that rows appended to the file since the last run
+    are the only ones parsed again.
+    """
+
+    def __init__(self, ledger_dir: Path) -> None:
+        """Initialize the ledger.
+
+        Args:
+            ledger_dir: Directory where the parsed transactions and checkpoints are stored.
+        """
+        self.ledger_dir = ledger_dir
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+
+    def read(self, file_path: Path, end_date: pd.Timestamp | None = None) -> pd.DataFrame:
+        """Read a transactions file, parsing only the rows appended since the last read.
+
+        If any byte of the part of the file already parsed changed, i.e. the file was rewritten
+        rather than appended to, the whole file is parsed again. A last row without a trailing
+        newline may still be being written, so it is parsed but not stored. Parquet and Feather
+        files are read in full, since they are not appended to.
+
+        Args:
+            file_path: Path of the transactions file.
+            end_date: Transactions after this date are left out. Defaults to None (keep all).
+
+        Returns:
+            Transactions with signed quantity and value, sorted by descending date and ticker.
+        """
+        if FILE_FORMATS.get(file_path.suffix.lower(), OutputFormat.CSV) != OutputFormat.CSV:
+            return read_transactions(file_path, end_date)
+
+        ledger_file_name = f"{file_path.name}.ledger.pkl"
+        checkpoint, transactions = self._load(ledger_file_name)
+
+        with file_path.open("rb") as file:
+            prefix_hash = hashlib.sha256()
+
+            if checkpoint is not None and (
+                len(transactions) != checkpoint.row_count
+                or _hash_prefix(file, checkpoint.byte_offset, prefix_hash) != checkpoint.prefix_hash
+            ):
+                logger.info(f"{file_path} was rewritten, parsing it in full.")
+                checkpoint, prefix_hash = None, hashlib.sha256()
+
+            start_offset = checkpoint.byte_offset if checkpoint else 0
+            file.seek(start_offset)
+            content = file.read()
+
+        # only complete rows are stored, since the last one may still be being written
+        complete_rows, incomplete_row = (
+            content[: content.rfind(b"\n") + 1],
+            content[content.rfind(b"\n") + 1 :],
+        )
+        prefix_hash.update(complete_rows)
+
+        if checkpoint is None:
+            header = complete_rows[: complete_rows.find(b"\n") + 1]
+            appended_transactions = _parse_rows(header, complete_rows[len(header) :])
+            transactions = appended_transactions
+        else:
+            header = checkpoint.header
+            appended_transactions = _parse_rows(header, complete_rows)
+
+            if len(appended_transactions):
+                transactions = pd.concat([transactions, appended_transactions], ignore_index=True)
+
+        logger.info(f"Parsed {len(appended_transactions)} new transactions of {file_path}.")
+
+        self._save(
+            ledger_file_name,
+            LedgerCheckpoint(
+                byte_offset=start_offset + len(complete_rows),
+                row_count=len(transactions),
+                prefix_hash=prefix_hash.hexdigest(),
+                header=header,
+            ),
+            transactions,
+        )
+
+        if incomplete_row.strip():
+            transactions = pd.concat(
+                [transactions, _parse_rows(header, incomplete_row)], ignore_index=True
+            )
+
+        return normalize_transactions(transactions, end_date)
+
+    def _load(self, ledger_file_name: str) -> tuple[LedgerCheckpoint | None, pd.DataFrame]:
+        """Load the parsed transactions of a file and its checkpoint.
+
+        Args:
+            ledger_file_name: Name of the ledger file.
+
+        Returns:
+            Checkpoint and transactions parsed, or no checkpoint and no transactions if the file
+            was never parsed.
+        """
+        if not (self.ledger_dir / ledger_file_name).exists():
+            return None, _parse_rows(b"", b"")
+
+        return load_pickle(file_path=self.ledger_dir, file_name=ledger_file_name)  # type: ignore
+
+    def _save(
+        self, ledger_file_name: str, checkpoint: LedgerCheckpoint, transactions: pd.DataFrame
+    ) -> None:
+        """Store the parsed transactions of a file and its checkpoint.
+
+        Args:
+            ledger_file_name: Name of the ledger file.
+            checkpoint: Part of the transactions file parsed.
+            transactions: Transactions parsed, in the order of the file.
+        """
+        # write to a temporary file first so an interrupted run never leaves a corrupt ledger
+        tmp_file_path = self.ledger_dir / f"{ledger_file_name}.tmp"
+        with tmp_file_path.open("wb") as file:
+            pickle.dump((checkpoint, transactions), file)
+        tmp_file_path.replace(self.ledger_dir / ledger_file_name)
+
+
+def _hash_prefix(file: IO[bytes], byte_offset: int, prefix_hash: "hashlib._Hash") -> str:
+    """Hash the start of a file, up to a byte offset.
+
+    Args:
+        file: Open file, positioned at its start.
+        byte_offset: Number of bytes to hash.
+        prefix_hash: Hash to update with the bytes read.
+
+    Returns:
+        Hex digest of the bytes, or an empty string if the file is shorter than byte_offset.
+    """
+    remaining_bytes = byte_offset
+
+    while remaining_bytes:
+        if not (block := file.read(min(HASH_BLOCK_SIZE, remaining_bytes))):
+            return ""
+
+        prefix_hash.update(block)
+        remaining_bytes -= len(block)
+
+    return prefix_hash.hexdigest()
+
+
+def _parse_rows(header: bytes, rows: bytes) -> pd.DataFrame:
+    """Parse rows of a CSV transactions file.
+
+    Args:
+        header: Header line of the file.
+        rows: Rows to parse.
+
+    Returns:
+        Transactions with signed quantity and value, in the order of the file.
+    """
+    if not rows.strip():
+        return pd.DataFrame({"date": [], "ticker": [], "trans_qty": [], "trans_val": []}).astype(
+            {"date": "datetime64[ns]", "ticker": object, "trans_qty": float, "trans_val": float}
+        )
+
+    return read_csv_transactions(io.BytesIO(header + rows))
@@ -1,62 +1,387 @@
 """Preprocess input data."""
 
+import dataclasses
 import json
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
 
-import numpy as np
 import pandas as pd
 from loguru import logger
 
 from stock_portfolio_tracker import utils
 from stock_portfolio_tracker.exceptions import YahooFinanceError
 from stock_portfolio_tracker.utils import (
+    ColumnStore,
     Config,
+    DtypeBackend,
     PortfolioData,
     PositionType,
-    TransactionType,
+    StageCache,
+    convert_dtype_backend,
+    get_peak_rss,
+    metrics_recorder,
+    record_metrics,
+    run_stage,
     sort_at_end,
 )
 
 from . import _factories
+from ._interfaces import InMemoryDataApi
+from ._ledger import TransactionLedger
+from ._transactions import read_transactions
 
 TIME_DELTA = 0.9999
 
+# estimated memory needed to model one ticker per day of the portfolio, including the intermediate
+# dataframes of the modelling
+BYTES_PER_TICKER_DAY = 4_000
+
 
 class Preprocessor:
-    def __init__(self, data_api_type: Any, input_data_dir: Path, end_date: pd.Timestamp) -> None:
+    def __init__(
+        self,
+        data_api_type: Any,
+        input_data_dir: Path,
+        end_date: pd.Timestamp,
+        *,
+        cache: StageCache | None = None,
+        in_memory_market_data: bool = False,
+        ledger: TransactionLedger | None = None,
+        dtype_backend: DtypeBackend = DtypeBackend.NUMPY,
+    ) -> None:
         """Initialize the Preprocessor.
 
         Args:
             data_api_type: Type of data API to use (e.g., Yahoo Finance, Testing).
             input_data_dir: Directory where the input data files are located.
             end_date: End date for the portfolio modelling.
+            cache: Stage cache to reuse the results of previous runs. Defaults to None.
+            in_memory_market_data: Keep the downloaded market data in memory, so that later
+                calls to preprocess() only download the days not loaded yet. Defaults to False.
+            ledger: Transaction ledger to parse only the transactions appended since the last
+                run. Defaults to None (parse the whole transactions file).
+            dtype_backend: Dtype backend of the string columns (e.g. tickers) of the loaded data.
+                Defaults to DtypeBackend.NUMPY.
         """
+        self.data_api_type = data_api_type
         self.data_api = _factories.create_data_api(data_api_type=data_api_type)
+
+        if in_memory_market_data:
+            self.data_api = InMemoryDataApi(self.data_api)
+
         self.input_data_dir = input_data_dir
         self.end_date = end_date
+        self.cache = cache
+        self.ledger = ledger
+        self.dtype_backend = dtype_backend
+        self.assets_info: dict[str, dict[str, str]] = {}
 
     def preprocess(
         self,
         config_file_name: str,
         transactions_file_name: str,
+        on_asset_loaded: Callable[[PortfolioData, pd.DataFrame, pd.DataFrame], Any] | None = None,
+        load_benchmarks: bool = True,  # noqa: FBT001, FBT002
     ) -> tuple[Config, PortfolioData, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Load all necessary data from user input and yahoo finance API.
 
         Args:
             config_file_name: File name for config.
             transactions_file_name: File name for transactions.
+            on_asset_loaded: Function called with the portfolio data, prices and dividends of each
+                asset as soon as they are loaded, so the asset can be modelled while the rest of
+                downloads are in flight. It is called in the calling thread, not in the download
+                thread pool, and not for assets loaded from the cache. Defaults to None.
+            load_benchmarks: Whether to load the benchmarks. If not, the benchmark prices and
+                dividends are empty. Defaults to True.
 
         Returns:
             All necessary input data for the calculations.
         """
-        config = self._load_config(config_file_name=config_file_name)
+        config, portfolio_data, currency_exchanges = self._load_portfolio_inputs(
+            config_file_name, transactions_file_name
+        )
+
+        def _on_ticker_loaded(asset_data: pd.DataFrame) -> None:
+            """Hand the data of one asset over to on_asset_loaded.
+
+            Args:
+                asset_data: Prices, splits and dividends of the asset in portfolio currency.
+            """
+            if on_asset_loaded is not None:
+                on_asset_loaded(
+                    portfolio_data, *self._split_ticker_data(asset_data, PositionType.ASSET)
+                )
+
+        asset_data = self._load_position_data(
+            list(portfolio_data.assets_info.keys()),
+            PositionType.ASSET,
+            portfolio_data,
+            currency_exchanges,
+            _on_ticker_loaded,
+        )
+        benchmark_data = (
+            self._load_position_data(
+                config.benchmark_tickers, PositionType.BENCHMARK, portfolio_data, currency_exchanges
+            )
+            if load_benchmarks
+            else self._empty_ticker_data(PositionType.BENCHMARK)
+        )
+
+        logger.info("End of preprocess.")
+
+        return self._split_prices_and_dividends(config, portfolio_data, asset_data, benchmark_data)
+
+    def preprocess_in_chunks(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+        memory_budget: int,
+    ) -> tuple[
+        Config,
+        PortfolioData,
+        Iterator[tuple[pd.DataFrame, pd.DataFrame]],
+        pd.DataFrame,
+        pd.DataFrame,
+    ]:
+        """Load the same input data as preprocess(), but with the assets loaded lazily in chunks
+        of tickers small enough to be modelled within the memory budget.
+
+        The number of tickers per chunk is estimated from the memory still free in the budget
+        after loading the benchmarks, and the memory a ticker needs per day of the portfolio.
+        Asset chunks are not cached.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            memory_budget: Peak resident memory of the process to aim for, in bytes.
+
+        Returns:
+            Config, portfolio data, generator of the prices and dividends of each chunk of assets
+            (in ascending ticker order), benchmark prices and benchmark dividends.
+        """
+        config, portfolio_data, currency_exchanges = self._load_portfolio_inputs(
+            config_file_name, transactions_file_name
+        )
+
+        benchmark_data = self._load_position_data(
+            config.benchmark_tickers, PositionType.BENCHMARK, portfolio_data, currency_exchanges
+        )
+
+        tickers = list(portfolio_data.assets_info.keys())
+        tickers_per_chunk = max(
+            1,
+            (memory_budget - (get_peak_rss() or 0))
+            // (
+                ((portfolio_data.end_date - portfolio_data.start_date).days + 1)
+                * BYTES_PER_TICKER_DAY
+            ),
+        )
+
+        logger.info(f"Loading {len(tickers)} assets in chunks of {tickers_per_chunk} tickers.")
+
+        def _load_asset_chunks() -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+            """Load the assets one chunk of tickers at a time.
+
+            Yields:
+                Prices and dividends of the assets of each chunk.
+            """
+            for chunk_start in range(0, len(tickers), tickers_per_chunk):
+                yield self._split_ticker_data(
+                    self._load_ticker_data(
+                        tickers[chunk_start : chunk_start + tickers_per_chunk],
+                        portfolio_data.start_date,
+                        portfolio_data.end_date,
+                        currency_exchanges,
+                        PositionType.ASSET,
+                        sorting_columns=[
+                            {"columns": ["ticker_asset", "date"], "ascending": [True, False]}
+                        ],
+                    ),
+                    PositionType.ASSET,
+                )
+
+        return (
+            config,
+            portfolio_data,
+            _load_asset_chunks(),
+            *self._split_ticker_data(benchmark_data, PositionType.BENCHMARK),
+        )
+
+    def preprocess_out_of_core(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+        price_store: ColumnStore,
+    ) -> tuple[Config, PortfolioData, pd.DataFrame, pd.DataFrame]:
+        """Load the same input data as preprocess(), but with the daily data of each asset
+        written to a column store as soon as it is loaded, instead of gathering the data of all
+        assets in memory.
+
+        The data of each asset is stored by ascending date, under its ticker, in the columns date,
+        split_asset, close_unadj_local_currency_asset and
+        close_unadj_local_currency_dividends_asset. Asset data is not cached.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+            price_store: Column store to write the data of each asset to.
+
+        Returns:
+            Config, portfolio data, benchmark prices and benchmark dividends.
+        """
+        config, portfolio_data, currency_exchanges = self._load_portfolio_inputs(
+            config_file_name, transactions_file_name
+        )
+
+        def _multithreader_helper(ticker: str) -> None:
+            """Load one asset and write it to the price store.
+
+            Args:
+                ticker: Ticker to load.
+            """
+            asset_data = self._load_single_ticker_data(
+                ticker,
+                portfolio_data.start_date,
+                portfolio_data.end_date,
+                currency_exchanges,
+                PositionType.ASSET,
+            ).sort_values("date")
+
+            price_store.append(
+                ticker,
+                {
+                    column: asset_data[column].to_numpy()
+                    for column in (
+                        "date",
+                        "split_asset",
+                        "close_unadj_local_currency_asset",
+                        "close_unadj_local_currency_dividends_asset",
+                    )
+                },
+            )
+
+        def _log_progress(completed: int, total: int) -> None:
+            """Log how many assets are stored so far.
+
+            Args:
+                completed: Number of assets stored.
+                total: Number of assets to store.
+            """
+            logger.info(f"Stored {completed} of {total} asset tickers.")
+
+        utils.multithreader(
+            _multithreader_helper,
+            [(ticker,) for ticker in portfolio_data.assets_info],
+            on_progress=_log_progress,
+        )
+
+        benchmark_data = self._load_position_data(
+            config.benchmark_tickers, PositionType.BENCHMARK, portfolio_data, currency_exchanges
+        )
+
+        logger.info("End of preprocess.")
+
+        return (
+            config,
+            portfolio_data,
+            *self._split_ticker_data(benchmark_data, PositionType.BENCHMARK),
+        )
+
+    def preprocess_intraday(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+    ) -> tuple[Config, PortfolioData, pd.DataFrame, dict[str, float]]:
+        """Load the input data to value the portfolio during the trading day after end date: the
+        daily prices of the assets up to end date, and the exchange rate of the currency of each
+        asset at end date, to convert the prices of the ticks to the portfolio currency.
+        Benchmarks are not loaded.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+
+        Returns:
+            Config, portfolio data, asset prices and exchange rate of each asset ticker, as
+            units of the currency of the asset per unit of the portfolio currency.
+        """
+        config, portfolio_data, currency_exchanges = self._load_portfolio_inputs(
+            config_file_name, transactions_file_name
+        )
+
+        asset_data = self._load_position_data(
+            list(portfolio_data.assets_info.keys()),
+            PositionType.ASSET,
+            portfolio_data,
+            currency_exchanges,
+        )
+        exchange_rates = currency_exchanges[
+            currency_exchanges["date"] == portfolio_data.end_date
+        ].set_index("ticker_exch_rate")["close_currency_rate"]
+
+        logger.info("End of preprocess.")
 
-        portfolio_data = self._load_portfolio_data(transactions_file_name=transactions_file_name)
+        asset_prices, _ = self._split_ticker_data(asset_data, PositionType.ASSET)
 
-        currency_exchanges = self._load_currency_exchange(
+        return (
+            config,
             portfolio_data,
+            asset_prices,
+            {
+                ticker: float(exchange_rates[asset_info["currency"]])
+                for ticker, asset_info in portfolio_data.assets_info.items()
+            },
+        )
+
+    def _load_portfolio_inputs(
+        self,
+        config_file_name: str,
+        transactions_file_name: str,
+    ) -> tuple[Config, PortfolioData, pd.DataFrame]:
+        """Load the config, the portfolio data and the currency exchanges of the portfolio.
+
+        Args:
+            config_file_name: File name for config.
+            transactions_file_name: File name for transactions.
+
+        Returns:
+            Config, portfolio data and currency exchanges.
+        """
+        config = run_stage(
+            self.cache,
+            "config",
+            self._read_input_file(config_file_name),
+            self._load_config,
+            config_file_name=config_file_name,
+        )
+
+        portfolio_data = run_stage(
+            self.cache,
+            "portfolio_data",
+            (self.data_api_type, self.end_date, self._read_input_file(transactions_file_name)),
+            self._load_portfolio_data,
+            transactions_file_name=transactions_file_name,
+        )
+        portfolio_data = self._convert_portfolio_data(portfolio_data)
+
+        currencies = {asset_info["currency"] for asset_info in portfolio_data.assets_info.values()}
+        currency_exchanges = run_stage(
+            self.cache,
+            "currency_exchange",
+            (
+                self.data_api_type,
+                currencies,
+                config.portfolio_currency,
+                portfolio_data.start_date,
+                portfolio_data.end_date,
+            ),
+            self._load_currency_exchange,
+            currencies,
             config.portfolio_currency,
+            portfolio_data.start_date,
+            portfolio_data.end_date,
             sorting_columns=[
                 {
                     "columns": ["ticker_exch_rate", "date"],
@@ -65,51 +390,177 @@ class Preprocessor:
             ],
         )
 
-        asset_data = self._load_ticker_data(
-            list(portfolio_data.assets_info.keys()),
+        return config, portfolio_data, currency_exchanges
+
+    def _load_position_data(
+        self,
+        tickers: list[str],
+        position_type: PositionType,
+        portfolio_data: PortfolioData,
+        currency_exchanges: pd.DataFrame,
+        on_ticker_loaded: Callable[[pd.DataFrame], Any] | None = None,
+    ) -> pd.DataFrame:
+        """Load the data of all tickers of a position type, from the cache if possible.
+
+        Args:
+            tickers: List of tickers to load data for.
+            position_type: Type of position (asset, benchmark, etc).
+            portfolio_data: Transactions history and other portfolio data.
+            currency_exchanges: Dataframe with the currency exchanges for all tickers.
+            on_ticker_loaded: Function called with the converted data of each ticker as soon as it
+                is loaded. Defaults to None.
+
+        Returns:
+            Dataframe with all historical prices and stock splits.
+        """
+        position_data: pd.DataFrame = run_stage(
+            self.cache,
+            f"{position_type.value}_data",
+            (
+                self.data_api_type,
+                tickers,
+                portfolio_data.start_date,
+                portfolio_data.end_date,
+                currency_exchanges,
+            ),
+            self._load_ticker_data,
+            tickers,
             portfolio_data.start_date,
             portfolio_data.end_date,
             currency_exchanges,
-            PositionType.ASSET,
-            sorting_columns=[{"columns": ["ticker_asset", "date"], "ascending": [True, False]}],
+            position_type,
+            sorting_columns=[
+                {
+                    "columns": [f"ticker_{position_type.value}", "date"],
+                    "ascending": [True, False],
+                }
+            ],
+            on_ticker_loaded=on_ticker_loaded,
         )
 
-        benchmark_data = self._load_ticker_data(
-            [config.benchmark_ticker],
-            portfolio_data.start_date,
-            portfolio_data.end_date,
-            currency_exchanges,
-            PositionType.BENCHMARK,
-            sorting_columns=[{"columns": ["ticker_benchmark", "date"], "ascending": [True, False]}],
+        return position_data
+
+    def preprocess_batch(
+        self,
+        portfolio_files: list[tuple[str, str]],
+    ) -> Iterator[
+        tuple[Config, PortfolioData, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]
+    ]:
+        """Load the input data of many portfolios, downloading every ticker only once.
+
+        The union of tickers and currency exchanges is downloaded once, over the widest date range
+        of all portfolios. Each portfolio then fills the days without trading and converts to its
+        currency from its own start date, so that its input data is the same as the output of
+        preprocess().
+
+        Args:
+            portfolio_files: Pairs of (config file name, transactions file name).
+
+        Yields:
+            All necessary input data for the calculations, for each portfolio in input order.
+        """
+        portfolios = [
+            (
+                self._load_config(config_file_name=config_file_name),
+                self._load_portfolio_data(transactions_file_name=transactions_file_name),
+            )
+            for config_file_name, transactions_file_name in portfolio_files
+        ]
+
+        start_date = min(portfolio_data.start_date for _, portfolio_data in portfolios)
+        assets_info = {
+            ticker: asset_info
+            for _, portfolio_data in portfolios
+            for ticker, asset_info in portfolio_data.assets_info.items()
+        }
+        benchmark_tickers = sorted(
+            {ticker for config, _ in portfolios for ticker in config.benchmark_tickers}
         )
 
-        logger.info("End of preprocess.")
+        asset_histories = self._download_ticker_data(sorted(assets_info), start_date, self.end_date)
+        benchmark_histories = self._download_ticker_data(
+            benchmark_tickers, start_date, self.end_date
+        )
 
-        return (
-            config,
-            portfolio_data,
-            asset_data[
-                [
-                    "date",
-                    "ticker_asset",
-                    "split_asset",
-                    "close_unadj_local_currency_asset",
-                ]
-            ],
-            asset_data[["date", "ticker_asset", "close_unadj_local_currency_dividends_asset"]],
-            benchmark_data[
-                [
-                    "date",
-                    "ticker_benchmark",
-                    "split_benchmark",
-                    "close_unadj_local_currency_benchmark",
-                ]
-            ],
-            benchmark_data[
-                ["date", "ticker_benchmark", "close_unadj_local_currency_dividends_benchmark"]
-            ],
+        currency_pairs = sorted(
+            {
+                (config.portfolio_currency, origin_currency)
+                for config, portfolio_data in portfolios
+                for origin_currency in {
+                    asset_info["currency"] for asset_info in portfolio_data.assets_info.values()
+                }
+                | {config.portfolio_currency}
+            }
+        )
+        exchange_histories = dict(
+            zip(
+                currency_pairs,
+                utils.multithreader(
+                    self._download_currency_exchange,
+                    [
+                        (origin_currency, local_currency, start_date, self.end_date)
+                        for local_currency, origin_currency in currency_pairs
+                    ],
+                ),
+                strict=True,
+            )
         )
 
+        logger.info("End of preprocess.")
+
+        for config, loaded_portfolio_data in portfolios:
+            portfolio_data = self._convert_portfolio_data(loaded_portfolio_data)
+
+            origin_currencies = {
+                asset_info["currency"] for asset_info in portfolio_data.assets_info.values()
+            } | {config.portfolio_currency}
+
+            currency_exchanges = (
+                pd.concat(
+                    [
+                        self._fill_currency_exchange(
+                            exchange_histories[config.portfolio_currency, origin_currency],
+                            origin_currency,
+                            portfolio_data.start_date,
+                            portfolio_data.end_date,
+                        )
+                        for origin_currency in origin_currencies
+                    ]
+                )
+                .sort_values(["ticker_exch_rate", "date"], ascending=[True, False])
+                .reset_index(drop=True)
+            )
+
+            yield self._split_prices_and_dividends(
+                config,
+                portfolio_data,
+                self._convert_histories(
+                    asset_histories,
+                    list(portfolio_data.assets_info),
+                    portfolio_data,
+                    currency_exchanges,
+                    PositionType.ASSET,
+                ),
+                self._convert_histories(
+                    benchmark_histories,
+                    config.benchmark_tickers,
+                    portfolio_data,
+                    currency_exchanges,
+                    PositionType.BENCHMARK,
+                ),
+            )
+
+    def _read_input_file(self, file_name: str) -> bytes | None:
+        """Read the raw content of an input file, to use it as cache key.
+
+        Args:
+            file_name: Input file name.
+
+        Returns:
+            Content of the file, or None if caching is disabled.
+        """
+        return (self.input_data_dir / Path(file_name)).read_bytes() if self.cache else None
+
     def _load_config(self, config_file_name: str) -> Config:
         """Load config.json.
 
@@ -122,6 +573,7 @@ class Preprocessor:
         with (self.input_data_dir / Path(config_file_name)).open() as file:
             return Config(**json.load(file))
 
+    @record_metrics()
     def _load_portfolio_data(self, transactions_file_name: str) -> PortfolioData:
         """Load all portfolio data, such as transactions, start date, etc.
 
@@ -133,88 +585,60 @@ class Preprocessor:
         """
         logger.info("Loading portfolio data.")
 
-        transactions = (
-            pd.read_csv(self.input_data_dir / Path(transactions_file_name))
-            .astype(
-                {
-                    "date": str,
-                    "transaction_type": str,
-                    "ticker": str,
-                    "trans_qty": float,
-                    "trans_val": float,
-                },
-            )
-            .assign(
-                date=lambda df: pd.to_datetime(df["date"].str.replace("/", "-"), format="%d-%m-%Y"),
-                trans_val=lambda df: np.where(
-                    df["transaction_type"] == TransactionType.SALE.value,
-                    abs(df["trans_val"]),
-                    -abs(df["trans_val"]),
-                ),
-                trans_qty=lambda df: np.where(
-                    df["transaction_type"] == TransactionType.SALE.value,
-                    -abs(df["trans_qty"]),
-                    abs(df["trans_qty"]),
-                ),
-            )
-            .drop("transaction_type", axis=1)
-            .sort_values(
-                by=["date", "ticker"],
-                ascending=[False, True],
-            )
-            .rename(
-                columns={
-                    "ticker": "ticker_asset",
-                    "trans_qty": "trans_qty_asset",
-                    "trans_val": "trans_val_asset",
-                },
-            )
-            .reset_index(drop=True)
+        transactions = (self.ledger.read if self.ledger else read_transactions)(
+            self.input_data_dir / Path(transactions_file_name), end_date=self.end_date
         )
 
-        assets_info = {}
-
-        for ticker in sorted(transactions["ticker_asset"].unique()):
-            assets_info[ticker] = {
-                "name": self.data_api.get_ticker_name(ticker),
-                "currency": self.data_api.get_ticker_currency(ticker),
-            }
-
         return PortfolioData(
             transactions=transactions,
-            assets_info=assets_info,
+            assets_info={
+                ticker: self._get_asset_info(ticker)
+                for ticker in sorted(transactions["ticker_asset"].unique())
+            },
             start_date=min(transactions["date"]),
             end_date=self.end_date,
         )
 
+    def _get_asset_info(self, ticker: str) -> dict[str, str]:
+        """Get the name and currency of a ticker, querying the data API only the first time.
+
+        Args:
+            ticker: Ticker symbol.
+
+        Returns:
+            Name and currency of the ticker.
+        """
+        if ticker not in self.assets_info:
+            with metrics_recorder.record("data_api.get_ticker_info", ticker=ticker):
+                self.assets_info[ticker] = {
+                    "name": self.data_api.get_ticker_name(ticker),
+                    "currency": self.data_api.get_ticker_currency(ticker),
+                }
+
+        return self.assets_info[ticker]
+
+    @record_metrics()
     @sort_at_end()
     def _load_currency_exchange(
         self,
-        portfolio_data: PortfolioData,
+        origin_currencies: set[str],
         local_currency: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
         sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG002
     ) -> pd.DataFrame:
         """Load currency exchange data from Yahoo Finance.
 
         Args:
-            portfolio_data: Transactions file name.
+            origin_currencies: Currencies of the assets to be converted.
             local_currency: Portfolio currency.
+            start_date: Start date to load the data.
+            end_date: End date to load the data.
             sorting_columns: Columns to sort for each returned dataframe.
 
         Returns:
             Dataframe with the currency exchanges for all assets in the portfolio.
         """
-        full_date_range = pd.DataFrame(
-            {
-                "date": reversed(
-                    pd.date_range(
-                        start=portfolio_data.start_date,
-                        end=portfolio_data.end_date,
-                        freq="D",
-                    ),
-                ),
-            },
-        )
 
         def _multithreader_helper(origin_currency: str) -> pd.DataFrame:
             """Loads one currency exchange.
@@ -225,49 +649,118 @@ class Preprocessor:
             Returns:
                 Dataframe with the currency exchanges for the given origin currency.
             """
-            ticker = f"{local_currency}{origin_currency}=X"
+            return self._fill_currency_exchange(
+                self._download_currency_exchange(
+                    origin_currency, local_currency, start_date, end_date
+                ),
+                origin_currency,
+                start_date,
+                end_date,
+            )
 
-            logger.info(f"Loading currency exchange for {ticker}.")
+        portfolio_currencies = origin_currencies | {local_currency}
 
-            if origin_currency != local_currency:
-                try:
-                    currency_exchange: pd.DataFrame = self.data_api.get_currency_exchange_rate(
-                        origin_currency=origin_currency,
-                        local_currency=local_currency,
-                        start_date=portfolio_data.start_date,
-                        end_date=portfolio_data.end_date + pd.Timedelta(days=TIME_DELTA),
-                    )
+        currency_exchanges: list[pd.DataFrame] = utils.multithreader(
+            _multithreader_helper, [(origin_currency,) for origin_currency in portfolio_currencies]
+        )
+
+        return pd.concat(currency_exchanges)
 
-                except Exception as exc:
-                    msg = f"Something went wrong retrieving Yahoo Finance data for ticker {ticker}: {exc}"  # noqa: E501
+    def _download_currency_exchange(
+        self,
+        origin_currency: str,
+        local_currency: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame | None:
+        """Download one currency exchange from the data API, only on the days with trading.
+
+        Args:
+            origin_currency: Currency of origin (foreign country).
+            local_currency: Portfolio currency.
+            start_date: Start date to load the data.
+            end_date: End date to load the data.
 
-                    raise YahooFinanceError(msg) from exc
+        Raises:
+            YahooFinanceError: Something went wrong with the Yahoo Finance API.
 
-                currency_exchange = full_date_range.merge(
-                    currency_exchange,
-                    "left",
-                    on="date",
-                ).assign(
-                    close_currency_rate=lambda df: df["close_currency_rate"].bfill().ffill(),
+        Returns:
+            Dataframe with the currency exchange as returned by the data API, or None if both
+            currencies are the same.
+        """
+        ticker = f"{local_currency}{origin_currency}=X"
+
+        logger.info(f"Loading currency exchange for {ticker}.")
+
+        if origin_currency == local_currency:
+            return None
+
+        try:
+            with metrics_recorder.record(
+                "data_api.get_currency_exchange_rate", ticker=ticker
+            ) as api_metrics:
+                currency_exchange: pd.DataFrame = self.data_api.get_currency_exchange_rate(
+                    origin_currency=origin_currency,
+                    local_currency=local_currency,
+                    start_date=start_date,
+                    end_date=end_date + pd.Timedelta(days=TIME_DELTA),
                 )
+                api_metrics.rows = len(currency_exchange)
 
-            else:
-                currency_exchange = full_date_range.assign(close_currency_rate=1)
+        except Exception as exc:
+            msg = f"Something went wrong retrieving Yahoo Finance data for ticker {ticker}: {exc}"
 
-            return currency_exchange.assign(ticker_exch_rate=origin_currency)
+            raise YahooFinanceError(msg) from exc
 
-        portfolio_currencies = {
-            item[1]["currency"] for item in portfolio_data.assets_info.items()
-        } | {
-            local_currency,
-        }
+        return currency_exchange
 
-        currency_exchanges: list[pd.DataFrame] = utils.multithreader(
-            _multithreader_helper, [(origin_currency,) for origin_currency in portfolio_currencies]
+    @staticmethod
+    def _fill_currency_exchange(
+        currency_exchange: pd.DataFrame | None,
+        origin_currency: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame:
+        """Fill one currency exchange on every day between start and end date, from the nearest
+        days with trading.
+
+        Args:
+            currency_exchange: Currency exchange from _download_currency_exchange(). Days outside
+                the dates are left out.
+            origin_currency: Currency of origin (foreign country).
+            start_date: First day to fill.
+            end_date: Last day to fill.
+
+        Returns:
+            Dataframe with the currency exchange on every day, in descending date.
+        """
+        full_date_range = pd.DataFrame(
+            {
+                "date": reversed(
+                    pd.date_range(
+                        start=start_date,
+                        end=end_date,
+                        freq="D",
+                    ),
+                ),
+            },
         )
 
-        return pd.concat(currency_exchanges)
+        if currency_exchange is not None:
+            filled_currency_exchange = full_date_range.merge(
+                currency_exchange,
+                "left",
+                on="date",
+            ).assign(
+                close_currency_rate=lambda df: df["close_currency_rate"].bfill().ffill(),
+            )
+
+        else:
+            filled_currency_exchange = full_date_range.assign(close_currency_rate=1)
 
+        return filled_currency_exchange.assign(ticker_exch_rate=origin_currency)
+
+    @record_metrics()
     @sort_at_end()
     def _load_ticker_data(
         self,
@@ -276,7 +769,9 @@ class Preprocessor:
         end_date: pd.Timestamp,
         currency_exchange: pd.DataFrame,
         position_type: PositionType,
+        *,
         sorting_columns: list[dict[str, list[str | bool]]],  # noqa: ARG002
+        on_ticker_loaded: Callable[[pd.DataFrame], Any] | None = None,
     ) -> pd.DataFrame:
         """Load historical prices and stock splits for all assets in you portfolio, converted to
         your portfolio currency.
@@ -288,18 +783,109 @@ class Preprocessor:
             currency_exchange: Dataframe with the currency exchanges for all assets to be loaded.
             position_type: Type of position (asset, benchmark, etc).
             sorting_columns: Columns to sort for each returned dataframe.
+            on_ticker_loaded: Function called with the converted data of each ticker as soon as it
+                is loaded, in the calling thread, while the rest of tickers are still loading.
+                Defaults to None.
 
         Returns:
             Dataframe with all historical prices and stock splits.
         """
-        asset_data = pd.concat(
+
+        def _log_progress(completed: int, total: int) -> None:
+            """Log how many tickers are loaded so far.
+
+            Args:
+                completed: Number of tickers loaded.
+                total: Number of tickers to load.
+            """
+            logger.info(f"Loaded {completed} of {total} {position_type.value} tickers.")
+
+        ticker_data: pd.DataFrame = pd.concat(
             utils.multithreader(
-                self._load_prices_and_dividends,
-                [(ticker, start_date, end_date) for ticker in tickers],
+                self._load_single_ticker_data,
+                [
+                    (ticker, start_date, end_date, currency_exchange, position_type)
+                    for ticker in tickers
+                ],
+                on_progress=_log_progress,
+                on_result=on_ticker_loaded,
+            )
+        )
+
+        return ticker_data
+
+    def _load_single_ticker_data(
+        self,
+        ticker: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+        currency_exchange: pd.DataFrame,
+        position_type: PositionType,
+    ) -> pd.DataFrame:
+        """Load historical prices and stock splits for one ticker, converted to your portfolio
+        currency.
+
+        Args:
+            ticker: Ticker to load.
+            start_date: Start date to load the data.
+            end_date: End date to load the data.
+            currency_exchange: Dataframe with the currency exchanges for all assets to be loaded.
+            position_type: Type of position (asset, benchmark, etc).
+
+        Returns:
+            Dataframe with the historical prices and stock splits of the ticker.
+        """
+        with metrics_recorder.record(
+            "load_ticker", ticker=ticker, position_type=position_type.value
+        ) as ticker_metrics:
+            ticker_data = self._convert_ticker_data(
+                self._load_prices_and_dividends(ticker, start_date, end_date),
+                currency_exchange,
+                position_type,
             )
+            ticker_metrics.rows = len(ticker_data)
+
+        return ticker_data
+
+    def _download_ticker_data(
+        self,
+        tickers: list[str],
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> dict[str, pd.DataFrame]:
+        """Download the history of several tickers from the data API, in their origin currency.
+
+        Args:
+            tickers: List of tickers to load data for.
+            start_date: Start date to load the data.
+            end_date: End date to load the data.
+
+        Returns:
+            History of each ticker, as returned by the data API, by ticker.
+        """
+        histories: list[pd.DataFrame] = utils.multithreader(
+            self._download_history, [(ticker, start_date, end_date) for ticker in tickers]
         )
 
-        asset_data = asset_data.merge(
+        return dict(zip(tickers, histories, strict=True))
+
+    def _convert_ticker_data(
+        self,
+        ticker_data: pd.DataFrame,
+        currency_exchange: pd.DataFrame,
+        position_type: PositionType,
+    ) -> pd.DataFrame:
+        """Convert downloaded ticker data to the portfolio currency.
+
+        Args:
+            ticker_data: Historical prices, dividends and stock splits in origin currency.
+            currency_exchange: Dataframe with the currency exchanges for all assets to be loaded.
+            position_type: Type of position (asset, benchmark, etc).
+
+        Returns:
+            Dataframe with all historical prices and stock splits in portfolio currency.
+        """
+        asset_data = ticker_data.merge(
             currency_exchange,
             "left",
             left_on=["date", "origin_currency"],
@@ -344,6 +930,27 @@ class Preprocessor:
             - Stock splits.
             - Dividends (at Ex-Dividend Date).
 
+        Args:
+            ticker: Asset ticker
+            start_date: Start date to load the data.
+            end_date: End date to load the data.
+
+        Returns:
+            Dataframe with the historical asset price and stock splits.
+        """
+        return self._calc_prices_and_dividends(
+            ticker, start_date, end_date, self._download_history(ticker, start_date, end_date)
+        )
+
+    def _download_history(
+        self,
+        ticker: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame:
+        """Download the adjusted prices, dividends and stock splits of a ticker from the data API,
+        only on the days with trading.
+
         Args:
             ticker: Asset ticker
             start_date: Start date to load the data.
@@ -353,23 +960,49 @@ class Preprocessor:
             YahooFinanceError: Something went wrong with the Yahoo Finance API.
 
         Returns:
-            Dataframe with the historical asset price and stock splits.
+            Dataframe with the history of the ticker, as returned by the data API.
         """
         logger.info(f"Loading historical data for {ticker}")
 
         try:
-            asset_data = self.data_api.get_asset_historical_data(
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date + pd.Timedelta(days=TIME_DELTA),
-            )
+            with metrics_recorder.record(
+                "data_api.get_asset_historical_data", ticker=ticker
+            ) as api_metrics:
+                asset_data = self.data_api.get_asset_historical_data(
+                    ticker=ticker,
+                    start_date=start_date,
+                    end_date=end_date + pd.Timedelta(days=TIME_DELTA),
+                )
+                api_metrics.rows = len(asset_data)
 
         except Exception as exc:
             msg = f"Something went wrong retrieving Yahoo Finance data for ticker {ticker}: {exc}"
 
             raise YahooFinanceError(msg) from exc
 
-        asset_data = self._convert_to_unadj(start_date, end_date, asset_data).assign(
+        return asset_data
+
+    def _calc_prices_and_dividends(
+        self,
+        ticker: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+        history: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Calculate the unadjusted prices and dividends of a ticker on every day between start and
+        end date, filling the days without trading from the nearest trading days.
+
+        Args:
+            ticker: Asset ticker
+            start_date: First day to calculate.
+            end_date: Last day to calculate.
+            history: History of the ticker from the data API, from _download_history(). Days
+                outside the dates are left out.
+
+        Returns:
+            Dataframe with the historical asset price and stock splits.
+        """
+        asset_data = self._convert_to_unadj(start_date, end_date, history).assign(
             origin_currency=self.data_api.get_ticker_currency(ticker),
             ticker=ticker,
         )
@@ -417,19 +1050,19 @@ class Preprocessor:
             )
             .assign(
                 split=lambda df: df["split"].fillna(1).replace(0, 1),
-                close_adj_origin_currency=lambda df: df["close_adj_origin_currency"]
-                .bfill()
-                .ffill(),
+                close_adj_origin_currency=lambda df: (
+                    df["close_adj_origin_currency"].bfill().ffill()
+                ),
                 close_adj_origin_currency_dividends=lambda df: df[
                     "close_adj_origin_currency_dividends"
                 ].fillna(0),
                 split_cumsum=lambda df: df["split"].cumprod().shift(1).fillna(1),
-                close_unadj_origin_currency=lambda df: df["close_adj_origin_currency"]
-                * df["split_cumsum"],
-                close_unadj_origin_currency_dividends=lambda df: df[
-                    "close_adj_origin_currency_dividends"
-                ]
-                * df["split_cumsum"],
+                close_unadj_origin_currency=lambda df: (
+                    df["close_adj_origin_currency"] * df["split_cumsum"]
+                ),
+                close_unadj_origin_currency_dividends=lambda df: (
+                    df["close_adj_origin_currency_dividends"] * df["split_cumsum"]
+                ),
             )
         )
 
@@ -451,7 +1084,144 @@ class Preprocessor:
         """
         return df.assign(
             **{
-                local_curr_col_name: lambda df: df[origin_curr_col_name]
-                / df["close_currency_rate"],
+                local_curr_col_name: lambda df: (
+                    df[origin_curr_col_name] / df["close_currency_rate"]
+                ),
             },
         )
+
+    def _convert_histories(
+        self,
+        histories: dict[str, pd.DataFrame],
+        tickers: list[str],
+        portfolio_data: PortfolioData,
+        currency_exchange: pd.DataFrame,
+        position_type: PositionType,
+    ) -> pd.DataFrame:
+        """Convert the shared histories of some tickers for one portfolio, as preprocess() would
+        load them: on every day from the start date of the portfolio, in its currency.
+
+        Args:
+            histories: History of each ticker from the data API, by ticker.
+            tickers: Tickers to convert.
+            portfolio_data: Transactions history and other portfolio data.
+            currency_exchange: Dataframe with the currency exchanges of the portfolio.
+            position_type: Type of position (asset, benchmark, etc).
+
+        Returns:
+            Dataframe with the data of the tickers, sorted by ticker and descending date.
+        """
+        return pd.concat(
+            [
+                self._convert_ticker_data(
+                    self._calc_prices_and_dividends(
+                        ticker,
+                        portfolio_data.start_date,
+                        portfolio_data.end_date,
+                        histories[ticker],
+                    ),
+                    currency_exchange,
+                    position_type,
+                )
+                for ticker in sorted(tickers)
+            ]
+        ).reset_index(drop=True)
+
+    def _split_prices_and_dividends(
+        self,
+        config: Config,
+        portfolio_data: PortfolioData,
+        asset_data: pd.DataFrame,
+        benchmark_data: pd.DataFrame,
+    ) -> tuple[Config, PortfolioData, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Split the asset and benchmark data into prices and dividends.
+
+        Args:
+            config: Config data.
+            portfolio_data: Transactions history and other portfolio data.
+            asset_data: Asset prices, splits and dividends in portfolio currency.
+            benchmark_data: Benchmark prices, splits and dividends in portfolio currency.
+
+        Returns:
+            All necessary input data for the calculations.
+        """
+        return (
+            config,
+            portfolio_data,
+            *self._split_ticker_data(asset_data, PositionType.ASSET),
+            *self._split_ticker_data(benchmark_data, PositionType.BENCHMARK),
+        )
+
+    @staticmethod
+    def _empty_ticker_data(position_type: PositionType) -> pd.DataFrame:
+        """Get ticker data without rows, for the positions that are not loaded.
+
+        Args:
+            position_type: Type of position (asset, benchmark, etc).
+
+        Returns:
+            Empty dataframe with the columns of the output of _load_ticker_data().
+        """
+        return pd.DataFrame(
+            {
+                "date": pd.Series(dtype="datetime64[ns]"),
+                f"ticker_{position_type.value}": pd.Series(dtype=object),
+                f"split_{position_type.value}": pd.Series(dtype=float),
+                f"close_unadj_local_currency_{position_type.value}": pd.Series(dtype=float),
+                f"close_unadj_local_currency_dividends_{position_type.value}": pd.Series(
+                    dtype=float
+                ),
+            }
+        )
+
+    def _split_ticker_data(
+        self, ticker_data: pd.DataFrame, position_type: PositionType
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Split ticker data into prices and dividends, with the dtype backend of the
+        preprocessor.
+
+        Args:
+            ticker_data: Prices, splits and dividends in portfolio currency.
+            position_type: Type of position (asset, benchmark, etc).
+
+        Returns:
+            Prices and splits, and dividends.
+        """
+        ticker_data = convert_dtype_backend(ticker_data, self.dtype_backend, strings_only=True)
+
+        return (
+            ticker_data[
+                [
+                    "date",
+                    f"ticker_{position_type.value}",
+                    f"split_{position_type.value}",
+                    f"close_unadj_local_currency_{position_type.value}",
+                ]
+            ],
+            ticker_data[
+                [
+                    "date",
+                    f"ticker_{position_type.value}",
+                    f"close_unadj_local_currency_dividends_{position_type.value}",
+                ]
+            ],
+        )
+
+    def _convert_portfolio_data(self, portfolio_data: PortfolioData) -> PortfolioData:
+        """Convert the transactions of the portfolio to the dtype backend of the preprocessor.
+
+        Args:
+            portfolio_data: Transactions history and other portfolio data.
+
+        Returns:
+            Portfolio data with the converted transactions.
+        """
+        if self.dtype_backend == DtypeBackend.NUMPY:
+            return portfolio_data
+
+        return dataclasses.replace(
+            portfolio_data,
+            transactions=convert_dtype_backend(
+                portfolio_data.transactions, self.dtype_backend, strings_only=True
+            ),
+        )
@@ -0,0 +1,134 @@
+"""Feeds of intraday prices, pushed tick by tick.
+
+Every feed carries ticks as JSON lines, such as
+{"ticker": "MSFT", "price": 430.15, "timestamp": "2025-01-02T15:30:00"}, with the price in the
+currency the ticker trades in.
+"""
+
+import json
+import socket
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import suppress
+from pathlib import Path
+
+import pandas as pd
+
+from stock_portfolio_tracker.utils import Tick
+
+
+class PriceFeed(ABC):
+    @abstractmethod
+    def ticks(self) -> Iterator[Tick]:
+        """Get the ticks of the feed as they are pushed, until the feed ends or is closed.
+
+        Yields:
+            Ticks, in the order they are pushed.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop the feed, ending the iteration of ticks() from any thread."""
+
+
+class FilePriceFeed(PriceFeed):
+    def __init__(
+        self,
+        file_path: Path,
+        poll_interval: float = 0.1,
+        follow: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Initialize the feed from a file of ticks, a stand-in of a real-time feed.
+
+        Args:
+            file_path: JSON lines file with a tick per line.
+            poll_interval: Seconds between checks for lines appended to the file. Defaults to 0.1.
+            follow: Whether to keep waiting for lines appended to the file after reading it, as
+                tail -f does, until the feed is closed. Defaults to True.
+        """
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.follow = follow
+        self.stop_event = threading.Event()
+
+    def ticks(self) -> Iterator[Tick]:
+        """Get the ticks of the file, and the ones appended to it while following it.
+
+        Yields:
+            Ticks, in the order they are written.
+        """
+        with self.file_path.open(encoding="utf-8") as file:
+            while not self.stop_event.is_set():
+                position = file.tell()
+                line = file.readline()
+
+                # a line without end of line may be halfway through being written
+                if line.endswith("\n"):
+                    if line.strip():
+                        yield parse_tick(line)
+                    continue
+
+                if not self.follow:
+                    if line.strip():
+                        yield parse_tick(line)
+                    return
+
+                file.seek(position)
+                self.stop_event.wait(self.poll_interval)
+
+    def close(self) -> None:
+        """Stop following the file."""
+        self.stop_event.set()
+
+
+class SocketPriceFeed(PriceFeed):
+    def __init__(self, host: str, port: int) -> None:
+        """Initialize the feed from a TCP server that pushes ticks.
+
+        Args:
+            host: Host of the server.
+            port: Port of the server.
+        """
+        self.host = host
+        self.port = port
+        self.connection: socket.socket | None = None
+
+    def ticks(self) -> Iterator[Tick]:
+        """Connect to the server and get the ticks it pushes, until it closes the connection.
+
+        Yields:
+            Ticks, in the order they are pushed.
+        """
+        with (
+            socket.create_connection((self.host, self.port)) as self.connection,
+            self.connection.makefile("r", encoding="utf-8") as stream,
+        ):
+            for line in stream:
+                if line.strip():
+                    yield parse_tick(line)
+
+    def close(self) -> None:
+        """Close the connection to the server."""
+        if self.connection is not None:
+            # the connection may be closed already
+            with suppress(OSError):
+                self.connection.shutdown(socket.SHUT_RDWR)
+
+
+def parse_tick(line: str) -> Tick:
+    """Parse a tick from a JSON line.
+
+    Args:
+        line: JSON object with the ticker, price and timestamp of the tick.
+
+    Returns:
+        Tick.
+    """
+    tick = json.loads(line)
+
+    return Tick(
+        ticker=tick["ticker"],
+        price=float(tick["price"]),
+        timestamp=pd.Timestamp(tick["timestamp"]),
+    )
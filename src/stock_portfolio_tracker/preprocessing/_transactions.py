@@ -0,0 +1,282 @@
+"""Read the transactions file."""
+
+from collections.abc import Iterator
+from importlib.util import find_spec
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import pandas as pd
+
+from stock_portfolio_tracker.exceptions import InvalidTransactionsError, MissingDependencyError
+from stock_portfolio_tracker.utils import OutputFormat, TransactionType
+
+# columns of the transactions file
+COLUMNS = ["date", "transaction_type", "ticker", "trans_qty", "trans_val"]
+
+# date formats accepted in the transactions file, tried in order
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%Y-%m-%d")
+
+# bytes of the file parsed at a time by the Arrow reader
+ARROW_BLOCK_SIZE = 64 * 1024**2
+
+# rows of the file parsed at a time by the pandas reader
+PANDAS_CHUNK_SIZE = 1_000_000
+
+# format of the transactions file by extension, csv for any other extension
+FILE_FORMATS = {
+    ".parquet": OutputFormat.PARQUET,
+    ".pq": OutputFormat.PARQUET,
+    ".feather": OutputFormat.FEATHER,
+    ".arrow": OutputFormat.FEATHER,
+    ".ipc": OutputFormat.FEATHER,
+}
+
+
+def read_transactions(file_path: Path, end_date: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Read the transactions file, as CSV, Parquet or Feather (Arrow IPC) depending on its
+    extension.
+
+    CSV files are read in chunks, with the multithreaded Arrow CSV reader if pyarrow is installed
+    and with pandas otherwise. Parquet and Feather files are read with pyarrow, loading only the
+    needed columns and, if the dates are stored as dates, only the rows up to end date.
+
+    Args:
+        file_path: Path of the transactions file.
+        end_date: Transactions after this date are left out. Defaults to None (keep all).
+
+    Raises:
+        MissingDependencyError: Parquet or Feather file without pyarrow installed.
+
+    Returns:
+        Transactions with signed quantity and value, sorted by descending date and ticker.
+    """
+    file_format = FILE_FORMATS.get(file_path.suffix.lower(), OutputFormat.CSV)
+
+    if file_format == OutputFormat.CSV:
+        return normalize_transactions(read_csv_transactions(file_path, end_date), end_date)
+
+    if find_spec("pyarrow") is None:
+        msg = (
+            f"pyarrow is needed to read {file_format.value} files. Install it with "
+            "`pip install stock-portfolio-tracker[arrow]` or use a csv file instead."
+        )
+        raise MissingDependencyError(msg)
+
+    return normalize_transactions(
+        _sign_transactions(_read_arrow_file(file_path, file_format, end_date)), end_date
+    )
+
+
+def read_csv_transactions(
+    source: Path | IO[bytes], end_date: pd.Timestamp | None = None
+) -> pd.DataFrame:
+    """Read transactions in CSV format in chunks, with the multithreaded Arrow CSV reader if
+    pyarrow is installed and with pandas otherwise.
+
+    Args:
+        source: Path of the transactions file, or file object with its content.
+        end_date: Transactions after this date are left out. Defaults to None (keep all).
+
+    Returns:
+        Transactions with signed quantity and value, in the order of the file.
+    """
+    chunks = _read_chunks_arrow(source) if find_spec("pyarrow") else _read_chunks_pandas(source)
+
+    return pd.concat(
+        [
+            _sign_transactions(chunk if end_date is None else chunk[chunk["date"] <= end_date])
+            for chunk in chunks
+        ],
+        ignore_index=True,
+    )
+
+
+def normalize_transactions(
+    transactions: pd.DataFrame, end_date: pd.Timestamp | None = None
+) -> pd.DataFrame:
+    """Sort and rename signed transactions into the format of PortfolioData.transactions.
+
+    Args:
+        transactions: Transactions with signed quantity and value, in the order of the file.
+        end_date: Transactions after this date are left out. Defaults to None (keep all).
+
+    Returns:
+        Transactions sorted by descending date and ticker.
+    """
+    if end_date is not None:
+        transactions = transactions[transactions["date"] <= end_date]
+
+    return (
+        transactions.sort_values(
+            by=["date", "ticker"],
+            ascending=[False, True],
+        )
+        .rename(
+            columns={
+                "ticker": "ticker_asset",
+                "trans_qty": "trans_qty_asset",
+                "trans_val": "trans_val_asset",
+            },
+        )
+        .reset_index(drop=True)
+    )
+
+
+def _read_chunks_arrow(source: Path | IO[bytes]) -> Iterator[pd.DataFrame]:
+    """Stream the transactions file with the Arrow CSV reader, which parses the dates natively.
+
+    Args:
+        source: Path of the transactions file, or file object with its content.
+
+    Raises:
+        InvalidTransactionsError: A value that does not match the type of its column.
+
+    Yields:
+        Transactions of each block of the file.
+    """
+    import pyarrow as pa  # type: ignore  # noqa: PLC0415
+    from pyarrow import csv  # noqa: PLC0415
+
+    try:
+        for record_batch in csv.open_csv(
+            source,
+            read_options=csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE),
+            convert_options=csv.ConvertOptions(
+                column_types={
+                    "date": pa.timestamp("ns"),
+                    "transaction_type": pa.string(),
+                    "ticker": pa.string(),
+                    "trans_qty": pa.float64(),
+                    "trans_val": pa.float64(),
+                },
+                timestamp_parsers=list(DATE_FORMATS),
+            ),
+        ):
+            yield record_batch.to_pandas()
+
+    except pa.ArrowInvalid as exc:
+        msg = f"Invalid transactions file: {exc}"
+
+        raise InvalidTransactionsError(msg) from exc
+
+
+def _read_arrow_file(
+    file_path: Path, file_format: OutputFormat, end_date: pd.Timestamp | None
+) -> pd.DataFrame:
+    """Read a Parquet or Feather (Arrow IPC) transactions file, loading only the needed columns.
+    Feather files are memory-mapped, so the columns are not copied until converted to pandas.
+
+    Args:
+        file_path: Path of the transactions file.
+        file_format: Format of the file, parquet or feather.
+        end_date: Rows after this date are not loaded if the dates are stored as dates. Defaults
+            to None (load all).
+
+    Returns:
+        Transactions as in the file, with the dates parsed.
+    """
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.compute as pc  # type: ignore  # noqa: PLC0415
+    from pyarrow import ipc, parquet  # noqa: PLC0415
+
+    if file_format == OutputFormat.PARQUET:
+        schema = parquet.read_schema(file_path)
+    else:
+        ipc_reader = ipc.open_file(pa.memory_map(str(file_path)))
+        schema = ipc_reader.schema
+
+    date_type = schema.field("date").type
+    stored_as_date = pa.types.is_timestamp(date_type) or pa.types.is_date(date_type)
+    date_filter = (
+        pc.field("date") <= pa.scalar(end_date, type=pa.timestamp("ns")).cast(date_type)
+        if end_date is not None and stored_as_date
+        else None
+    )
+
+    if file_format == OutputFormat.PARQUET:
+        table = parquet.read_table(file_path, columns=COLUMNS, filters=date_filter, memory_map=True)
+    else:
+        table = ipc_reader.read_all().select(COLUMNS)
+
+        if date_filter is not None:
+            table = table.filter(date_filter)
+
+    transactions: pd.DataFrame = table.to_pandas(date_as_object=False).astype(
+        {"transaction_type": str, "ticker": str, "trans_qty": float, "trans_val": float}
+    )
+
+    return transactions.assign(
+        date=(
+            transactions["date"].astype("datetime64[ns]")
+            if stored_as_date
+            else _parse_dates(transactions["date"].astype(str))
+        )
+    )
+
+
+def _read_chunks_pandas(source: Path | IO[bytes]) -> Iterator[pd.DataFrame]:
+    """Read the transactions file with pandas, a chunk of rows at a time.
+
+    Args:
+        source: Path of the transactions file, or file object with its content.
+
+    Yields:
+        Transactions of each chunk of the file, with the dates parsed.
+    """
+    for chunk in pd.read_csv(
+        source,
+        dtype={"date": str, "transaction_type": str, "ticker": str},
+        chunksize=PANDAS_CHUNK_SIZE,
+    ):
+        yield chunk.astype({"trans_qty": float, "trans_val": float}).assign(
+            date=lambda df: _parse_dates(df["date"])
+        )
+
+
+def _parse_dates(dates: pd.Series) -> pd.Series:
+    """Parse dates in any of the accepted formats.
+
+    Args:
+        dates: Dates as text.
+
+    Raises:
+        InvalidTransactionsError: A date that does not match any of the formats.
+
+    Returns:
+        Parsed dates.
+    """
+    parsed_dates = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+
+    for date_format in DATE_FORMATS:
+        parsed_dates = parsed_dates.fillna(
+            pd.to_datetime(dates, format=date_format, errors="coerce")
+        )
+
+    if parsed_dates.isna().any():
+        msg = f"Invalid transaction date: {dates[parsed_dates.isna()].iloc[0]}"
+
+        raise InvalidTransactionsError(msg)
+
+    return parsed_dates
+
+
+def _sign_transactions(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Make sales positive in value and negative in quantity, and purchases the opposite.
+
+    Args:
+        transactions: Transactions as in the file.
+
+    Returns:
+        Transactions with signed quantity and value, without the transaction type.
+    """
+    is_sale = transactions["transaction_type"].to_numpy() == TransactionType.SALE.value
+
+    return transactions.assign(
+        trans_val=np.where(
+            is_sale, abs(transactions["trans_val"]), -abs(transactions["trans_val"])
+        ),
+        trans_qty=np.where(
+            is_sale, -abs(transactions["trans_qty"]), abs(transactions["trans_qty"])
+        ),
+    ).drop("transaction_type", axis=1)
@@ -1,22 +1,134 @@
 """Util objects for the project."""
 
-from ._decorators import sort_at_end, timer
-from ._enums import DataApiType, Freq, PositionStatus, PositionType, TransactionType
-from ._functions import delete_current_artifacts, load_pickle, multithreader, parse_underscore_text
-from ._models import Config, PortfolioData
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._cache import StageCache, hash_inputs, run_stage
+    from ._column_store import ColumnStore
+    from ._decorators import sort_at_end, timer
+    from ._enums import (
+        DataApiType,
+        DtypeBackend,
+        Freq,
+        KernelBackend,
+        OutputFormat,
+        PipelineOutput,
+        PositionStatus,
+        PositionType,
+        SimulationMethod,
+        TransactionType,
+        Workload,
+    )
+    from ._executors import ExecutorService, executor_service
+    from ._functions import (
+        convert_dtype_backend,
+        delete_current_artifacts,
+        load_pickle,
+        multithreader,
+        parse_underscore_text,
+    )
+    from ._metrics import MetricsRecorder, get_peak_rss, metrics_recorder, record_metrics
+    from ._models import (
+        Config,
+        LedgerCheckpoint,
+        PortfolioData,
+        StageMetrics,
+        Tick,
+    )
 
 __all__ = [
+    "ColumnStore",
     "Config",
     "DataApiType",
+    "DtypeBackend",
+    "ExecutorService",
     "Freq",
+    "KernelBackend",
+    "LedgerCheckpoint",
+    "MetricsRecorder",
+    "OutputFormat",
+    "PipelineOutput",
     "PortfolioData",
     "PositionStatus",
     "PositionType",
+    "SimulationMethod",
+    "StageCache",
+    "StageMetrics",
+    "Tick",
     "TransactionType",
+    "Workload",
+    "convert_dtype_backend",
     "delete_current_artifacts",
+    "executor_service",
+    "get_peak_rss",
+    "hash_inputs",
     "load_pickle",
+    "metrics_recorder",
     "multithreader",
     "parse_underscore_text",
+    "record_metrics",
+    "run_stage",
     "sort_at_end",
     "timer",
 ]
+
+# module of each util, imported on first use so that light modules (e.g. the CLI, which only needs
+# the enums) do not import pandas
+_MODULES = {
+    "ColumnStore": "._column_store",
+    "Config": "._models",
+    "DataApiType": "._enums",
+    "DtypeBackend": "._enums",
+    "ExecutorService": "._executors",
+    "Freq": "._enums",
+    "KernelBackend": "._enums",
+    "LedgerCheckpoint": "._models",
+    "MetricsRecorder": "._metrics",
+    "OutputFormat": "._enums",
+    "PipelineOutput": "._enums",
+    "PortfolioData": "._models",
+    "PositionStatus": "._enums",
+    "PositionType": "._enums",
+    "SimulationMethod": "._enums",
+    "StageCache": "._cache",
+    "StageMetrics": "._models",
+    "Tick": "._models",
+    "TransactionType": "._enums",
+    "Workload": "._enums",
+    "convert_dtype_backend": "._functions",
+    "delete_current_artifacts": "._functions",
+    "executor_service": "._executors",
+    "get_peak_rss": "._metrics",
+    "hash_inputs": "._cache",
+    "load_pickle": "._functions",
+    "metrics_recorder": "._metrics",
+    "multithreader": "._functions",
+    "parse_underscore_text": "._functions",
+    "record_metrics": "._metrics",
+    "run_stage": "._cache",
+    "sort_at_end": "._decorators",
+    "timer": "._decorators",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a util the first time it is used.
+
+    Args:
+        name: Name of the attribute.
+
+    Raises:
+        AttributeError: Unknown attribute.
+
+    Returns:
+        Attribute of the package.
+    """
+    if name not in _MODULES:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    attribute = getattr(import_module(_MODULES[name], __name__), name)
+    globals()[name] = attribute
+
+    return attribute
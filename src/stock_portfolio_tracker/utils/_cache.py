@@ -0,0 +1,151 @@
+"""Content-addressed cache for pipeline stages."""
+
+import hashlib
+import pickle
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+from ._functions import load_pickle
+
+
+class StageCache:
+    """On-disk cache of pipeline stages, keyed by a hash of the inputs of each stage."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory where the stage results are stored.
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def run[T](
+        self, stage: str, inputs: Any, func: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Return the cached result of a stage, or run it and cache its result.
+
+        Args:
+            stage: Name of the stage.
+            inputs: Everything the result of the stage depends on.
+            func: Function that runs the stage.
+            args: Positional arguments for func.
+            kwargs: Keyword arguments for func.
+
+        Returns:
+            Result of the stage.
+        """
+        file_name = f"{stage}_{hash_inputs((_package_version(), stage, inputs))}.pkl"
+
+        if (self.cache_dir / file_name).exists():
+            logger.info(f"Loading cached stage {stage}.")
+            return load_pickle(file_path=self.cache_dir, file_name=file_name)  # type: ignore
+
+        result = func(*args, **kwargs)
+
+        # write to a temporary file first so an interrupted run never leaves a corrupt entry
+        tmp_file_path = self.cache_dir / f"{file_name}.tmp"
+        with tmp_file_path.open("wb") as file:
+            pickle.dump(result, file)
+        tmp_file_path.replace(self.cache_dir / file_name)
+
+        return result
+
+
+def run_stage[T](
+    cache: StageCache | None,
+    stage: str,
+    inputs: Any,
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Run a stage through the cache if there is one, or directly otherwise.
+
+    Args:
+        cache: Stage cache, if caching is enabled.
+        stage: Name of the stage.
+        inputs: Everything the result of the stage depends on.
+        func: Function that runs the stage.
+        args: Positional arguments for func.
+        kwargs: Keyword arguments for func.
+
+    Returns:
+        Result of the stage.
+    """
+    if cache is None:
+        return func(*args, **kwargs)
+
+    return cache.run(stage, inputs, func, *args, **kwargs)
+
+
+def hash_inputs(inputs: Any) -> str:
+    """Hash the inputs of a stage, including the content of dataframes and dataclasses.
+
+    Args:
+        inputs: Object to hash.
+
+    Returns:
+        Hexadecimal digest of the inputs.
+    """
+    hasher = hashlib.sha256()
+    _update_hash(hasher, inputs)
+
+    return hasher.hexdigest()
+
+
+def _update_hash(hasher: "hashlib._Hash", obj: Any) -> None:  # noqa: C901
+    """Feed an object to a hasher, recursing into containers.
+
+    Args:
+        hasher: Hasher to update.
+        obj: Object to hash.
+    """
+    hasher.update(type(obj).__name__.encode())
+
+    match obj:
+        case pd.DataFrame():
+            hasher.update(repr(obj.dtypes.to_dict()).encode())
+            hasher.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        case pd.Series():
+            hasher.update(repr((obj.name, obj.dtype)).encode())
+            hasher.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        case dict():
+            for key in sorted(obj, key=repr):
+                _update_hash(hasher, key)
+                _update_hash(hasher, obj[key])
+        case set() | frozenset():
+            for item in sorted(obj, key=repr):
+                _update_hash(hasher, item)
+        case list() | tuple():
+            for item in obj:
+                _update_hash(hasher, item)
+        case bytes():
+            hasher.update(obj)
+        case Enum():
+            _update_hash(hasher, obj.value)
+        case _ if is_dataclass(obj) and not isinstance(obj, type):
+            _update_hash(hasher, {field.name: getattr(obj, field.name) for field in fields(obj)})
+        case _:
+            hasher.update(repr(obj).encode())
+
+    hasher.update(b"\x00")
+
+
+def _package_version() -> str:
+    """Get the installed version of the package, so upgrades invalidate the cache.
+
+    Returns:
+        Package version.
+    """
+    try:
+        return version("stock-portfolio-tracker")
+    except PackageNotFoundError:
+        return "unknown"
@@ -0,0 +1,86 @@
+"""Append-only store of columns in memory-mapped files."""
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+
+class ColumnStore:
+    """On-disk store of the columns of many series (e.g. the daily prices of each ticker), each
+    column in its own raw file, so columns can be appended to and read as memory maps without
+    loading whole series in memory.
+    """
+
+    def __init__(self, store_dir: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            store_dir: Directory where the column files are stored.
+        """
+        self.store_dir = store_dir
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        # keys can have any character (e.g. tickers like ^GSPC), so files are named by number
+        self.key_numbers: dict[str, int] = {}
+        self.dtypes: dict[tuple[str, str], np.dtype[Any]] = {}
+        self.lock = threading.Lock()
+
+    def append(self, key: str, columns: dict[str, npt.NDArray[Any]]) -> None:
+        """Append rows to the columns of a series, creating them if they do not exist.
+
+        Each series must be appended to by a single thread at a time.
+
+        Args:
+            key: Key of the series.
+            columns: Values to append, by column name. All columns must have the same length.
+        """
+        with self.lock:
+            key_number = self.key_numbers.setdefault(key, len(self.key_numbers))
+
+            for column, values in columns.items():
+                self.dtypes.setdefault((key, column), values.dtype)
+
+        for column, values in columns.items():
+            with self._column_file(key_number, column).open("ab") as file:
+                np.ascontiguousarray(values, dtype=self.dtypes[key, column]).tofile(file)
+
+    def read(self, key: str, column: str) -> npt.NDArray[Any]:
+        """Read a column of a series as a read-only memory map.
+
+        Args:
+            key: Key of the series.
+            column: Column name.
+
+        Returns:
+            Values of the column.
+        """
+        dtype = self.dtypes[key, column]
+        column_file = self._column_file(self.key_numbers[key], column)
+
+        # empty files cannot be memory-mapped
+        if column_file.stat().st_size == 0:
+            return np.empty(0, dtype=dtype)
+
+        return np.memmap(column_file, dtype=dtype, mode="r")
+
+    def keys(self) -> list[str]:
+        """Get the keys of the series in the store.
+
+        Returns:
+            Keys, in order of creation.
+        """
+        return list(self.key_numbers)
+
+    def _column_file(self, key_number: int, column: str) -> Path:
+        """Get the file of a column of a series.
+
+        Args:
+            key_number: Number of the series.
+            column: Column name.
+
+        Returns:
+            Path of the column file.
+        """
+        return self.store_dir / f"{key_number}_{column}.bin"
@@ -1,5 +1,6 @@
 """Decorators."""
 
+import functools
 import time
 from collections.abc import Callable
 from typing import Any
@@ -12,6 +13,7 @@ def sort_at_end() -> Callable[..., Any]:
     """Sort the output dataframe of functions."""
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> pd.DataFrame | list[pd.DataFrame]:
             sorting_columns = kwargs["sorting_columns"]
             dfs = func(*args, **kwargs)
@@ -41,6 +43,7 @@ def sort_at_end() -> Callable[..., Any]:
 def timer(func: Callable[..., Any]) -> Callable[..., Any]:
     """Count the time a function takes to execute."""
 
+    @functools.wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
         start_time = time.time()
         result = func(*args, **kwargs)
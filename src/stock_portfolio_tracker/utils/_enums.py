@@ -6,6 +6,12 @@ class DataApiType(Enum):
     TESTING = "testing"
 
 
+class OutputFormat(Enum):
+    PARQUET = "parquet"
+    FEATHER = "feather"
+    CSV = "csv"
+
+
 class Freq(Enum):
     YEARLY = "yearly"
     ALL = "all"
@@ -25,3 +31,32 @@ class TransactionType(Enum):
 class PositionStatus(Enum):
     OPEN = "open"
     CLOSED = "closed"
+
+
+class Workload(Enum):
+    DOWNLOAD = "download"
+    WRITE = "write"
+
+
+class PipelineOutput(Enum):
+    PORTFOLIO_EVOLUTION = "portfolio_evolution"
+    ASSET_DISTRIBUTION = "asset_distribution"
+    ASSETS_VS_BENCHMARK = "assets_vs_benchmark"
+    DIVIDENDS_COMPANY = "dividends_company"
+    DIVIDENDS_YEAR = "dividends_year"
+    SUMMARY_RETURNS = "summary_returns"
+
+
+class KernelBackend(Enum):
+    PYTHON = "python"
+    NUMBA = "numba"
+
+
+class DtypeBackend(Enum):
+    NUMPY = "numpy"
+    PYARROW = "pyarrow"
+
+
+class SimulationMethod(Enum):
+    BOOTSTRAP = "bootstrap"
+    NORMAL = "normal"
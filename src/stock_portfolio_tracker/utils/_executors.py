@@ -0,0 +1,64 @@
+"""Thread pools shared by the whole process."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ._enums import Workload
+
+
+class ExecutorService:
+    """Process-wide thread pools, one per type of workload, created on first use and reused by
+    every call, so threads are not spawned and torn down each time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the service, with the default number of workers of ThreadPoolExecutor for
+        every workload.
+        """
+        self.max_workers: dict[Workload, int | None] = dict.fromkeys(Workload)
+        self.executors: dict[Workload, ThreadPoolExecutor] = {}
+        self.lock = threading.Lock()
+
+    def get_executor(self, workload: Workload) -> ThreadPoolExecutor:
+        """Get the thread pool of a workload, creating it the first time.
+
+        Args:
+            workload: Type of workload.
+
+        Returns:
+            Thread pool of the workload.
+        """
+        with self.lock:
+            if workload not in self.executors:
+                self.executors[workload] = ThreadPoolExecutor(
+                    max_workers=self.max_workers[workload],
+                    thread_name_prefix=f"stock_portfolio_tracker_{workload.value}",
+                )
+
+            return self.executors[workload]
+
+    def set_max_workers(self, workload: Workload, max_workers: int | None) -> None:
+        """Set the number of workers of a workload. Its current pool, if any, finishes the tasks
+        already submitted and is replaced by a new one on next use.
+
+        Args:
+            workload: Type of workload.
+            max_workers: Number of workers, or None for the default of ThreadPoolExecutor.
+        """
+        with self.lock:
+            self.max_workers[workload] = max_workers
+            executor = self.executors.pop(workload, None)
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Shut down every thread pool, waiting for the tasks already submitted."""
+        with self.lock:
+            executors, self.executors = self.executors, {}
+
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+
+
+executor_service = ExecutorService()
@@ -1,13 +1,17 @@
 import pickle
 import shutil
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
+from ._enums import DtypeBackend, Workload
+from ._executors import executor_service
+
 
 def delete_current_artifacts(directory: Path) -> None:
     """Delete all files and subdirectories in the specified directory except for `.gitkeep`.
@@ -31,28 +35,93 @@ def delete_current_artifacts(directory: Path) -> None:
     logger.info("Cleanup completed.")
 
 
-def multithreader(func: Callable[..., Any], args: list[tuple[Any, ...]]) -> list[Any]:
-    """Spawns multiple threads in parallel, efective for I/O bound operations such as API calls.
+def multithreader(
+    func: Callable[..., Any],
+    args: list[tuple[Any, ...]],
+    workload: Workload = Workload.DOWNLOAD,
+    on_progress: Callable[[int, int], Any] | None = None,
+    on_result: Callable[[Any], Any] | None = None,
+) -> list[Any]:
+    """Run a function for many arguments in parallel in the shared thread pool of a workload,
+    efective for I/O bound operations such as API calls.
+
+    As soon as one call fails, the calls not started yet are cancelled and its exception is
+    raised. func must not call multithreader() for the same workload, since it could wait for
+    a worker of its own pool.
 
     Args:
         func: Function to parallelize.
         args: Arguments for the function, for each thread:
             [("NVDA", 01-01-2020, 01-01-2024), ("PYPL", 01-01-2020, 01-01-2024), ...]
+        workload: Type of workload, which sets the thread pool to use. Defaults to
+            Workload.DOWNLOAD.
+        on_progress: Function called with the number of completed calls and the total number of
+            calls each time a call completes. Defaults to None.
+        on_result: Function called with the result of each call as soon as it completes, in the
+            calling thread rather than in the pool, so slow work on the results does not hold
+            workers of the pool. Defaults to None.
 
     Returns:
-        List with the result of each function.
+        List with the result of each function, in the same order as args.
     """
-    result = []
+    executor = executor_service.get_executor(workload)
+    futures = [executor.submit(func, *curr_args) for curr_args in args]
+
+    try:
+        for completed, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+
+            if on_result is not None:
+                on_result(result)
+
+            if on_progress is not None:
+                on_progress(completed, len(futures))
+
+    except BaseException:
+        for pending_future in futures:
+            pending_future.cancel()
+
+        raise
+
+    return [future.result() for future in futures]
+
+
+def convert_dtype_backend(
+    df: pd.DataFrame,
+    dtype_backend: DtypeBackend,
+    strings_only: bool = False,  # noqa: FBT001, FBT002
+) -> pd.DataFrame:
+    """Convert the columns of a dataframe to the dtypes of a backend.
+
+    With the pyarrow backend, string and NumPy columns are backed by Arrow arrays of the same
+    type, which Arrow consumers (e.g. pyarrow.Table.from_pandas()) can share without copying, and
+    missing values become nulls. Columns of mixed types are left as they are.
+
+    Args:
+        df: Dataframe to convert.
+        dtype_backend: Dtype backend to convert to. The numpy backend leaves the dataframe as it
+            is.
+        strings_only: Whether to convert only the string columns (e.g. tickers), so that numeric
+            columns stay as NumPy arrays the modelling kernels can use. Defaults to False.
+
+    Returns:
+        Dataframe with the dtypes of the backend.
+    """
+    if dtype_backend == DtypeBackend.NUMPY:
+        return df
+
+    import pyarrow as pa  # type: ignore  # noqa: PLC0415
 
-    with ThreadPoolExecutor() as executor:
-        # create a list of tasks to be submitted to the Tread Pool
-        futures = [executor.submit(func, *curr_args) for curr_args in args]
+    arrow_dtypes = {}
 
-        # append tasks to result as they are being completed
-        for future in as_completed(futures):
-            result.append(future.result())  # noqa: PERF401
+    for column, dtype in df.dtypes.items():
+        if pd.api.types.is_object_dtype(dtype):
+            if pd.api.types.is_string_dtype(df[column]):
+                arrow_dtypes[column] = pd.ArrowDtype(pa.string())
+        elif not strings_only and isinstance(dtype, np.dtype):
+            arrow_dtypes[column] = pd.ArrowDtype(pa.from_numpy_dtype(dtype))
 
-    return result
+    return df.astype(arrow_dtypes)
 
 
 def parse_underscore_text(text: str) -> str:
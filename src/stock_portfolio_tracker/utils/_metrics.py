@@ -0,0 +1,253 @@
+"""Performance metrics of the pipeline stages."""
+
+import functools
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, fields, is_dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from ._models import StageMetrics
+
+if sys.platform != "win32":
+    import resource
+
+PROMETHEUS_PREFIX = "stock_portfolio_tracker_stage"
+
+# (name, type, help, field of StageMetrics) of each exported Prometheus metric
+PROMETHEUS_METRICS = (
+    ("calls_total", "counter", "Number of calls.", "calls"),
+    ("wall_seconds_total", "counter", "Wall time.", "wall_time"),
+    ("cpu_seconds_total", "counter", "CPU time of the calling thread.", "cpu_time"),
+    ("rows_total", "counter", "Rows returned.", "rows"),
+    (
+        "process_peak_rss_bytes",
+        "gauge",
+        "Peak resident memory of the whole process when the stage finished.",
+        "process_peak_rss",
+    ),
+)
+
+
+class MetricsRecorder:
+    """Recorder of the wall time, CPU time and rows of the pipeline stages, and of the peak
+    memory of the process when they finish.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the recorder, disabled so that recording has no cost unless requested."""
+        self.enabled = False
+        self.stages: dict[tuple[str, tuple[tuple[str, str], ...]], StageMetrics] = {}
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget the metrics recorded so far."""
+        with self.lock:
+            self.stages = {}
+
+    @contextmanager
+    def record(self, stage: str, **labels: str) -> Iterator[StageMetrics]:
+        """Record the metrics of a block of code as a call of a stage.
+
+        The CPU time is the one of the calling thread, so it does not include the work done by
+        the threads the stage spawns. The peak memory is the one of the whole process since it
+        started, as of the end of the call, so it is not the memory used by the stage alone.
+
+        Args:
+            stage: Name of the stage.
+            labels: Labels to tell apart calls of the same stage, e.g. the ticker.
+
+        Yields:
+            Metrics of the call, where the caller can set the number of rows processed.
+        """
+        call_metrics = StageMetrics(stage=stage, labels=labels, calls=1)
+
+        if not self.enabled:
+            yield call_metrics
+            return
+
+        start_wall_time, start_cpu_time = time.perf_counter(), time.thread_time()
+
+        try:
+            yield call_metrics
+        finally:
+            call_metrics.wall_time = time.perf_counter() - start_wall_time
+            call_metrics.cpu_time = time.thread_time() - start_cpu_time
+            call_metrics.process_peak_rss = get_peak_rss()
+
+            with self.lock:
+                self._add(call_metrics)
+
+    def to_json(self) -> str:
+        """Export the metrics as JSON.
+
+        Returns:
+            JSON list with the metrics of each stage.
+        """
+        with self.lock:
+            stages = [asdict(stage_metrics) for stage_metrics in self.stages.values()]
+
+        return json.dumps(stages, indent=4)
+
+    def to_prometheus(self) -> str:
+        """Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            Metrics of each stage, one line per stage and metric.
+        """
+        with self.lock:
+            stages = list(self.stages.values())
+
+        lines = []
+
+        for metric_name, metric_type, help_text, field_name in PROMETHEUS_METRICS:
+            lines.extend(
+                [
+                    f"# HELP {PROMETHEUS_PREFIX}_{metric_name} {help_text}",
+                    f"# TYPE {PROMETHEUS_PREFIX}_{metric_name} {metric_type}",
+                ]
+            )
+
+            for stage_metrics in stages:
+                if (value := getattr(stage_metrics, field_name)) is None:
+                    continue
+
+                labels = ",".join(
+                    f'{name}="{_escape_label(label)}"'
+                    for name, label in {
+                        "stage": stage_metrics.stage,
+                        **stage_metrics.labels,
+                    }.items()
+                )
+                lines.append(f"{PROMETHEUS_PREFIX}_{metric_name}{{{labels}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: Path) -> None:
+        """Write the metrics to a file, in Prometheus format if its extension is .prom and as
+        JSON otherwise.
+
+        Args:
+            file_path: Path of the file.
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(
+            self.to_prometheus() if file_path.suffix == ".prom" else self.to_json()
+        )
+
+    def _add(self, call_metrics: StageMetrics) -> None:
+        """Aggregate the metrics of a call into the metrics of its stage.
+
+        Args:
+            call_metrics: Metrics of the call.
+        """
+        key = (call_metrics.stage, tuple(sorted(call_metrics.labels.items())))
+
+        if key not in self.stages:
+            self.stages[key] = call_metrics
+            return
+
+        stage_metrics = self.stages[key]
+        stage_metrics.calls += call_metrics.calls
+        stage_metrics.wall_time += call_metrics.wall_time
+        stage_metrics.cpu_time += call_metrics.cpu_time
+        stage_metrics.rows += call_metrics.rows
+
+        if call_metrics.process_peak_rss is not None:
+            stage_metrics.process_peak_rss = max(
+                stage_metrics.process_peak_rss or 0, call_metrics.process_peak_rss
+            )
+
+
+metrics_recorder = MetricsRecorder()
+
+
+def record_metrics[**P, T](stage: str | None = None) -> Callable[[Callable[P, T]], Callable[P, T]]:
+    """Record the metrics of every call of a function in the global metrics recorder, counting
+    the rows of the dataframes it returns.
+
+    Args:
+        stage: Name of the stage. Defaults to None, which uses the qualified name of the function.
+
+    Returns:
+        Decorator.
+    """
+
+    def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        stage_name = stage or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if not metrics_recorder.enabled:
+                return func(*args, **kwargs)
+
+            with metrics_recorder.record(stage_name) as call_metrics:
+                result = func(*args, **kwargs)
+                call_metrics.rows = _count_rows(result)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _count_rows(obj: Any) -> int:
+    """Count the rows of the dataframes in an object, recursing into tuples, lists and dataclasses.
+
+    Args:
+        obj: Object to count the rows of.
+
+    Returns:
+        Total number of rows.
+    """
+    match obj:
+        case pd.DataFrame():
+            return len(obj)
+        case list() | tuple():
+            return sum(_count_rows(item) for item in obj)
+        case _ if is_dataclass(obj) and not isinstance(obj, type):
+            return sum(_count_rows(getattr(obj, field.name)) for field in fields(obj))
+        case _:
+            return 0
+
+
+def get_peak_rss() -> int | None:
+    """Get the peak resident memory of the process so far.
+
+    Returns:
+        Peak resident memory in bytes, or None where it is not available (Windows).
+    """
+    if sys.platform == "win32":
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS and in kilobytes elsewhere
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _escape_label(label: str) -> str:
+    """Escape a Prometheus label value.
+
+    Args:
+        label: Label value.
+
+    Returns:
+        Escaped label value.
+    """
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,6 +1,6 @@
 """Module to store data models."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import pandas as pd
 
@@ -10,7 +10,15 @@ class Config:
     """Config data."""
 
     portfolio_currency: str
-    benchmark_ticker: str
+    benchmark_ticker: str | list[str]
+
+    @property
+    def benchmark_tickers(self) -> list[str]:
+        """Benchmark tickers, as a list of unique tickers even if only one is configured."""
+        if isinstance(self.benchmark_ticker, str):
+            return [self.benchmark_ticker]
+
+        return list(dict.fromkeys(self.benchmark_ticker))
 
 
 @dataclass
@@ -21,3 +29,35 @@ class PortfolioData:
     assets_info: dict[str, dict[str, str]]
     start_date: pd.Timestamp
     end_date: pd.Timestamp
+
+
+@dataclass
+class StageMetrics:
+    """Performance metrics of a stage, aggregated over all its calls."""
+
+    stage: str
+    labels: dict[str, str] = field(default_factory=dict)
+    calls: int = 0
+    wall_time: float = 0
+    cpu_time: float = 0
+    rows: int = 0
+    process_peak_rss: int | None = None
+
+
+@dataclass
+class LedgerCheckpoint:
+    """Part of a transactions file already parsed into a transaction ledger."""
+
+    byte_offset: int
+    row_count: int
+    prefix_hash: str
+    header: bytes
+
+
+@dataclass
+class Tick:
+    """Price of a ticker at a moment of the trading day, as pushed by a price feed."""
+
+    ticker: str
+    price: float
+    timestamp: pd.Timestamp
@@ -41,7 +41,7 @@ def generate_api_mocked_artifacts(config_file_name: str, transactions_file_name:
 
     for ticker in [
         *portfolio_data.transactions["ticker_asset"].unique().tolist(),
-        config.benchmark_ticker,
+        *config.benchmark_tickers,
     ]:
         logger.info(f"Saving data for ticker: {ticker}")
         artifact = api_interface.get_asset_historical_data(
@@ -0,0 +1,50 @@
+"""Integration test for the CLI."""
+
+import subprocess
+import sys
+
+import pytest
+
+# start the CLI and print the heavy dependencies that were imported
+CLI_SCRIPT = """
+import sys
+
+from stock_portfolio_tracker.__main__ import _main
+
+sys.argv = ["stock-portfolio-tracker", *sys.argv[1:]]
+
+try:
+    _main()
+except SystemExit:
+    pass
+
+print(*sorted(module for module in ("numpy", "pandas", "yfinance") if module in sys.modules))
+"""
+
+
+@pytest.mark.parametrize(
+    "cli_args",
+    [
+        ["--help"],
+        ["execute-cli-pipeline", "--help"],
+        ["execute-cli-service", "--help"],
+        ["execute-cli-watch", "--help"],
+        ["execute-cli-intraday", "--help"],
+        ["execute-cli-projection", "--help"],
+    ],
+)
+def test_cli_lazy_imports(cli_args: list[str]) -> None:
+    """Test that starting the CLI does not import the heavy dependencies, which would make every
+    invocation slow.
+
+    Args:
+        cli_args: Arguments of the CLI.
+    """
+    imported_modules = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", CLI_SCRIPT, *cli_args],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.splitlines()[-1]
+
+    assert imported_modules == ""
@@ -1,14 +1,36 @@
 """Integration test for modelling."""
 
+import json
 import pickle
+import shutil
+import threading
+import urllib.request
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
+import pytest
 from loguru import logger
 
-from stock_portfolio_tracker import pipeline
-from stock_portfolio_tracker.utils import DataApiType
+from stock_portfolio_tracker import batch_pipeline, modelling, pipeline, projection_pipeline
+from stock_portfolio_tracker.entry_points import (
+    IntradayTracker,
+    PortfolioService,
+    PortfolioWatcher,
+    ScenarioEngine,
+)
+from stock_portfolio_tracker.exceptions import InvalidTransactionsError
+from stock_portfolio_tracker.postprocessing import ResultsStore, write_outputs
+from stock_portfolio_tracker.preprocessing import FilePriceFeed, Preprocessor
+from stock_portfolio_tracker.utils import (
+    DataApiType,
+    DtypeBackend,
+    OutputFormat,
+    PipelineOutput,
+    PortfolioData,
+    convert_dtype_backend,
+    metrics_recorder,
+)
 
 
 def test_modelling() -> None:
@@ -36,6 +58,791 @@ def test_modelling() -> None:
     ), "Pipeline outputs do not match expected outputs."
 
 
+def test_streamed_asset_modelling() -> None:
+    """Test that every asset is modelled while loading, in the calling thread rather than in the
+    download thread pool, matching the model of the full data.
+    """
+    asset_models: dict[str, tuple[pd.DataFrame, pd.DataFrame]] = {}
+
+    def _model_asset_on_load(
+        portfolio_data: PortfolioData, asset_prices: pd.DataFrame, asset_dividends: pd.DataFrame
+    ) -> None:
+        assert threading.current_thread() is threading.main_thread()
+        asset_models[asset_prices["ticker_asset"].iloc[0]] = modelling.model_asset(
+            portfolio_data, asset_prices, asset_dividends
+        )
+
+    _, portfolio_data, asset_prices, asset_dividends, _, _ = Preprocessor(
+        data_api_type=DataApiType.TESTING.value,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+    ).preprocess(
+        "example_config.json", "example_transactions.csv", on_asset_loaded=_model_asset_on_load
+    )
+
+    assert asset_models.keys() == portfolio_data.assets_info.keys()
+
+    for ticker, (asset_model, _) in asset_models.items():
+        expected_asset_model, _ = modelling.model_asset(
+            portfolio_data,
+            asset_prices[asset_prices["ticker_asset"] == ticker],
+            asset_dividends[asset_dividends["ticker_asset"] == ticker],
+        )
+
+        assert asset_model.equals(expected_asset_model)
+
+
+def test_batch_modelling(tmp_path: Path) -> None:
+    """Test that the batch pipeline matches running the pipeline for each portfolio, also for a
+    portfolio that starts on a non-trading day after the others.
+
+    Args:
+        tmp_path: Temporary directory for the input files.
+    """
+    shutil.copy(Path("data/in/example_config.json"), tmp_path / "example_config.json")
+    shutil.copy(Path("data/in/example_transactions.csv"), tmp_path / "example_transactions.csv")
+
+    transactions = pd.read_csv(tmp_path / "example_transactions.csv")
+    transactions[
+        (pd.to_datetime(transactions["date"], format="%d/%m/%Y") >= pd.Timestamp("2023-01-01"))
+        & (transactions["ticker"] != "NVDA")
+    ].to_csv(tmp_path / "recent_transactions.csv", index=False)
+    # a portfolio starting on a Saturday, whose first prices are the ones of the next trading day
+    pd.DataFrame(
+        {
+            "date": ["06/01/2024"],
+            "transaction_type": ["Purchase"],
+            "ticker": ["AAPL"],
+            "trans_qty": [10.0],
+            "trans_val": [-1800.0],
+        }
+    ).to_csv(tmp_path / "weekend_transactions.csv", index=False)
+
+    portfolio_files = [
+        ("example_config.json", "example_transactions.csv"),
+        ("example_config.json", "recent_transactions.csv"),
+        ("example_config.json", "weekend_transactions.csv"),
+    ]
+
+    batch_outputs = batch_pipeline(
+        portfolio_files=portfolio_files,
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=tmp_path,
+        end_date=pd.Timestamp("31-12-2024"),
+    )
+
+    for (config_file_name, transactions_file_name), outputs in zip(
+        portfolio_files, batch_outputs, strict=True
+    ):
+        expected_outputs = pipeline(
+            config_file_name=config_file_name,
+            transactions_file_name=transactions_file_name,
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=tmp_path,
+            end_date=pd.Timestamp("31-12-2024"),
+        )
+
+        assert outputs.keys() == expected_outputs.keys()
+        assert all(
+            outputs[output_type].equals(expected_outputs[output_type])
+            for output_type in expected_outputs
+        ), "Batch pipeline outputs do not match single pipeline outputs."
+
+
+def test_multi_benchmark_modelling(tmp_path: Path) -> None:
+    """Test that each benchmark of a multi-benchmark run matches a single-benchmark run.
+
+    Args:
+        tmp_path: Temporary directory for the input files.
+    """
+    shutil.copy(Path("data/in/example_transactions.csv"), tmp_path / "example_transactions.csv")
+
+    with (tmp_path / "multi_benchmark_config.json").open("w") as file:
+        json.dump({"portfolio_currency": "EUR", "benchmark_ticker": ["IUSA.DE", "MSFT"]}, file)
+
+    pipeline_outputs = pipeline(
+        config_file_name="multi_benchmark_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=tmp_path,
+        end_date=pd.Timestamp("31-12-2024"),
+    )
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    for output_type in ("portfolio_evolution", "assets_vs_benchmark", "summary_returns"):
+        output = pipeline_outputs[output_type]
+        expected_output = expected_outputs[output_type]
+        benchmark_columns = {
+            column: f"{column}_IUSA.DE"
+            for column in expected_output.columns
+            if column.endswith(("_benchmark", "_diff"))
+        }
+
+        assert set(benchmark_columns.values()) <= set(output.columns)
+        assert {column.replace("IUSA.DE", "MSFT") for column in benchmark_columns.values()} <= set(
+            output.columns
+        )
+        assert (
+            output[expected_output.rename(columns=benchmark_columns).columns]
+            .rename(columns={value: key for key, value in benchmark_columns.items()})
+            .equals(expected_output)
+        ), f"Output {output_type} does not match the single benchmark run."
+
+
+def test_cached_modelling(tmp_path: Path) -> None:
+    """Test that cached runs match the expected outputs and only rerun the changed stages.
+
+    Args:
+        tmp_path: Temporary directory for the input files and the cache.
+    """
+    input_data_dir, cache_dir = tmp_path / "in", tmp_path / "cache"
+    input_data_dir.mkdir()
+    shutil.copy(Path("data/in/example_config.json"), input_data_dir / "config.json")
+    shutil.copy(Path("data/in/example_transactions.csv"), input_data_dir / "transactions.csv")
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    def _run_cached_pipeline() -> dict[str, pd.DataFrame]:
+        outputs: dict[str, pd.DataFrame] = pipeline(
+            config_file_name="config.json",
+            transactions_file_name="transactions.csv",
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=input_data_dir,
+            end_date=pd.Timestamp("31-12-2024"),
+            cache_dir=cache_dir,
+        )
+
+        return outputs
+
+    for _ in range(2):
+        pipeline_outputs = _run_cached_pipeline()
+
+        assert all(
+            pipeline_outputs[output_type].equals(expected_outputs[output_type])
+            for output_type in expected_outputs
+        ), "Cached pipeline outputs do not match expected outputs."
+
+    cached_stages = {file.name for file in cache_dir.iterdir()}
+
+    with (input_data_dir / "config.json").open("w") as file:
+        json.dump({"portfolio_currency": "EUR", "benchmark_ticker": "MSFT"}, file)
+
+    _run_cached_pipeline()
+
+    assert sorted(
+        file.name.rsplit("_", 1)[0]
+        for file in cache_dir.iterdir()
+        if file.name not in cached_stages
+    ) == ["assets_vs_benchmark", "benchmark_data", "benchmark_model", "config"]
+
+
+@pytest.mark.parametrize("memory_budget_mb", [1, 100_000])
+def test_memory_budget_modelling(memory_budget_mb: int) -> None:
+    """Test that modelling the assets in chunks matches modelling them all at once.
+
+    Args:
+        memory_budget_mb: Memory budget, either tiny (a chunk per ticker) or fitting all tickers.
+    """
+    pipeline_outputs = pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+        memory_budget_mb=memory_budget_mb,
+    )
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert all(
+        pipeline_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Memory budget pipeline outputs do not match expected outputs."
+
+
+def test_memory_budget_with_cache(tmp_path: Path) -> None:
+    """Test that caching with a memory budget warns that the assets are not cached, and gives
+    the same outputs.
+
+    Args:
+        tmp_path: Temporary directory for the cache.
+    """
+    warnings: list[str] = []
+    handler_id = logger.add(warnings.append, level="WARNING", format="{message}")
+
+    try:
+        pipeline_outputs = pipeline(
+            config_file_name="example_config.json",
+            transactions_file_name="example_transactions.csv",
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=Path("data/in/"),
+            end_date=pd.Timestamp("31-12-2024"),
+            cache_dir=tmp_path,
+            memory_budget_mb=100_000,
+        )
+    finally:
+        logger.remove(handler_id)
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert any("not cached" in warning for warning in warnings)
+    assert all(
+        pipeline_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Memory budget pipeline outputs do not match expected outputs."
+
+
+@pytest.mark.parametrize("out_of_core_block_days", [7, 366])
+def test_out_of_core_modelling(out_of_core_block_days: int) -> None:
+    """Test that modelling the assets out of core, in blocks of days, matches modelling them in
+    memory.
+
+    Args:
+        out_of_core_block_days: Number of days modelled at a time, either a week (many blocks per
+            year) or a leap year (blocks not aligned with the years).
+    """
+    pipeline_outputs = pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+        out_of_core_block_days=out_of_core_block_days,
+    )
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert pipeline_outputs.keys() == expected_outputs.keys()
+    assert all(
+        pipeline_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Out of core pipeline outputs do not match expected outputs."
+
+
+def test_out_of_core_with_memory_budget() -> None:
+    """Test that the out-of-core mode cannot be combined with a memory budget."""
+    with pytest.raises(ValueError, match="not both"):
+        pipeline(
+            config_file_name="example_config.json",
+            transactions_file_name="example_transactions.csv",
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=Path("data/in/"),
+            end_date=pd.Timestamp("31-12-2024"),
+            memory_budget_mb=100_000,
+            out_of_core_block_days=366,
+        )
+
+
+@pytest.mark.parametrize(
+    "pipeline_kwargs",
+    [{}, {"memory_budget_mb": 100_000}, {"out_of_core_block_days": 366}],
+)
+def test_arrow_dtype_backend(pipeline_kwargs: dict[str, Any]) -> None:
+    """Test that the pipeline with Arrow-backed dtypes and copy-on-write gives the same values as
+    with NumPy dtypes, with every column of the outputs backed by Arrow.
+
+    Args:
+        pipeline_kwargs: Arguments to model the assets in memory, in chunks or out of core.
+    """
+    pytest.importorskip("pyarrow")
+
+    pipeline_outputs = pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+        dtype_backend=DtypeBackend.PYARROW,
+        **pipeline_kwargs,
+    )
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert pipeline_outputs.keys() == expected_outputs.keys()
+    assert all(
+        pipeline_outputs[output_type].equals(
+            convert_dtype_backend(expected_outputs[output_type], DtypeBackend.PYARROW)
+        )
+        for output_type in expected_outputs
+    ), "Arrow-backed pipeline outputs do not match expected outputs."
+    # the year of the returns mixes all_time and integer years, so it is left as objects
+    assert all(
+        isinstance(dtype, pd.ArrowDtype)
+        for output_type, output in pipeline_outputs.items()
+        for column, dtype in output.dtypes.items()
+        if (output_type, column) != ("summary_returns", "year")
+    )
+    assert not pd.get_option("mode.copy_on_write")
+
+
+@pytest.mark.parametrize("partition_by_date", [False, True])
+@pytest.mark.parametrize("output_format", list(OutputFormat))
+def test_write_pipeline_outputs(
+    output_format: OutputFormat,
+    partition_by_date: bool,  # noqa: FBT001
+    tmp_path: Path,
+) -> None:
+    """Test that the outputs of the pipeline are written in every format, with the values they
+    have in memory.
+
+    Args:
+        output_format: File format to write.
+        partition_by_date: Whether to write partitions by month.
+        tmp_path: Temporary output directory.
+    """
+    if output_format != OutputFormat.CSV:
+        pytest.importorskip("pyarrow")
+
+    pipeline_outputs = pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+    )
+
+    written_files = write_outputs(
+        pipeline_outputs,
+        tmp_path,
+        pd.Timestamp("31-12-2024"),
+        output_format=output_format,
+        partition_by_date=partition_by_date,
+    )
+
+    assert {file_path.relative_to(tmp_path).parts[0] for file_path in written_files} == {
+        f"{output_type}.{output_format.value}" if not partition_by_date else output_type
+        for output_type in pipeline_outputs
+    }
+
+    if output_format == OutputFormat.CSV:
+        return
+
+    read_file = pd.read_parquet if output_format == OutputFormat.PARQUET else pd.read_feather
+    summary_returns = pd.concat(
+        [
+            read_file(file_path)
+            for file_path in written_files
+            if file_path.relative_to(tmp_path).parts[0].startswith("summary_returns")
+        ]
+    )
+
+    assert summary_returns["year"].tolist() == [
+        str(year) for year in pipeline_outputs["summary_returns"]["year"]
+    ]
+
+
+def test_results_store(tmp_path: Path) -> None:
+    """Test that the results of a run are stored in the results database, and that the daily
+    value of each asset matches the portfolio model.
+
+    Args:
+        tmp_path: Temporary directory for the database.
+    """
+    pipeline_outputs = pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+        results_db=tmp_path / "results.db",
+    )
+
+    results_store = ResultsStore(tmp_path / "results.db", portfolio_id="example_transactions")
+    portfolio_evolution = pipeline_outputs["portfolio_evolution"]
+    benchmark_columns = [
+        "date",
+        "curr_val_benchmark",
+        "curr_abs_gain_benchmark",
+        "curr_perc_gain_benchmark",
+    ]
+
+    assert results_store.get_portfolio_evolution().equals(
+        portfolio_evolution[results_store.get_portfolio_evolution().columns]
+    )
+    assert (
+        results_store.get_benchmark_evolution("IUSA.DE")[benchmark_columns]
+        .reset_index(drop=True)
+        .equals(portfolio_evolution[benchmark_columns])
+    )
+    assert len(results_store.get_summary_returns()) == 2 * len(pipeline_outputs["summary_returns"])
+
+    # the value of the portfolio on each day is the sum of the value of every asset, rounded
+    asset_evolution = results_store.get_asset_evolution()
+    assert (
+        asset_evolution.groupby("date")["curr_val_asset"].sum().round(2).sort_index(ascending=False)
+        == portfolio_evolution.set_index("date")["curr_val_portfolio"]
+    ).all()
+
+
+@pytest.mark.parametrize(
+    ("outputs", "loads_benchmarks", "models_assets"),
+    [
+        ([PipelineOutput.ASSET_DISTRIBUTION], False, False),
+        ([PipelineOutput.DIVIDENDS_COMPANY, PipelineOutput.DIVIDENDS_YEAR], False, True),
+        ([PipelineOutput.SUMMARY_RETURNS, PipelineOutput.ASSET_DISTRIBUTION], True, True),
+    ],
+)
+def test_selected_outputs(
+    outputs: list[PipelineOutput],
+    loads_benchmarks: bool,  # noqa: FBT001
+    models_assets: bool,  # noqa: FBT001
+) -> None:
+    """Test that only the requested outputs are computed, matching the full pipeline, that the
+    benchmarks are only loaded if a requested output needs them, and that the asset distribution
+    alone is calculated without modelling the daily history of the assets.
+
+    Args:
+        outputs: Outputs to request.
+        loads_benchmarks: Whether the requested outputs need the benchmarks.
+        models_assets: Whether the requested outputs need the daily model of the assets.
+    """
+    metrics_recorder.enable()
+
+    try:
+        pipeline_outputs = pipeline(
+            config_file_name="example_config.json",
+            transactions_file_name="example_transactions.csv",
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=Path("data/in/"),
+            end_date=pd.Timestamp("31-12-2024"),
+            outputs=outputs,
+        )
+        loaded_position_types = {
+            stage_metrics.labels["position_type"]
+            for stage_metrics in metrics_recorder.stages.values()
+            if stage_metrics.stage == "load_ticker"
+        }
+        stages = {stage_metrics.stage for stage_metrics in metrics_recorder.stages.values()}
+    finally:
+        metrics_recorder.disable()
+        metrics_recorder.reset()
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert pipeline_outputs.keys() == {output.value for output in outputs}
+    assert all(
+        pipeline_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in pipeline_outputs
+    ), "Selected pipeline outputs do not match expected outputs."
+    assert ("benchmark" in loaded_position_types) == loads_benchmarks
+    assert ("model_asset" in stages) == models_assets
+
+
+def test_service() -> None:
+    """Test that the service serves the expected outputs, also after refreshing them."""
+    service = PortfolioService(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        refresh_interval=300,
+        end_date=pd.Timestamp("31-12-2024"),
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+    )
+    service.refresh()
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    server = service.create_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with urllib.request.urlopen(f"{url}/outputs") as response:  # noqa: S310
+            assert sorted(json.load(response)["outputs"]) == sorted(expected_outputs)
+
+        for output_type, expected_output in expected_outputs.items():
+            with urllib.request.urlopen(f"{url}/outputs/{output_type}") as response:  # noqa: S310
+                assert json.load(response) == json.loads(
+                    expected_output.to_json(orient="records", date_format="iso")
+                ), f"Served {output_type} does not match expected output."
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_watch(tmp_path: Path) -> None:
+    """Test that the watcher only models again the assets whose transactions changed, matching a
+    full run of the pipeline, and writes the outputs after every recomputation.
+
+    Args:
+        tmp_path: Temporary directory for the input and output files.
+    """
+    shutil.copy(Path("data/in/example_config.json"), tmp_path / "config.json")
+    shutil.copy(Path("data/in/example_transactions.csv"), tmp_path / "transactions.csv")
+
+    watcher = PortfolioWatcher(
+        config_file_name="config.json",
+        transactions_file_name="transactions.csv",
+        end_date=pd.Timestamp("31-12-2024"),
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=tmp_path,
+        output_dir=tmp_path / "out",
+        output_format=OutputFormat.CSV,
+    )
+
+    assert watcher.update()
+    assert not watcher.update()
+
+    transactions = pd.read_csv(tmp_path / "transactions.csv")
+    transactions.loc[transactions["ticker"] == "V", "trans_qty"] -= 1
+    transactions[transactions["ticker"] != "MCO"].to_csv(tmp_path / "transactions.csv", index=False)
+
+    assert watcher.update()
+    assert watcher.recomputed_tickers == ["V"]
+    assert "MCO" not in watcher.asset_models
+
+    expected_outputs = pipeline(
+        config_file_name="config.json",
+        transactions_file_name="transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=tmp_path,
+        end_date=pd.Timestamp("31-12-2024"),
+    )
+
+    assert all(
+        watcher.outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Watcher outputs do not match pipeline outputs."
+
+    for output_type in expected_outputs:
+        assert (tmp_path / "out" / f"{output_type}.csv").exists(), (
+            f"Watcher did not write {output_type}."
+        )
+
+
+def test_scenarios(tmp_path: Path) -> None:
+    """Test that the scenario engine reuses the models of the assets whose transactions did not
+    change, matching a full run of the pipeline with the transactions of the scenario.
+
+    Args:
+        tmp_path: Temporary directory for the input files of the scenario.
+    """
+    engine = ScenarioEngine.from_files(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        end_date=pd.Timestamp("31-12-2024"),
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+    )
+    transactions = engine.portfolio_data.transactions
+
+    base_outputs = engine.evaluate(transactions)
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert engine.recomputed_tickers == []
+    assert all(
+        base_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Scenario outputs do not match expected outputs."
+
+    # what if the AAPL shares had not been sold
+    is_aapl_sale = (transactions["ticker_asset"] == "AAPL") & (transactions["trans_qty_asset"] < 0)
+    scenario_outputs = engine.evaluate(transactions[~is_aapl_sale])
+
+    assert engine.recomputed_tickers == ["AAPL"]
+
+    shutil.copy(Path("data/in/example_config.json"), tmp_path / "config.json")
+    file_transactions = pd.read_csv(Path("data/in/example_transactions.csv"))
+    file_transactions[
+        (file_transactions["ticker"] != "AAPL") | (file_transactions["transaction_type"] != "Sale")
+    ].to_csv(tmp_path / "transactions.csv", index=False)
+
+    expected_outputs = pipeline(
+        config_file_name="config.json",
+        transactions_file_name="transactions.csv",
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=tmp_path,
+        end_date=pd.Timestamp("31-12-2024"),
+    )
+
+    assert all(
+        scenario_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Scenario outputs do not match pipeline outputs."
+
+    with pytest.raises(InvalidTransactionsError):
+        engine.evaluate(transactions.assign(ticker_asset="UNKNOWN"))
+
+
+def test_intraday(tmp_path: Path) -> None:
+    """Test that the intraday tracker starts from the state of the portfolio at end date, and
+    that each tick of an asset held updates its value, and the value and gains of the portfolio.
+
+    Args:
+        tmp_path: Temporary directory for the file of ticks.
+    """
+    ticks_file = tmp_path / "ticks.jsonl"
+    tracker = IntradayTracker(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        price_feed=FilePriceFeed(ticks_file, follow=False),
+        end_date=pd.Timestamp("31-12-2024"),
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+    )
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+    portfolio_value = tracker.outputs["portfolio_value"].iloc[0]
+    expected_portfolio_value = expected_outputs["portfolio_evolution"].iloc[0]
+
+    assert (
+        tracker.outputs["asset_distribution"]
+        .drop(columns=["timestamp"])
+        .equals(expected_outputs["asset_distribution"].drop(columns=["date"]))
+    )
+    for column in ("curr_val_portfolio", "curr_abs_gain_portfolio", "curr_perc_gain_portfolio"):
+        assert portfolio_value[column] == pytest.approx(expected_portfolio_value[column], abs=0.01)
+
+    # MSFT goes up by 10% and NVDA down by 10%, with prices in the currency of the assets, and
+    # XYZ is not held
+    valuator = tracker.valuator
+    price_changes = {"MSFT": 1.1, "XYZ": 2.0, "NVDA": 0.9}
+    ticks_file.write_text(
+        "".join(
+            json.dumps(
+                {
+                    "ticker": ticker,
+                    "price": (
+                        valuator.prices[valuator.positions[ticker]]
+                        * valuator.exchange_rates[valuator.positions[ticker]]
+                        * price_change
+                        if ticker in valuator.positions
+                        else 100.0
+                    ),
+                    "timestamp": f"2025-01-02T15:30:0{second}",
+                }
+            )
+            + "\n"
+            for second, (ticker, price_change) in enumerate(price_changes.items())
+        )
+    )
+    updates: list[dict[str, pd.DataFrame]] = []
+    asset_values = expected_outputs["asset_distribution"].set_index("ticker_asset")[
+        "curr_val_asset"
+    ]
+    value_change = asset_values["MSFT"] * 0.1 - asset_values["NVDA"] * 0.1
+
+    tracker.run(on_update=updates.append)
+
+    assert len(updates) == len(price_changes) - 1
+    assert tracker.outputs["portfolio_value"]["timestamp"].tolist() == [
+        pd.Timestamp("2025-01-02T15:30:02")
+    ]
+    assert tracker.outputs["portfolio_value"]["curr_val_portfolio"].iloc[0] == pytest.approx(
+        expected_portfolio_value["curr_val_portfolio"] + value_change, abs=0.02
+    )
+    assert tracker.outputs["portfolio_value"]["curr_abs_gain_portfolio"].iloc[0] == pytest.approx(
+        expected_portfolio_value["curr_abs_gain_portfolio"] + value_change, abs=0.02
+    )
+    assert tracker.outputs["asset_distribution"]["percent"].sum() == pytest.approx(100, abs=0.05)
+
+
+def test_projection() -> None:
+    """Test that the projection starts from the current value of the portfolio, with ordered
+    percentile bands.
+    """
+    projection = projection_pipeline(
+        config_file_name="example_config.json",
+        transactions_file_name="example_transactions.csv",
+        horizon_days=30,
+        data_api_type=DataApiType.TESTING,
+        input_data_dir=Path("data/in/"),
+        end_date=pd.Timestamp("31-12-2024"),
+        n_paths=1_000,
+        processes=2,
+        seed=0,
+    )
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert len(projection) == 30 + 1
+    assert projection.iloc[-1]["date"] == pd.Timestamp("31-12-2024")
+    assert projection.iloc[-1]["curr_val_portfolio_p50"] == pytest.approx(
+        expected_outputs["asset_distribution"]["curr_val_asset"].sum(), abs=0.05
+    )
+    assert (projection["curr_val_portfolio_p5"] <= projection["curr_val_portfolio_p95"]).all()
+
+
+def test_metrics() -> None:
+    """Test that recording metrics covers every stage and does not change the outputs."""
+    metrics_recorder.enable()
+
+    try:
+        pipeline_outputs = pipeline(
+            config_file_name="example_config.json",
+            transactions_file_name="example_transactions.csv",
+            data_api_type=DataApiType.TESTING,
+            input_data_dir=Path("data/in/"),
+            end_date=pd.Timestamp("31-12-2024"),
+        )
+        stages = {
+            (stage_metrics.stage, stage_metrics.labels.get("ticker"))
+            for stage_metrics in metrics_recorder.stages.values()
+        }
+    finally:
+        metrics_recorder.disable()
+        metrics_recorder.reset()
+
+    expected_outputs = _read_artifacts(
+        file_path=Path("tests/integration/pipeline_output_artifacts"),
+        file_name="pipeline_outputs.pkl",
+    )
+
+    assert all(
+        pipeline_outputs[output_type].equals(expected_outputs[output_type])
+        for output_type in expected_outputs
+    ), "Pipeline outputs with metrics do not match expected outputs."
+
+    assert {
+        ("Preprocessor._load_portfolio_data", None),
+        ("Preprocessor._load_currency_exchange", None),
+        ("Preprocessor._load_ticker_data", None),
+        ("load_ticker", "NVDA"),
+        ("data_api.get_asset_historical_data", "NVDA"),
+        ("data_api.get_asset_historical_data", "IUSA.DE"),
+        ("model_data", None),
+        ("model_portfolio", None),
+        ("model_asset", None),
+        ("model_benchmark", None),
+        ("model_assets_vs_benchmark", None),
+        ("calc_curr_qty", None),
+        ("calc_twr", None),
+    } <= stages
+
+
 def _read_artifacts(file_path: Path, file_name: str) -> Any:
     """Read pickle file.
 
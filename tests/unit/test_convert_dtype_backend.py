@@ -0,0 +1,75 @@
+"""Test convert_dtype_backend."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.utils import DtypeBackend, convert_dtype_backend
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    """Dataframe with string, float (with a missing value), integer, date and mixed columns.
+
+    Returns:
+        Dataframe.
+    """
+    return pd.DataFrame(
+        {
+            "ticker_asset": ["AAPL", "MSFT"],
+            "curr_val_asset": [1.5, np.nan],
+            "year": np.array([2023, 2024], dtype=np.int32),
+            "date": pd.to_datetime(["2024-12-02", "2024-12-03"]),
+            "position": ["all_time", 2024],
+        }
+    )
+
+
+def test_convert_to_pyarrow(df: pd.DataFrame) -> None:
+    """Test that every column but the mixed one is backed by Arrow, with the same values, and
+    that pyarrow reads the Arrow columns without copying them.
+
+    Args:
+        df: Dataframe to convert.
+    """
+    arrow_df = convert_dtype_backend(df, DtypeBackend.PYARROW)
+
+    assert arrow_df.dtypes.to_dict() == {
+        "ticker_asset": pd.ArrowDtype(pa.string()),
+        "curr_val_asset": pd.ArrowDtype(pa.float64()),
+        "year": pd.ArrowDtype(pa.int32()),
+        "date": pd.ArrowDtype(pa.timestamp("ns")),
+        "position": np.dtype(object),
+    }
+    assert arrow_df["curr_val_asset"].isna().tolist() == [False, True]
+    assert arrow_df.astype(df.dtypes.to_dict()).equals(df)
+
+    # pyarrow reads the same buffers
+    table = pa.Table.from_pandas(arrow_df.drop(columns="position"))
+    assert all(
+        [buffer.address for buffer in table.column(column).chunk(0).buffers() if buffer]
+        == [
+            buffer.address
+            for buffer in arrow_df[column].array.__arrow_array__().chunk(0).buffers()
+            if buffer
+        ]
+        for column in table.column_names
+    )
+
+
+def test_convert_strings_only(df: pd.DataFrame) -> None:
+    """Test that only the string columns are converted, and that numpy leaves the dataframe as
+    it is.
+
+    Args:
+        df: Dataframe to convert.
+    """
+    arrow_df = convert_dtype_backend(df, DtypeBackend.PYARROW, strings_only=True)
+
+    assert arrow_df.dtypes.to_dict() == {
+        **df.dtypes.to_dict(),
+        "ticker_asset": pd.ArrowDtype(pa.string()),
+    }
+    assert convert_dtype_backend(df, DtypeBackend.NUMPY) is df
@@ -0,0 +1,92 @@
+"""Test InMemoryDataApi."""
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.preprocessing._interfaces import DataApi, InMemoryDataApi
+
+
+class _FakeDataApi(DataApi):
+    def __init__(self, splits: dict[str, float]) -> None:
+        self.splits = splits
+        self.downloads: list[tuple[str, str]] = []
+
+    def get_ticker_name(self, ticker: str) -> str:
+        return ticker
+
+    def get_ticker_currency(self, ticker: str) -> str:  # noqa: ARG002
+        return "USD"
+
+    def get_asset_historical_data(
+        self,
+        ticker: str,  # noqa: ARG002
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame:
+        self.downloads.append((start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
+        dates = pd.date_range(start_date, end_date, inclusive="left")[::-1]
+
+        return pd.DataFrame(
+            {
+                "date": dates,
+                "close_adj_origin_currency": 100.0,
+                "split": [self.splits.get(date.strftime("%Y-%m-%d"), 0.0) for date in dates],
+                "close_adj_origin_currency_dividends": 0.0,
+            }
+        )
+
+    def get_currency_exchange_rate(
+        self,
+        origin_currency: str,
+        local_currency: str,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+    ) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+@pytest.mark.parametrize(
+    ("splits", "expected_downloads"),
+    [
+        (
+            {},
+            [("2024-01-01", "2024-01-10"), ("2024-01-09", "2024-01-15")],
+        ),
+        (
+            {"2024-01-12": 10.0},
+            [
+                ("2024-01-01", "2024-01-10"),
+                ("2024-01-09", "2024-01-15"),
+                ("2024-01-01", "2024-01-15"),
+            ],
+        ),
+    ],
+)
+def test_in_memory_data_api(
+    splits: dict[str, float], expected_downloads: list[tuple[str, str]]
+) -> None:
+    """Test that only the days not in memory are downloaded, unless there is a new split.
+
+    Args:
+        splits: Split of each date.
+        expected_downloads: Expected (start date, end date) of each download.
+    """
+    data_api = _FakeDataApi(splits)
+    in_memory_data_api = InMemoryDataApi(data_api)
+
+    in_memory_data_api.get_asset_historical_data(
+        "NVDA", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-10")
+    )
+    in_memory_data_api.get_asset_historical_data(
+        "NVDA", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-10")
+    )
+    history = in_memory_data_api.get_asset_historical_data(
+        "NVDA", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-15")
+    )
+
+    assert data_api.downloads == expected_downloads
+    assert history.equals(
+        data_api.get_asset_historical_data(
+            "NVDA", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-15")
+        )
+    )
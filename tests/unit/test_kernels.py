@@ -0,0 +1,146 @@
+"""Test the kernel backends."""
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.exceptions import MissingDependencyError
+from stock_portfolio_tracker.modelling import _kernels as kernels
+from stock_portfolio_tracker.utils import KernelBackend
+
+N_ROWS = 1_000
+N_GROUPS, BLOCK_ROWS = 7, 128
+# probability of a row having a transaction, a stock split, being the first of its ticker or a
+# missing value
+TRANSACTION_PROB, SPLIT_PROB, NEW_TICKER_PROB, MISSING_PROB = 0.1, 0.01, 0.05, 0.05
+
+
+def _kernel_inputs() -> dict[str, tuple[Any, ...]]:
+    """Random inputs for every kernel, with several transactions, stock splits and sales of the
+    whole position.
+
+    Returns:
+        Inputs of each kernel, by kernel name.
+    """
+    rng = np.random.default_rng(0)
+
+    trans_qty = np.where(
+        rng.random(N_ROWS) < TRANSACTION_PROB, rng.integers(1, 10, N_ROWS), 0
+    ).astype(float)
+    split = np.where(rng.random(N_ROWS) < SPLIT_PROB, 2.0, 1.0)
+    curr_qty = kernels.curr_qty_kernel(trans_qty, split)
+    # sell the whole position on some days, to reset the benchmark simulation
+    trans_qty[::-1][np.flatnonzero(curr_qty[::-1] > 0)[::50]] *= -1
+    curr_qty = kernels.curr_qty_kernel(trans_qty, split)
+    close = rng.uniform(10, 1000, N_ROWS)
+
+    values = rng.standard_normal(N_ROWS) * 10.0 ** rng.integers(-5, 12, N_ROWS)
+    values[rng.random(N_ROWS) < MISSING_PROB] = np.nan
+
+    return {
+        "curr_qty_kernel": (trans_qty, split, 5.0),
+        "event_qty_kernel": (rng.random(N_ROWS) < NEW_TICKER_PROB, trans_qty, split),
+        "benchmark_proportional_kernel": (
+            np.where(rng.random(N_ROWS) < SPLIT_PROB, 3.0, 1.0),
+            trans_qty,
+            -trans_qty * close,
+            np.append(curr_qty[1:], 0.0) * split,
+            rng.uniform(10, 1000, N_ROWS),
+        ),
+        "group_sum_kernel": (
+            rng.integers(0, N_GROUPS, N_ROWS),
+            values,
+            np.zeros(N_GROUPS),
+            np.zeros(N_GROUPS),
+        ),
+    }
+
+
+@pytest.mark.parametrize("kernel_name", list(_kernel_inputs()))
+def test_numba_kernels(kernel_name: str) -> None:
+    """Test that every kernel compiled with numba gives the same results as in python.
+
+    Args:
+        kernel_name: Name of the kernel.
+    """
+    pytest.importorskip("numba")
+
+    python_func = getattr(kernels, kernel_name).__wrapped__
+    kernel_inputs = _kernel_inputs()[kernel_name]
+
+    compiled_kernel = kernels.KernelService()
+    compiled_kernel.set_backend(KernelBackend.NUMBA)
+    python_kernel = kernels.KernelService()
+    python_kernel.set_backend(KernelBackend.PYTHON)
+
+    np.testing.assert_array_equal(
+        compiled_kernel.get_kernel(python_func)(*kernel_inputs),
+        python_kernel.get_kernel(python_func)(*kernel_inputs),
+    )
+
+
+def test_python_kernels() -> None:
+    """Test that the python backend runs the kernels as they are, without compiling them."""
+    kernel_service = kernels.KernelService()
+    kernel_service.set_backend(KernelBackend.PYTHON)
+    curr_qty_kernel = kernel_service.get_kernel(kernels.curr_qty_kernel.__wrapped__)  # type: ignore[attr-defined]
+
+    np.testing.assert_array_equal(
+        curr_qty_kernel(np.array([0.0, 3.0, 0.0, 2.0]), np.array([1.0, 1.0, 10.0, 1.0])),
+        np.array([23.0, 23.0, 20.0, 2.0]),
+    )
+    assert curr_qty_kernel is kernels.curr_qty_kernel.__wrapped__  # type: ignore[attr-defined]
+    assert not kernel_service.compiled_kernels
+
+
+def test_curr_qty_kernel_in_blocks() -> None:
+    """Test that calculating the quantity held one block of rows at a time, carrying the quantity
+    over from the block before, gives the same quantities as all rows at once.
+    """
+    trans_qty, split, _ = _kernel_inputs()["curr_qty_kernel"]
+    block_qty: list[npt.NDArray[np.float64]] = []
+    initial_qty = 0.0
+
+    # from the oldest block (the last rows) to the newest
+    for block_end in range(N_ROWS, 0, -BLOCK_ROWS):
+        block = slice(max(0, block_end - BLOCK_ROWS), block_end)
+        block_qty.insert(0, kernels.curr_qty_kernel(trans_qty[block], split[block], initial_qty))
+        initial_qty = block_qty[0][0]
+
+    np.testing.assert_array_equal(
+        np.concatenate(block_qty), kernels.curr_qty_kernel(trans_qty, split)
+    )
+
+
+def test_group_sum_kernel() -> None:
+    """Test that summing the values of each group one block of rows at a time gives the same sums
+    as pandas, bit for bit.
+    """
+    labels, values, sums, compensations = _kernel_inputs()["group_sum_kernel"]
+
+    for block_start in range(0, N_ROWS, BLOCK_ROWS):
+        block = slice(block_start, block_start + BLOCK_ROWS)
+        sums, compensations = kernels.group_sum_kernel(
+            labels[block], values[block], sums, compensations
+        )
+
+    np.testing.assert_array_equal(sums, pd.Series(values).groupby(labels).sum().to_numpy())
+
+
+def test_numba_backend_without_numba(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the numba backend cannot be set without numba installed, and that python is the
+    default backend then.
+
+    Args:
+        monkeypatch: Pytest fixture to pretend numba is not installed.
+    """
+    monkeypatch.setattr(kernels, "find_spec", lambda _: None)
+
+    kernel_service = kernels.KernelService()
+
+    assert kernel_service.backend == KernelBackend.PYTHON
+    with pytest.raises(MissingDependencyError, match="numba is needed"):
+        kernel_service.set_backend(KernelBackend.NUMBA)
@@ -0,0 +1,48 @@
+"""Test MetricsRecorder."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.utils import MetricsRecorder
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_metrics_recorder(enabled: bool) -> None:  # noqa: FBT001
+    """Test that calls are aggregated by stage and labels, and only recorded when enabled.
+
+    Args:
+        enabled: Whether the recorder is enabled.
+    """
+    metrics_recorder = MetricsRecorder()
+
+    if enabled:
+        metrics_recorder.enable()
+
+    for ticker, rows in (("NVDA", 3), ("NVDA", 4), ("MSFT", 5)):
+        with metrics_recorder.record("load_ticker", ticker=ticker) as call_metrics:
+            call_metrics.rows = len(pd.DataFrame({"date": range(rows)}))
+
+    stages = json.loads(metrics_recorder.to_json())
+
+    if not enabled:
+        assert stages == []
+        return
+
+    assert [
+        (stage["stage"], stage["labels"], stage["calls"], stage["rows"]) for stage in stages
+    ] == [
+        ("load_ticker", {"ticker": "NVDA"}, 2, 7),
+        ("load_ticker", {"ticker": "MSFT"}, 1, 5),
+    ]
+    assert all(stage["wall_time"] > 0 and stage["cpu_time"] >= 0 for stage in stages)
+    assert all(stage["process_peak_rss"] > 0 for stage in stages)
+
+    prometheus_lines = metrics_recorder.to_prometheus().splitlines()
+
+    assert "# TYPE stock_portfolio_tracker_stage_calls_total counter" in prometheus_lines
+    assert (
+        'stock_portfolio_tracker_stage_rows_total{stage="load_ticker",ticker="NVDA"} 7'
+        in prometheus_lines
+    )
@@ -0,0 +1,101 @@
+"""Test model_holdings()."""
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.modelling._modelling_portfolio import model_holdings, model_portfolio
+from stock_portfolio_tracker.utils import PortfolioData
+
+DATES = pd.date_range("2024-01-01", "2024-01-14")
+SPLIT_DATE = pd.Timestamp("2024-01-05")
+
+
+@pytest.fixture
+def asset_prices() -> pd.DataFrame:
+    """Daily prices of two assets, one of them with a stock split.
+
+    Returns:
+        Asset prices.
+    """
+    return pd.DataFrame(
+        {
+            "date": [*DATES[::-1], *DATES[::-1]],
+            "ticker_asset": ["AAPL"] * len(DATES) + ["NVDA"] * len(DATES),
+            "split_asset": [1.0] * len(DATES)
+            + [10.0 if date == SPLIT_DATE else 1.0 for date in DATES[::-1]],
+            "close_unadj_local_currency_asset": [
+                *[180.0 + date.day for date in DATES[::-1]],
+                *[(90.0 if date >= SPLIT_DATE else 1000.0) + date.day for date in DATES[::-1]],
+            ],
+        }
+    )
+
+
+@pytest.fixture
+def asset_dividends(asset_prices: pd.DataFrame) -> pd.DataFrame:
+    """Dividends of the assets, none paid.
+
+    Args:
+        asset_prices: Asset prices.
+
+    Returns:
+        Asset dividends.
+    """
+    return asset_prices[["date", "ticker_asset"]].assign(
+        close_unadj_local_currency_dividends_asset=0.0
+    )
+
+
+@pytest.mark.parametrize("end_date", DATES[4:])
+def test_model_holdings(
+    asset_prices: pd.DataFrame, asset_dividends: pd.DataFrame, end_date: pd.Timestamp
+) -> None:
+    """Test that the holdings snapshot matches the asset distribution of the daily model, with
+    several transactions on the split day and on the same day.
+
+    Args:
+        asset_prices: Asset prices.
+        asset_dividends: Asset dividends.
+        end_date: End date of the portfolio.
+    """
+    transactions = pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                ["2024-01-10", "2024-01-10", "2024-01-10", "2024-01-05", "2024-01-05", "2024-01-01"]
+            ),
+            "ticker_asset": ["AAPL", "NVDA", "NVDA", "NVDA", "NVDA", "NVDA"],
+            "trans_qty_asset": [4.0, -1.0, 3.0, 5.0, -2.0, 3.0],
+            "trans_val_asset": [-740.0, 100.0, -285.0, -450.0, 180.0, -3300.0],
+        }
+    )
+    transactions = transactions[transactions["date"] <= end_date].reset_index(drop=True)
+    portfolio_data = PortfolioData(
+        transactions=transactions,
+        assets_info={
+            ticker: {"name": ticker, "currency": "USD"}
+            for ticker in sorted(transactions["ticker_asset"].unique())
+        },
+        start_date=transactions["date"].min(),
+        end_date=end_date,
+    )
+    prices = asset_prices[
+        asset_prices["date"].between(portfolio_data.start_date, end_date)
+        & asset_prices["ticker_asset"].isin(portfolio_data.assets_info)
+    ]
+    dividends = asset_dividends.loc[prices.index]
+
+    _, expected_asset_distribution, *_ = model_portfolio(
+        portfolio_data,
+        prices,
+        dividends,
+        sorting_columns=[
+            {"columns": ["date"], "ascending": [False]},
+            {"columns": ["curr_val_asset"], "ascending": [False]},
+        ],
+    )
+
+    assert model_holdings(
+        portfolio_data,
+        prices,
+        sorting_columns=[{"columns": ["curr_val_asset"], "ascending": [False]}],
+    ).equals(expected_asset_distribution)
@@ -0,0 +1,197 @@
+"""Test model_projection()."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.modelling import model_projection
+from stock_portfolio_tracker.utils import PortfolioData, SimulationMethod
+
+DATES = pd.bdate_range("2024-01-01", periods=14)
+SPLIT_DATE = pd.Timestamp("2024-01-05")
+DAILY_GROWTH = 1.01
+HORIZON_DAYS = 5
+
+
+@pytest.fixture
+def portfolio_data() -> PortfolioData:
+    """Purchase of two assets, one of them before a stock split.
+
+    Returns:
+        Portfolio data.
+    """
+    return PortfolioData(
+        transactions=pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2024-01-02", "2024-01-01"]),
+                "ticker_asset": ["AAPL", "NVDA"],
+                "trans_qty_asset": [2.0, 3.0],
+                "trans_val_asset": [-200.0, -3000.0],
+            }
+        ),
+        assets_info={
+            "AAPL": {"name": "NA", "currency": "USD"},
+            "NVDA": {"name": "NA", "currency": "USD"},
+        },
+        start_date=DATES[0],
+        end_date=DATES[-1],
+    )
+
+
+@pytest.fixture
+def asset_prices() -> pd.DataFrame:
+    """Prices of two assets growing at the same constant rate every business day, one of them
+    with a stock split.
+
+    Returns:
+        Asset prices.
+    """
+    growth = DAILY_GROWTH ** np.arange(len(DATES))[::-1]
+
+    return pd.DataFrame(
+        {
+            "date": [*DATES[::-1], *DATES[::-1]],
+            "ticker_asset": ["AAPL"] * len(DATES) + ["NVDA"] * len(DATES),
+            "split_asset": [1.0] * len(DATES)
+            + [10.0 if date == SPLIT_DATE else 1.0 for date in DATES[::-1]],
+            "close_unadj_local_currency_asset": [
+                *(100.0 * growth),
+                *(1000.0 * growth / np.where(DATES[::-1] >= SPLIT_DATE, 10.0, 1.0)),
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize("method", list(SimulationMethod))
+def test_model_projection_constant_growth(
+    portfolio_data: PortfolioData, asset_prices: pd.DataFrame, method: SimulationMethod
+) -> None:
+    """Test that every percentile follows the historical growth of each business day when the
+    daily returns do not vary, across the stock split.
+
+    Args:
+        portfolio_data: Portfolio data.
+        asset_prices: Asset prices.
+        method: How to simulate the daily returns.
+    """
+    projection = model_projection(
+        portfolio_data,
+        asset_prices,
+        HORIZON_DAYS,
+        sorting_columns=[{"columns": ["date"], "ascending": [True]}],
+        n_paths=50,
+        method=method,
+        percentiles=(5, 50, 95),
+        chunk_paths=20,
+        seed=0,
+    )
+
+    # 2 AAPL and 30 NVDA after the split, at their prices on end date
+    end_date_value = 2 * 100.0 * DAILY_GROWTH**13 + 30 * 100.0 * DAILY_GROWTH**13
+    expected_values = np.round(end_date_value * DAILY_GROWTH ** np.arange(HORIZON_DAYS + 1), 2)
+
+    assert projection["date"].tolist() == list(pd.bdate_range(DATES[-1], periods=HORIZON_DAYS + 1))
+    for column in ("curr_val_portfolio_p5", "curr_val_portfolio_p50", "curr_val_portfolio_p95"):
+        np.testing.assert_allclose(projection[column], expected_values, rtol=1e-9)
+
+
+def test_model_projection_processes(
+    portfolio_data: PortfolioData, asset_prices: pd.DataFrame
+) -> None:
+    """Test that the projection with a seed is the same in several processes as in the current
+    one, and that the bands are ordered.
+
+    Args:
+        portfolio_data: Portfolio data.
+        asset_prices: Asset prices with noise.
+    """
+    asset_prices["close_unadj_local_currency_asset"] *= np.random.default_rng(0).uniform(
+        0.9, 1.1, len(asset_prices)
+    )
+
+    projections = [
+        model_projection(
+            portfolio_data,
+            asset_prices,
+            HORIZON_DAYS,
+            sorting_columns=[{"columns": ["date"], "ascending": [True]}],
+            n_paths=300,
+            chunk_paths=100,
+            processes=processes,
+            seed=1,
+        )
+        for processes in (None, 2)
+    ]
+
+    assert projections[0].equals(projections[1])
+    assert (
+        projections[0]["curr_val_portfolio_p5"] <= projections[0]["curr_val_portfolio_p50"]
+    ).all()
+    assert (
+        projections[0]["curr_val_portfolio_p50"] <= projections[0]["curr_val_portfolio_p95"]
+    ).all()
+
+
+def test_model_projection_weekends(
+    portfolio_data: PortfolioData, asset_prices: pd.DataFrame
+) -> None:
+    """Test that the prices carried over weekends, and a split on a weekend, do not add returns,
+    so the projection is the same as with business days only.
+
+    Args:
+        portfolio_data: Portfolio data.
+        asset_prices: Asset prices on business days.
+    """
+    daily_prices = (
+        asset_prices.set_index("date")
+        .groupby("ticker_asset")[["split_asset", "close_unadj_local_currency_asset"]]
+        .apply(lambda df: df.sort_index().asfreq("D").fillna({"split_asset": 1.0}).ffill())
+        .reset_index()
+        .sort_values(["ticker_asset", "date"], ascending=[True, False])
+    )
+
+    # move the split to the Saturday after, with the price before the split on the Friday
+    is_nvda = daily_prices["ticker_asset"] == "NVDA"
+    daily_prices.loc[is_nvda & (daily_prices["date"] == SPLIT_DATE), "split_asset"] = 1.0
+    daily_prices.loc[
+        is_nvda & (daily_prices["date"] == SPLIT_DATE), "close_unadj_local_currency_asset"
+    ] *= 10
+    daily_prices.loc[
+        is_nvda & (daily_prices["date"] == SPLIT_DATE + pd.Timedelta(days=1)), "split_asset"
+    ] = 10.0
+
+    projections = [
+        model_projection(
+            portfolio_data,
+            prices,
+            HORIZON_DAYS,
+            sorting_columns=[{"columns": ["date"], "ascending": [True]}],
+            n_paths=50,
+            seed=0,
+        )
+        for prices in (asset_prices, daily_prices)
+    ]
+
+    pd.testing.assert_frame_equal(projections[0], projections[1])
+
+
+@pytest.mark.parametrize("method", list(SimulationMethod))
+def test_model_projection_no_history(
+    portfolio_data: PortfolioData, asset_prices: pd.DataFrame, method: SimulationMethod
+) -> None:
+    """Test that projecting without any daily return within the lookback raises a clear error.
+
+    Args:
+        portfolio_data: Portfolio data.
+        asset_prices: Asset prices.
+        method: How to simulate the daily returns.
+    """
+    with pytest.raises(ValueError, match="Not enough price history to project"):
+        model_projection(
+            portfolio_data,
+            asset_prices,
+            HORIZON_DAYS,
+            sorting_columns=[{"columns": ["date"], "ascending": [True]}],
+            method=method,
+            lookback_days=0,
+        )
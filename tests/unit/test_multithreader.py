@@ -0,0 +1,80 @@
+"""Test multithreader."""
+
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from stock_portfolio_tracker.utils import Workload, executor_service, multithreader
+
+
+@pytest.fixture
+def single_worker() -> Iterator[None]:
+    """Run the download workload with a single worker, restoring the default afterwards.
+
+    Yields:
+        Nothing.
+    """
+    executor_service.set_max_workers(Workload.DOWNLOAD, 1)
+    yield
+    executor_service.set_max_workers(Workload.DOWNLOAD, None)
+
+
+def test_multithreader_order() -> None:
+    """Test that results follow the order of the inputs, not the order of completion, and that
+    progress and results are reported for every call as they complete, in the calling thread.
+    """
+    progress, results, result_threads = [], [], []
+
+    def _sleep_and_return(value: int) -> int:
+        time.sleep(value / 100)
+        return value
+
+    def _record_result(result: int) -> None:
+        results.append(result)
+        result_threads.append(threading.current_thread())
+
+    assert multithreader(
+        _sleep_and_return,
+        [(value,) for value in (3, 1, 2, 0)],
+        on_progress=lambda completed, total: progress.append((completed, total)),
+        on_result=_record_result,
+    ) == [3, 1, 2, 0]
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert results == [0, 1, 2, 3]
+    assert result_threads == [threading.current_thread()] * 4
+
+
+def test_multithreader_reuses_executor() -> None:
+    """Test that every call of the same workload runs in the same thread pool."""
+    executor = executor_service.get_executor(Workload.WRITE)
+
+    thread_names = multithreader(
+        lambda: threading.current_thread().name, [()], workload=Workload.WRITE
+    )
+
+    assert executor_service.get_executor(Workload.WRITE) is executor
+    assert thread_names[0].startswith("stock_portfolio_tracker_write")
+
+
+@pytest.mark.usefixtures("single_worker")
+def test_multithreader_fail_fast() -> None:
+    """Test that the first failure is raised and the calls not started yet are cancelled."""
+    started, n_calls = [], 10
+
+    def _fail_first(value: int) -> int:
+        started.append(value)
+
+        if value == 0:
+            msg = "Download failed."
+            raise ValueError(msg)
+
+        time.sleep(0.01)
+
+        return value
+
+    with pytest.raises(ValueError, match="Download failed"):
+        multithreader(_fail_first, [(value,) for value in range(n_calls)])
+
+    assert len(started) < n_calls
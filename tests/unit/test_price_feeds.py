@@ -0,0 +1,108 @@
+"""Test the price feeds."""
+
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from stock_portfolio_tracker.preprocessing import FilePriceFeed, SocketPriceFeed
+from stock_portfolio_tracker.utils import Tick
+
+TICKS = [
+    Tick(ticker="MSFT", price=430.15, timestamp=pd.Timestamp("2025-01-02T15:30:00")),
+    Tick(ticker="NVDA", price=138.3, timestamp=pd.Timestamp("2025-01-02T15:30:01")),
+    Tick(ticker="MSFT", price=430.2, timestamp=pd.Timestamp("2025-01-02T15:30:02")),
+]
+
+
+def _to_json_line(tick: Tick) -> str:
+    """Write a tick as a JSON line.
+
+    Args:
+        tick: Tick.
+
+    Returns:
+        JSON line of the tick.
+    """
+    return (
+        json.dumps(
+            {"ticker": tick.ticker, "price": tick.price, "timestamp": tick.timestamp.isoformat()}
+        )
+        + "\n"
+    )
+
+
+def test_file_price_feed(tmp_path: Path) -> None:
+    """Test that the file feed reads the ticks in the file, and then the ones appended to it,
+    waiting for partially written lines, until closed.
+
+    Args:
+        tmp_path: Temporary directory for the file of ticks.
+    """
+    file_path = tmp_path / "ticks.jsonl"
+    file_path.write_text(_to_json_line(TICKS[0]) + "\n")
+    price_feed = FilePriceFeed(file_path, poll_interval=0.01)
+    ticks: list[Tick] = []
+    tick_read = threading.Event()
+
+    def _read_ticks() -> None:
+        for tick in price_feed.ticks():
+            ticks.append(tick)
+            tick_read.set()
+
+    reader = threading.Thread(target=_read_ticks)
+    reader.start()
+
+    assert tick_read.wait(5)
+
+    with file_path.open("a") as file:
+        line = _to_json_line(TICKS[1])
+        file.write(line[:10])
+        file.flush()
+        file.write(line[10:] + _to_json_line(TICKS[2]))
+
+    for _ in range(500):
+        if len(ticks) == len(TICKS):
+            break
+        time.sleep(0.01)
+
+    price_feed.close()
+    reader.join(5)
+
+    assert not reader.is_alive()
+    assert ticks == TICKS
+
+
+def test_file_price_feed_without_follow(tmp_path: Path) -> None:
+    """Test that the file feed ends at the end of the file when not following it.
+
+    Args:
+        tmp_path: Temporary directory for the file of ticks.
+    """
+    file_path = tmp_path / "ticks.jsonl"
+    file_path.write_text("".join(map(_to_json_line, TICKS)).rstrip("\n"))
+
+    assert list(FilePriceFeed(file_path, follow=False).ticks()) == TICKS
+
+
+def test_socket_price_feed() -> None:
+    """Test that the socket feed gets the ticks pushed by the server until it disconnects."""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+
+        def _push_ticks() -> None:
+            connection, _ = server.accept()
+
+            with connection:
+                for tick in TICKS:
+                    connection.sendall(_to_json_line(tick).encode())
+
+        pusher = threading.Thread(target=_push_ticks)
+        pusher.start()
+
+        ticks = list(SocketPriceFeed(*server.getsockname()).ticks())
+        pusher.join(5)
+
+    assert ticks == TICKS
@@ -0,0 +1,117 @@
+"""Test read_transactions()."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.exceptions import InvalidTransactionsError
+from stock_portfolio_tracker.preprocessing import _transactions
+from stock_portfolio_tracker.preprocessing._transactions import read_transactions
+
+
+@pytest.fixture(params=["arrow", "pandas"])
+def engine(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Read the transactions with the Arrow reader, or with pandas as if pyarrow was missing.
+
+    Args:
+        request: Pytest request, with the engine as parameter.
+        monkeypatch: Pytest monkeypatch.
+
+    Returns:
+        Engine used.
+    """
+    if request.param == "arrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(_transactions, "find_spec", lambda _: None)
+
+    return str(request.param)
+
+
+@pytest.mark.usefixtures("engine")
+def test_read_transactions(tmp_path: Path) -> None:
+    """Test every accepted date format, the signs of sales and purchases and the sorting.
+
+    Args:
+        tmp_path: Temporary directory for the transactions file.
+    """
+    (tmp_path / "transactions.csv").write_text(
+        "date,transaction_type,ticker,trans_qty,trans_val\n"
+        "23/05/2024,Sale,AAPL,30.00,5247.40\n"
+        "2024-05-23,Purchase,MSFT,6,-2275.53\n"
+        "2024/03/28,Sale,V,-5.00,1297.35\n"
+        "25-03-2024,Purchase,AAPL,7.00,2743.36\n"
+    )
+
+    expected_transactions = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-05-23", "2024-05-23", "2024-03-28", "2024-03-25"]),
+            "ticker_asset": ["AAPL", "MSFT", "V", "AAPL"],
+            "trans_qty_asset": [-30.0, 6.0, -5.0, 7.0],
+            "trans_val_asset": [5247.40, -2275.53, 1297.35, -2743.36],
+        }
+    )
+
+    assert read_transactions(tmp_path / "transactions.csv").equals(expected_transactions)
+
+
+@pytest.mark.parametrize("file_name", ["transactions.parquet", "transactions.feather"])
+@pytest.mark.parametrize("dates_as_text", [True, False])
+def test_read_arrow_transactions(tmp_path: Path, file_name: str, dates_as_text: bool) -> None:  # noqa: FBT001
+    """Test that Parquet and Feather files give the same transactions as CSV files, leaving out
+    the transactions after end date.
+
+    Args:
+        tmp_path: Temporary directory for the transactions file.
+        file_name: Name of the transactions file, whose extension sets its format.
+        dates_as_text: Whether the dates are stored as text instead of as dates.
+    """
+    pytest.importorskip("pyarrow")
+
+    transactions = pd.DataFrame(
+        {
+            "date": ["2024-03-25", "2024-05-23", "2024-06-30"],
+            "transaction_type": ["Purchase", "Sale", "Purchase"],
+            "ticker": ["AAPL", "AAPL", "MSFT"],
+            "trans_qty": [7, 3, 1],
+            "trans_val": [-2743.36, 520.0, -400.0],
+            "broker": ["A", "B", "C"],
+        }
+    )
+
+    if not dates_as_text:
+        transactions["date"] = pd.to_datetime(transactions["date"])
+
+    if file_name.endswith(".parquet"):
+        transactions.to_parquet(tmp_path / file_name)
+    else:
+        transactions.to_feather(tmp_path / file_name)
+
+    expected_transactions = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-05-23", "2024-03-25"]),
+            "ticker_asset": ["AAPL", "AAPL"],
+            "trans_qty_asset": [-3.0, 7.0],
+            "trans_val_asset": [520.0, -2743.36],
+        }
+    )
+
+    assert read_transactions(tmp_path / file_name, end_date=pd.Timestamp("2024-06-01")).equals(
+        expected_transactions
+    )
+
+
+@pytest.mark.usefixtures("engine")
+def test_read_invalid_transactions(tmp_path: Path) -> None:
+    """Test that a date in a format not accepted is reported.
+
+    Args:
+        tmp_path: Temporary directory for the transactions file.
+    """
+    (tmp_path / "transactions.csv").write_text(
+        "date,transaction_type,ticker,trans_qty,trans_val\n05.23.2024,Sale,AAPL,30.00,5247.40\n"
+    )
+
+    with pytest.raises(InvalidTransactionsError):
+        read_transactions(tmp_path / "transactions.csv")
@@ -0,0 +1,232 @@
+"""Test ResultsStore."""
+
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.postprocessing import ResultsStore
+
+DATES = pd.to_datetime(["2024-12-03", "2024-12-02", "2024-11-29"])
+
+
+def _portfolio_model(curr_val: list[float]) -> pd.DataFrame:
+    """Daily model of two assets, with two transactions of AAPL on the first date.
+
+    Args:
+        curr_val: Value of AAPL on each row.
+
+    Returns:
+        Portfolio model, sorted by ticker and descending date.
+    """
+    return pd.DataFrame(
+        {
+            "date": [*DATES[:1], *DATES, *DATES],
+            "ticker_asset": ["AAPL"] * 4 + ["MSFT"] * 3,
+            "curr_qty_asset": [5.0, 4.0, 2.0, 2.0, 1.0, 1.0, 1.0],
+            "curr_val_asset": [*curr_val, 400.0, 410.0, 420.0],
+        }
+    )
+
+
+def _outputs(curr_val_portfolio: list[float]) -> dict[str, pd.DataFrame]:
+    """Portfolio evolution and returns compared against two benchmarks.
+
+    Args:
+        curr_val_portfolio: Value of the portfolio on each date.
+
+    Returns:
+        Pipeline outputs.
+    """
+    return {
+        "portfolio_evolution": pd.DataFrame(
+            {
+                "date": DATES,
+                "curr_val_portfolio": curr_val_portfolio,
+                "curr_abs_gain_portfolio": [30.0, 20.0, 0.0],
+                "curr_perc_gain_portfolio": [3.0, 2.0, 0.0],
+                **{
+                    f"{column}_{benchmark_ticker}": [1.0, 2.0, 3.0]
+                    for benchmark_ticker in ("IUSA.DE", "MSFT")
+                    for column in (
+                        "curr_val_benchmark",
+                        "curr_abs_gain_benchmark",
+                        "curr_perc_gain_benchmark",
+                    )
+                },
+            }
+        ),
+        "summary_returns": pd.DataFrame(
+            {
+                "metric_type": ["simple_return", "simple_return"],
+                "unit_type": ["perc", "perc"],
+                "year": ["all_time", 2024],
+                "return_portfolio": [3.0, 3.0],
+                "return_benchmark_IUSA.DE": [2.0, 2.0],
+                "return_benchmark_MSFT": [1.0, 1.0],
+            }
+        ),
+    }
+
+
+@pytest.fixture
+def results_store(tmp_path: Path) -> ResultsStore:
+    """Results store with the results of two runs, the second one with new values on the latest
+    dates and without the oldest date.
+
+    Args:
+        tmp_path: Temporary directory for the database.
+
+    Returns:
+        Results store.
+    """
+    results_store = ResultsStore(tmp_path / "results.db")
+    results_store.write(
+        _outputs([1000.0, 990.0, 980.0]),
+        ["IUSA.DE", "MSFT"],
+        _portfolio_model([500.0, 400.0, 210.0, 200.0]),
+    )
+
+    latest_outputs = _outputs([1100.0, 1090.0, 0.0])
+    latest_outputs["portfolio_evolution"] = latest_outputs["portfolio_evolution"].iloc[:2]
+    results_store.write(
+        latest_outputs, ["IUSA.DE", "MSFT"], _portfolio_model([600.0, 480.0, 220.0, 200.0])
+    )
+
+    return results_store
+
+
+def test_results_store_updates(results_store: ResultsStore) -> None:
+    """Test that each run inserts or updates its dates, keeping the end of day state of each
+    asset and the dates of earlier runs.
+
+    Args:
+        results_store: Results store.
+    """
+    assert results_store.get_portfolio_evolution()["curr_val_portfolio"].tolist() == [
+        1100.0,
+        1090.0,
+        980.0,
+    ]
+    assert results_store.get_asset_evolution("AAPL")["curr_val_asset"].tolist() == [
+        600.0,
+        220.0,
+        200.0,
+    ]
+    assert len(results_store.get_benchmark_evolution()) == len(DATES) * 2
+    assert len(results_store.get_summary_returns()) == 2 * 3
+
+
+def test_results_store_queries(results_store: ResultsStore) -> None:
+    """Test point and range queries.
+
+    Args:
+        results_store: Results store.
+    """
+    point_query = results_store.get_asset_evolution("MSFT", DATES[1], DATES[1])
+    assert point_query.to_dict(orient="records") == [
+        {
+            "ticker_asset": "MSFT",
+            "date": DATES[1],
+            "curr_qty_asset": 1.0,
+            "curr_val_asset": 410.0,
+        }
+    ]
+
+    range_query = results_store.get_asset_evolution(start_date=DATES[1])
+    assert range_query[["ticker_asset", "date"]].to_numpy().tolist() == [
+        ["AAPL", DATES[0]],
+        ["AAPL", DATES[1]],
+        ["MSFT", DATES[0]],
+        ["MSFT", DATES[1]],
+    ]
+
+    assert results_store.get_benchmark_evolution("MSFT", end_date=DATES[2])[
+        "curr_val_benchmark"
+    ].tolist() == [3.0]
+    assert results_store.get_summary_returns("IUSA.DE")["year"].tolist() == ["all_time", "2024"]
+    assert results_store.get_portfolio_gain(DATES[2], DATES[0]) == pytest.approx(30.0)
+    assert results_store.get_portfolio_gain(DATES[2], pd.Timestamp("2025-01-01")) is None
+
+
+def test_results_store_portfolios(results_store: ResultsStore) -> None:
+    """Test that the results of each portfolio in the database are kept apart, and that the rows
+    of the assets and benchmarks that left a portfolio are deleted.
+
+    Args:
+        results_store: Results store of the default portfolio.
+    """
+    other_store = ResultsStore(results_store.db_path, portfolio_id="other")
+    other_outputs = _outputs([10.0, 9.0, 8.0])
+    other_outputs["summary_returns"] = other_outputs["summary_returns"].iloc[:1]
+    other_store.write(other_outputs, ["IUSA.DE", "MSFT"], _portfolio_model([5.0, 4.0, 2.0, 1.0]))
+
+    # MSFT and its benchmark leave the other portfolio, and a single benchmark has no suffix
+    benchmark_columns = [
+        "curr_val_benchmark",
+        "curr_abs_gain_benchmark",
+        "curr_perc_gain_benchmark",
+    ]
+    other_store.write(
+        {
+            "portfolio_evolution": _outputs([11.0, 9.0, 8.0])["portfolio_evolution"]
+            .drop(columns=[f"{column}_MSFT" for column in benchmark_columns])
+            .rename(columns={f"{column}_IUSA.DE": column for column in benchmark_columns})
+        },
+        ["IUSA.DE"],
+        _portfolio_model([6.0, 4.0, 2.0, 1.0]).query("ticker_asset == 'AAPL'"),
+    )
+
+    assert other_store.get_portfolio_evolution()["curr_val_portfolio"].tolist() == [
+        11.0,
+        9.0,
+        8.0,
+    ]
+    assert other_store.get_asset_evolution()["ticker_asset"].unique().tolist() == ["AAPL"]
+    assert other_store.get_benchmark_evolution()["ticker_benchmark"].unique().tolist() == [
+        "IUSA.DE"
+    ]
+    assert len(other_store.get_summary_returns()) == len(other_outputs["summary_returns"]) * 3
+
+    assert results_store.get_portfolio_evolution()["curr_val_portfolio"].tolist() == [
+        1100.0,
+        1090.0,
+        980.0,
+    ]
+    assert results_store.get_asset_evolution()["ticker_asset"].unique().tolist() == [
+        "AAPL",
+        "MSFT",
+    ]
+    assert len(results_store.get_benchmark_evolution()) == len(DATES) * 2
+    assert len(results_store.get_summary_returns()) == 2 * 3
+
+
+def test_results_store_indexes(results_store: ResultsStore) -> None:
+    """Test that the queries of a portfolio by ticker and date and by date alone use an index.
+
+    Args:
+        results_store: Results store.
+    """
+    with sqlite3.connect(results_store.db_path) as connection:
+        for query in (
+            (
+                "SELECT * FROM asset_evolution WHERE portfolio_id = 'default' "
+                "AND ticker_asset = 'AAPL' AND date >= '2024-12-01'"
+            ),
+            "SELECT * FROM asset_evolution WHERE portfolio_id = 'default' AND date = '2024-12-02'",
+            (
+                "SELECT * FROM benchmark_evolution "
+                "WHERE portfolio_id = 'default' AND date = '2024-12-02'"
+            ),
+            (
+                "SELECT * FROM portfolio_evolution "
+                "WHERE portfolio_id = 'default' AND date BETWEEN '2024-11-01' AND '2024-12-01'"
+            ),
+        ):
+            query_plan = " ".join(
+                str(row[-1]) for row in connection.execute(f"EXPLAIN QUERY PLAN {query}")
+            )
+
+            assert "USING" in query_plan
+            assert "INDEX" in query_plan
@@ -0,0 +1,25 @@
+"""Test TestingApi."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.preprocessing._interfaces import TestingApi
+
+
+def test_default_artifacts_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the testing API finds the mocked API responses from any working directory.
+
+    Args:
+        tmp_path: Temporary directory to run from.
+        monkeypatch: Fixture to change the working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    asset_data = TestingApi().get_asset_historical_data(
+        "AAPL", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-31")
+    )
+
+    assert not asset_data.empty
+    assert asset_data["date"].between("2024-01-01", "2024-01-31").all()
@@ -0,0 +1,77 @@
+"""Test TransactionLedger."""
+
+from pathlib import Path
+
+import pytest
+
+from stock_portfolio_tracker.preprocessing import TransactionLedger
+from stock_portfolio_tracker.preprocessing._transactions import read_transactions
+
+HEADER = "date,transaction_type,ticker,trans_qty,trans_val\n"
+ROWS = [
+    "23/05/2024,Sale,AAPL,30.00,5247.40\n",
+    "23/04/2024,Purchase,MSFT,6.00,-2275.53\n",
+    "28/03/2024,Sale,V,5.00,1297.35\n",
+    "25/03/2024,Purchase,MSFT,7.00,-2743.36\n",
+]
+
+
+@pytest.mark.parametrize(
+    ("first_content", "second_content", "expected_row_count"),
+    [
+        (HEADER + "".join(ROWS[:2]), HEADER + "".join(ROWS), 4),
+        (HEADER + "".join(ROWS[:3]) + ROWS[3].rstrip("\n"), HEADER + "".join(ROWS), 4),
+        (HEADER + "".join(ROWS[:2]), HEADER + ROWS[1] + ROWS[0] + ROWS[2], 3),
+        (HEADER + "".join(ROWS), HEADER + ROWS[0], 1),
+    ],
+    ids=["appended", "no_trailing_newline", "rewritten", "removed"],
+)
+def test_transaction_ledger(
+    tmp_path: Path, first_content: str, second_content: str, expected_row_count: int
+) -> None:
+    """Test that the ledger gives the same transactions as parsing the whole file, storing only
+    complete rows.
+
+    Args:
+        tmp_path: Temporary directory for the transactions file and the ledger.
+        first_content: Content of the transactions file in the first read.
+        second_content: Content of the transactions file in the second read.
+        expected_row_count: Rows stored in the ledger after the second read.
+    """
+    ledger = TransactionLedger(tmp_path / "ledger")
+    file_path = tmp_path / "transactions.csv"
+
+    file_path.write_text(first_content)
+    assert ledger.read(file_path).equals(read_transactions(file_path))
+
+    file_path.write_text(second_content)
+    assert ledger.read(file_path).equals(read_transactions(file_path))
+
+    checkpoint, _ = ledger._load("transactions.csv.ledger.pkl")  # noqa: SLF001
+    assert checkpoint is not None
+    assert checkpoint.row_count == expected_row_count
+    assert checkpoint.byte_offset == len(second_content.encode())
+
+
+def test_transaction_ledger_parses_appended_rows_only(tmp_path: Path) -> None:
+    """Test that rows already in the ledger are not parsed again, by corrupting them in the
+    ledger and checking that the corruption is kept when rows are appended.
+
+    Args:
+        tmp_path: Temporary directory for the transactions file and the ledger.
+    """
+    ledger = TransactionLedger(tmp_path / "ledger")
+    file_path = tmp_path / "transactions.csv"
+
+    file_path.write_text(HEADER + ROWS[0])
+    ledger.read(file_path)
+
+    checkpoint, transactions = ledger._load("transactions.csv.ledger.pkl")  # noqa: SLF001
+    assert checkpoint is not None
+    ledger._save(  # noqa: SLF001
+        "transactions.csv.ledger.pkl", checkpoint, transactions.assign(ticker="PARSED")
+    )
+
+    file_path.write_text(HEADER + ROWS[0] + ROWS[1])
+
+    assert ledger.read(file_path)["ticker_asset"].tolist() == ["PARSED", "MSFT"]
@@ -0,0 +1,111 @@
+"""Test write_outputs()."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from stock_portfolio_tracker.postprocessing import write_outputs
+from stock_portfolio_tracker.utils import OutputFormat
+
+
+@pytest.fixture
+def outputs() -> dict[str, pd.DataFrame]:
+    """Outputs with and without date column.
+
+    Returns:
+        Pipeline outputs.
+    """
+    return {
+        "portfolio_evolution": pd.DataFrame(
+            {
+                "date": pd.to_datetime(["2024-12-02", "2024-11-29", "2024-11-01", "2024-10-31"]),
+                "curr_val_portfolio": [110.0, 100.0, 90.0, 80.0],
+            }
+        ),
+        "dividends_company": pd.DataFrame(
+            {"ticker_asset": ["AAPL", "MSFT"], "total_dividend_asset": [1.5, 2.5]}
+        ),
+    }
+
+
+@pytest.mark.parametrize("output_format", list(OutputFormat))
+def test_write_outputs(
+    outputs: dict[str, pd.DataFrame], output_format: OutputFormat, tmp_path: Path
+) -> None:
+    """Test that every output is written to a single file that reads back the same.
+
+    Args:
+        outputs: Pipeline outputs.
+        output_format: File format to write.
+        tmp_path: Temporary output directory.
+    """
+    if output_format != OutputFormat.CSV:
+        pytest.importorskip("pyarrow")
+
+    written_files = write_outputs(
+        outputs, tmp_path, pd.Timestamp("2024-12-02"), output_format=output_format
+    )
+
+    assert written_files == sorted(
+        tmp_path / f"{output_type}.{output_format.value}" for output_type in outputs
+    )
+
+    for output_type, output in outputs.items():
+        file_path = tmp_path / f"{output_type}.{output_format.value}"
+
+        match output_format:
+            case OutputFormat.PARQUET:
+                written_output = pd.read_parquet(file_path)
+            case OutputFormat.FEATHER:
+                written_output = pd.read_feather(file_path)
+            case OutputFormat.CSV:
+                written_output = pd.read_csv(
+                    file_path, parse_dates=["date"] if "date" in output else False
+                )
+
+        pd.testing.assert_frame_equal(written_output, output, check_dtype=False)
+
+
+def test_write_outputs_partitioned(outputs: dict[str, pd.DataFrame], tmp_path: Path) -> None:
+    """Test that partitions by month are append-only except for the latest one on disk.
+
+    Args:
+        outputs: Pipeline outputs.
+        tmp_path: Temporary output directory.
+    """
+    portfolio_evolution = outputs["portfolio_evolution"]
+
+    write_outputs(
+        {"portfolio_evolution": portfolio_evolution.iloc[1:]},
+        tmp_path,
+        pd.Timestamp("2024-11-29"),
+        output_format=OutputFormat.CSV,
+        partition_by_date=True,
+    )
+
+    written_files = write_outputs(
+        {
+            **outputs,
+            "portfolio_evolution": portfolio_evolution.assign(
+                curr_val_portfolio=lambda df: df["curr_val_portfolio"] + 1
+            ),
+        },
+        tmp_path,
+        pd.Timestamp("2024-12-02"),
+        output_format=OutputFormat.CSV,
+        partition_by_date=True,
+    )
+
+    assert written_files == [
+        tmp_path / "dividends_company" / "month=2024-12" / "part-0.csv",
+        tmp_path / "portfolio_evolution" / "month=2024-11" / "part-0.csv",
+        tmp_path / "portfolio_evolution" / "month=2024-12" / "part-0.csv",
+    ]
+
+    assert [
+        pd.read_csv(tmp_path / "portfolio_evolution" / f"month={month}" / "part-0.csv")[
+            "curr_val_portfolio"
+        ].to_list()
+        for month in ("2024-10", "2024-11", "2024-12")
+    ] == [[80.0], [101.0, 91.0], [111.0]]